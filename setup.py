@@ -35,6 +35,7 @@ setup(
         entry_points = {
              'console_scripts': [
                  'nagini = nagini_translation.main:main',
+                 'nagini-prepare = nagini_translation.main:prepare_sil_files',
                  ]
              },
         url='http://www.pm.inf.ethz.ch/research/nagini.html',
@@ -422,6 +422,19 @@ def GhostReturns(start_index: int) -> Callable[[T], T]:
     return wrap
 
 
+def Timeout(seconds: int) -> Callable[[T], T]:
+    """
+    Decorator for functions and methods which limits the time the verifier may
+    spend on them to the given number of seconds. It's a no-op.
+    If the limit is exceeded, the function or method is reported as timed out
+    and the verification of the other members is not affected. Declaring a
+    limit makes the verifier verify all members separately.
+    """
+    def wrap(func: T) -> T:
+        return func
+    return wrap
+
+
 def list_pred(l: object) -> bool:
     """
     Special, predefined predicate that represents the permissions belonging
@@ -484,6 +497,7 @@ __all__ = [
         'Ghost',
         'ContractOnly',
         'GhostReturns',
+        'Timeout',
         'list_pred',
         'dict_pred',
         'set_pred',
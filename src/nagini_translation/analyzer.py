@@ -96,6 +96,9 @@ class Analyzer(ast.NodeVisitor):
         self.current_loop_invariant = None
         self.selected = selected
         self.deferred_tasks = []
+        # Results of convert_type, keyed by the interned mypy type, the
+        # current module and the number of known modules.
+        self._converted_types = {}
 
     @property
     def stmt_container(self):
@@ -246,10 +249,16 @@ class Analyzer(ast.NodeVisitor):
         """
         Performs preprocessing on the result of the analysis, which infers some
         things, creates some data structures for the translation etc.
+        Afterwards, all modules and their classes are frozen, s.t. included
+        modules and class members are looked up in precomputed tables.
         """
-        self.module.global_module.process(translator)
-        for module in self.modules.values():
+        modules = [self.module.global_module] + list(self.modules.values())
+        for module in modules:
             module.process(translator)
+        for module in modules:
+            module.freeze()
+            for cls in module.classes.values():
+                cls.freeze()
 
     def add_native_silver_builtins(self, interface: Dict) -> None:
         """
@@ -664,6 +673,7 @@ class Analyzer(ast.NodeVisitor):
         func.predicate = self.is_predicate(node)
         func.all_low = self.is_all_low(node)
         func.preserves_low = self.preserves_low(node)
+        func.timeout = self.get_timeout(node)
 
         # TODO: When we want to support method type parameters, this would be
         # the place to find all type variables used in the parameters which
@@ -767,6 +777,9 @@ class Analyzer(ast.NodeVisitor):
             arg = node.vararg
             annotated_type = self.typeof(arg)
             assert annotated_type.name == TUPLE_TYPE
+            # Converted types are shared, so this one must be copied.
+            annotated_type = GenericType(annotated_type.cls,
+                                         annotated_type.type_args)
             annotated_type.exact_length = False
             var_arg = self.node_factory.create_python_var(arg.arg, arg,
                                                           annotated_type)
@@ -1117,8 +1130,19 @@ class Analyzer(ast.NodeVisitor):
 
     def convert_type(self, mypy_type, node) -> PythonType:
         """
-        Converts an internal mypy type to a PythonType.
+        Converts an internal mypy type to a PythonType. Types that have an
+        interned key (i.e., do not depend on type variables in scope) are
+        converted only once per module.
         """
+        type_key = self.types.interner.intern(mypy_type)
+        if type_key is None:
+            return self._convert_type(mypy_type, node)
+        key = (type_key, self.module, len(self.modules))
+        if key not in self._converted_types:
+            self._converted_types[key] = self._convert_type(mypy_type, node)
+        return self._converted_types[key]
+
+    def _convert_type(self, mypy_type, node) -> PythonType:
         if (self.types.is_void_type(mypy_type) or
                 self.types.is_none_type(mypy_type)):
             result = None
@@ -1472,3 +1496,19 @@ class Analyzer(ast.NodeVisitor):
 
     def preserves_low(self, func: ast.FunctionDef) -> bool:
         return self.has_decorator(func, 'PreservesLow')
+
+    def get_timeout(self, func: ast.FunctionDef) -> Optional[int]:
+        """
+        Returns the number of seconds the verification of the given function
+        may take according to its Timeout decorator, or None if it has none.
+        """
+        for decorator in func.decorator_list:
+            if (isinstance(decorator, ast.Call) and
+                    isinstance(decorator.func, ast.Name) and
+                    decorator.func.id == 'Timeout'):
+                if (len(decorator.args) != 1 or decorator.keywords or
+                        not isinstance(decorator.args[0], ast.Num) or
+                        decorator.args[0].n <= 0):
+                    raise InvalidProgramException(decorator, 'invalid.timeout')
+                return decorator.args[0].n
+        return None
@@ -6,24 +6,57 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
 import argparse
+import json
 import zmq
 
 from nagini_translation.lib.constants import DEFAULT_CLIENT_SOCKET
 
 
-context = zmq.Context()
-
-socket = context.socket(zmq.REQ)
-socket.connect(DEFAULT_CLIENT_SOCKET)
-
-parser = argparse.ArgumentParser()
-parser.add_argument(
-        'python_file',
-        help='Python file to verify')
-
-args = parser.parse_args()
-
-socket.send_string(args.python_file)
-response = socket.recv_string()
-
-print(response)
\ No newline at end of file
+def verify_file(socket: 'zmq.Socket', python_file: str, select: str = None,
+                ide_mode: bool = False, print=print) -> bool:
+    """
+    Requests the verification of the given file from the server the given
+    DEALER socket is connected to, and prints the errors of every member as
+    soon as they are reported, and finally the complete output. Returns
+    whether the file verified successfully.
+    """
+    request = {'command': 'verify', 'file': python_file, 'ide_mode': ide_mode}
+    if select:
+        request['select'] = select
+    socket.send_multipart([b'', json.dumps(request).encode()])
+    while True:
+        response = json.loads(socket.recv_multipart()[-1].decode())
+        if response['type'] == 'result':
+            for error in response['errors']:
+                print(error)
+        elif response['type'] == 'done':
+            print(response['output'])
+            return response['success']
+        elif response['type'] in ('cancelled', 'error'):
+            print(response.get('message', 'Verification cancelled.'))
+            return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+            'python_file',
+            help='Python file to verify')
+    parser.add_argument(
+            '--select',
+            default=None,
+            help='select specific methods or classes to verify, separated by commas')
+    parser.add_argument(
+            '--ide-mode',
+            action='store_true',
+            help='Output errors in IDE format')
+    args = parser.parse_args()
+
+    context = zmq.Context()
+    socket = context.socket(zmq.DEALER)
+    socket.connect(DEFAULT_CLIENT_SOCKET)
+    verify_file(socket, args.python_file, args.select, args.ide_mode)
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,7 @@ from typing import List
 
 _TRANSLATION_TEST_FUNCTION_NAME = 'test_translation'
 _VERIFICATION_TEST_FUNCTION_NAME = 'test_verification'
+_UNIT_TESTS_MODULE_NAME = 'unit_tests'
 
 _TRANSLATION_TESTS_SUFFIX = 'translation'
 _VERIFICATION_TESTS_SUFFIX = 'verification'
@@ -229,5 +230,8 @@ def pytest_generate_tests(metafunc: 'pytest.python.Metafunc'):
             params.extend([(file, verifier, sif, reload_resources, arp, _pytest_config.store_viper) for verifier
                            in _pytest_config.verifiers])
         metafunc.parametrize('path,verifier,sif,reload_resources,arp,print', params)
+    elif metafunc.module.__name__.split('.')[-1] == _UNIT_TESTS_MODULE_NAME:
+        # Component tests take no parameters and need no configuration.
+        pass
     else:
         pytest.exit('Unrecognized test function.')
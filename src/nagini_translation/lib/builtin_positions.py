@@ -0,0 +1,75 @@
+"""
+Copyright (c) 2019 ETH Zurich
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+"""Source positions of builtin Silver programs loaded in serialized form.
+
+Silver source positions refer to ``java.nio.file.Path`` objects, which cannot
+be serialized. Before a builtin program is serialized, every source position
+in it is therefore replaced by a ``LineColumnPosition`` with the same line,
+whose column is the index of the original position in a table that is
+stored next to the program. Positions are resolved through this table when
+they are reported, relative to the resources of the running installation.
+"""
+
+import os
+
+from typing import List, Optional, Tuple
+
+
+BuiltinPosition = Tuple[str, int, int, Optional[int], Optional[int]]
+"""
+File, start line and column and, if known, end line and column of a
+position. The file is relative to the nagini_translation package.
+"""
+
+_PACKAGE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_POSITIONS = {}
+"""
+Registered positions of all loaded builtin programs by the column of their
+placeholder.
+"""
+
+
+def placeholder_column(index: int, sif: bool) -> int:
+    """
+    Returns the column of the placeholder for the position with the given
+    index in the table of the builtin program of the given mode. The tables
+    of both modes can be registered at the same time, so their columns are
+    disjoint.
+    """
+    return 2 * index + int(sif)
+
+
+def register(positions: List[BuiltinPosition], sif: bool) -> None:
+    """
+    Registers the position table of the builtin program of the given mode.
+    """
+    for index, position in enumerate(positions):
+        _POSITIONS[placeholder_column(index, sif)] = tuple(position)
+
+
+def resolve(position: 'ast.Position') -> Optional[BuiltinPosition]:
+    """
+    Returns the original position of the given placeholder, with an absolute
+    file, or None if it is not a placeholder.
+    """
+    if hasattr(position, 'file') or not hasattr(position, 'column'):
+        return None
+    original = _POSITIONS.get(position.column())
+    if original is None or original[1] != position.line():
+        return None
+    file, *rest = original
+    return (os.path.join(_PACKAGE_PATH, file),) + tuple(rest)
+
+
+def relative_file(path: str) -> str:
+    """
+    Returns the name of the given resource file that is stored in position
+    tables.
+    """
+    return os.path.relpath(path, _PACKAGE_PATH)
@@ -10,6 +10,8 @@ import ast
 DEFAULT_CLIENT_SOCKET = "tcp://localhost:5555"
 DEFAULT_SERVER_SOCKET = "tcp://*:5555"
 
+UNTRACKED_DEPENDENCIES = '$untracked'
+
 
 LITERALS = ['True', 'False', 'None']
 
@@ -100,6 +102,11 @@ INTERNAL_NAMES = [
     'issubtype_exclusion',
     'issubtype_exclusion_2',
     'issubtype_exclusion_propagation',
+    'issubtype_interval',
+    'type_low',
+    'type_high',
+    'type_ranked',
+    'type_exact',
     'Thread',
     JOINABLE_FUNC,
     THREAD_POST_PRED,
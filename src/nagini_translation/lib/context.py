@@ -59,6 +59,9 @@ class Context:
         # True iff contracts for a thread start are translated.
         # Used to differentiate fresh token from old token permission.
         self.is_thread_start = False
+        # If set, maps the trigger candidates of the quantifier body that is
+        # currently translated to their translations (see translate_expr).
+        self.trigger_terms = None
 
     def get_fresh_int(self) -> int:
         """
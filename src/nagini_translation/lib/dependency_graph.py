@@ -0,0 +1,67 @@
+"""
+Copyright (c) 2019 ETH Zurich
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+from typing import Dict, Iterable, Set
+
+
+class DependencyGraph:
+    """
+    Directed graph of the dependencies between the members of a Viper program,
+    identified by their names. An edge from a member to a name means that the
+    translation of the member references the name.
+    """
+
+    def __init__(self, edges: Dict[str, Iterable[str]] = None) -> None:
+        self._edges = {}  # type: Dict[str, Set[str]]
+        if edges:
+            for name, targets in edges.items():
+                self.add_edges(name, targets)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._edges
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def add_node(self, name: str) -> None:
+        self._edges.setdefault(name, set())
+
+    def add_edges(self, name: str, targets: Iterable[str]) -> None:
+        """
+        Records that the member with the given name depends on all given
+        names.
+        """
+        self._edges.setdefault(name, set()).update(targets)
+
+    def successors(self, name: str) -> Set[str]:
+        """
+        Returns the names the given member directly depends on.
+        """
+        return self._edges.get(name, set())
+
+    def reachable(self, roots: Iterable[str]) -> Set[str]:
+        """
+        Returns the given names and all names they transitively depend on.
+        """
+        result = set()
+        to_visit = list(roots)
+        while to_visit:
+            current = to_visit.pop()
+            if current in result:
+                continue
+            result.add(current)
+            successors = self._edges.get(current)
+            if successors:
+                to_visit.extend(successors - result)
+        return result
+
+    def export(self) -> Dict[str, Set[str]]:
+        """
+        Returns a copy of the graph as a map from names to the names they
+        directly depend on.
+        """
+        return {name: set(targets) for name, targets in self._edges.items()}
@@ -8,10 +8,12 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """Error handling state is stored in singleton ``manager``."""
 
 
+import bisect
+import threading
+
 from collections import namedtuple
-from uuid import uuid1
 
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from nagini_translation.lib.errors.wrappers import Error
 from nagini_translation.lib.errors.rules import Rules
@@ -21,28 +23,201 @@ from nagini_translation.lib.jvmaccess import JVM
 Item = namedtuple('Item', 'node vias reason_string')
 
 
+class ErrorInformation:
+    """
+    Error information for a contiguous range of IDs, stored as one list per
+    attribute. Entries of discarded IDs are ``None``.
+    """
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.nodes = []     # type: List[Optional['ast.Node']]
+        self.vias = []      # type: List[Optional[Tuple[Any, ...]]]
+        self.reasons = []   # type: List[Optional[str]]
+        self.rules = {}     # type: Dict[int, Rules]
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.nodes)
+
+    def copy(self, start: int, end: int) -> 'ErrorInformation':
+        """Return a copy of the entries with IDs in ``[start, end)``."""
+        result = ErrorInformation(start)
+        result.nodes = self.nodes[start - self.start:end - self.start]
+        result.vias = self.vias[start - self.start:end - self.start]
+        result.reasons = self.reasons[start - self.start:end - self.start]
+        result.rules = {
+            item_id: rules for item_id, rules in self.rules.items()
+            if start <= item_id < end
+        }
+        return result
+
+    def get_item(self, item_id: int) -> Optional[Item]:
+        index = item_id - self.start
+        if self.vias[index] is None:
+            # Discarded.
+            return None
+        return Item(self.nodes[index], self.vias[index], self.reasons[index])
+
+    def discard(self, start: int, end: int) -> None:
+        """Drop the entries with IDs in ``[start, end)``."""
+        for item_id in range(max(start, self.start), min(end, self.end)):
+            index = item_id - self.start
+            self.nodes[index] = None
+            self.vias[index] = None
+            self.reasons[index] = None
+            self.rules.pop(item_id, None)
+
+    def trim(self) -> None:
+        """
+        Remove the discarded entries at the start of the range, s.t. the
+        lists do not grow while older entries are being discarded. Entries
+        may be appended concurrently.
+        """
+        count = 0
+        while count < len(self.vias) and self.vias[count] is None:
+            count += 1
+        if count:
+            del self.nodes[:count]
+            del self.vias[:count]
+            del self.reasons[:count]
+            self.start += count
+
+
 class ErrorManager:
     """A singleton object that stores the state needed for error handling."""
 
     def __init__(self) -> None:
-        self._items = {}                # type: Dict[str, Item]
-        self._conversion_rules = {}     # type: Dict[str, Rules]
+        self._next_id = 0
+        # Information added since the last ``clear``.
+        self._current = ErrorInformation(0)
+        # Information added by ``restore`` for older IDs, sorted by start.
+        self._restored = []         # type: List[ErrorInformation]
+        # Snapshots of via lists, keyed by the identities of their elements.
+        # The snapshots keep the elements alive, so their identities are not
+        # reused while they are in here.
+        self._shared_vias = {}      # type: Dict[Tuple[int, ...], Tuple[Any, ...]]
+        # Guards the start of the current information, which moves when its
+        # first entries are discarded. Adding information needs no lock.
+        self._lock = threading.Lock()
+
+    def _share_vias(self, vias: Sequence[Any]) -> Tuple[Any, ...]:
+        """
+        Return an immutable snapshot of ``vias``. Via lists are stacks that
+        change rarely, so all positions created with the same content share
+        one snapshot.
+        """
+        key = tuple(map(id, vias))
+        shared = self._shared_vias.get(key)
+        if shared is None or any(
+                old is not new for old, new in zip(shared, vias)):
+            shared = tuple(vias)
+            self._shared_vias[key] = shared
+        return shared
 
     def add_error_information(
-            self, node: 'ast.Node', vias: List[Any], reason_string: str,
-            conversion_rules: Rules = None) -> str:
-        """Add error information to state."""
-        item_id = str(uuid1())
-        assert item_id not in self._items
-        self._items[item_id] = Item(node, vias, reason_string)
+            self, node: 'ast.Node', vias: Sequence[Any], reason_string: str,
+            conversion_rules: Rules = None) -> int:
+        """Add error information to state and return its ID."""
+        item_id = self._next_id
+        self._next_id += 1
+        current = self._current
+        current.nodes.append(node)
+        current.vias.append(self._share_vias(vias))
+        current.reasons.append(reason_string)
         if conversion_rules is not None:
-            self._conversion_rules[item_id] = conversion_rules
+            current.rules[item_id] = conversion_rules
         return item_id
 
     def clear(self) -> None:
-        """Clear all state."""
-        self._items.clear()
-        self._conversion_rules.clear()
+        """Clear all state. IDs are never reused."""
+        with self._lock:
+            self._current = ErrorInformation(self._next_id)
+            self._restored = []
+        self._shared_vias.clear()
+
+    def clear_shared_vias(self) -> None:
+        """
+        Forget the snapshots of via lists, which are only shared within one
+        translation; needed if the state is not cleared between translations.
+        """
+        self._shared_vias.clear()
+
+    def checkpoint(self) -> int:
+        """Return a marker of the current state to be used with ``export``."""
+        return self._next_id
+
+    def export(self, checkpoint: int = 0) -> ErrorInformation:
+        """Return all error information added since ``checkpoint``."""
+        with self._lock:
+            start = max(checkpoint, self._current.start)
+            return self._current.copy(start, self._current.end)
+
+    def restore(self, state: ErrorInformation) -> None:
+        """Add previously exported error information to state."""
+        with self._lock:
+            self._restore(state)
+
+    def _restore(self, state: ErrorInformation) -> None:
+        current = self._current
+        if state.end > current.start:
+            # Still (partly) part of the current information.
+            for item_id in range(max(state.start, current.start), state.end):
+                index = item_id - current.start
+                state_index = item_id - state.start
+                current.nodes[index] = state.nodes[state_index]
+                current.vias[index] = state.vias[state_index]
+                current.reasons[index] = state.reasons[state_index]
+                if item_id in state.rules:
+                    current.rules[item_id] = state.rules[item_id]
+            if state.start >= current.start:
+                return
+        # Copy, s.t. discarding entries does not affect the exported state.
+        restored = state.copy(state.start, min(state.end, current.start))
+        starts = [info.start for info in self._restored]
+        index = bisect.bisect_left(starts, restored.start)
+        if index < len(starts) and starts[index] == restored.start:
+            self._restored[index] = restored
+        else:
+            self._restored.insert(index, restored)
+
+    def discard(self, start: int, end: int) -> None:
+        """
+        Drop the error information with IDs in ``[start, end)``, which is
+        no longer needed once all errors referring to it have been converted.
+        """
+        with self._lock:
+            self._current.discard(start, end)
+            self._current.trim()
+            for info in self._restored:
+                info.discard(start, end)
+            self._restored = [info for info in self._restored
+                              if not (start <= info.start and info.end <= end)]
+
+    def get_node(self, node_id: Union[int, str]) -> Optional['ast.Node']:
+        """Get the node stored for the given ``node_id``, if any."""
+        item = self._lookup(node_id)
+        return item.node if item is not None else None
+
+    def _find(self, item_id: int) -> Optional[ErrorInformation]:
+        if item_id >= self._current.start:
+            if item_id < self._current.end:
+                return self._current
+            return None
+        starts = [info.start for info in self._restored]
+        index = bisect.bisect_right(starts, item_id) - 1
+        if index >= 0 and item_id < self._restored[index].end:
+            return self._restored[index]
+        return None
+
+    def _lookup(self, node_id: Union[int, str]) -> Optional[Item]:
+        try:
+            item_id = int(str(node_id))
+        except ValueError:
+            return None
+        with self._lock:
+            info = self._find(item_id)
+            return info.get_item(item_id) if info else None
 
     def convert(
             self,
@@ -58,23 +233,29 @@ class ErrorManager:
         ]
         return new_errors
 
-    def get_vias(self, node_id: str) -> List[Any]:
+    def get_vias(self, node_id: Union[int, str]) -> Sequence[Any]:
         """Get via information for the given ``node_id``."""
-        item = self._items[node_id]
+        item = self._lookup(node_id)
+        if item is None:
+            raise KeyError(node_id)
         return item.vias
 
     def _get_item(self, pos: 'ast.AbstractSourcePosition') -> Optional[Item]:
         if hasattr(pos, 'id'):
-            node_id = pos.id()
-            return self._items[node_id]
+            return self._lookup(pos.id())
         return None
 
     def _get_conversion_rules(
             self, position: 'ast.AbstractSourcePosition') -> Optional[Rules]:
         if hasattr(position, 'id'):
-            node_id = position.id()
-            if node_id in self._conversion_rules:
-                return self._conversion_rules[node_id]
+            try:
+                item_id = int(str(position.id()))
+            except ValueError:
+                return None
+            with self._lock:
+                info = self._find(item_id)
+                if info:
+                    return info.rules.get(item_id)
         return None
 
     def _try_get_rules_workaround(
@@ -8,17 +8,24 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """Wrappers for Scala error objects."""
 
 
+import os
+
 from typing import Any, List
 
+from nagini_translation.lib import builtin_positions
 from nagini_translation.lib.errors.messages import ERRORS, REASONS, VAGUE_REASONS
 from nagini_translation.lib.errors.rules import Rules
 
 
 class Position:
-    """Wrapper around ``AbstractSourcePosition``."""
+    """
+    Wrapper around ``AbstractSourcePosition``, or the placeholder of a
+    position in a serialized builtin program (see ``builtin_positions``).
+    """
 
     def __init__(self, position: 'ast.AbstractSourcePosition') -> None:
         self._position = position
+        self._builtin = builtin_positions.resolve(position)
         if hasattr(position, 'id'):
             self.node_id = position.id()
         else:
@@ -27,19 +34,28 @@ class Position:
     @property
     def file_name(self) -> str:
         """Return ``file``."""
+        if self._builtin:
+            return self._builtin[0]
         return self._position.file().toString()
 
     @property
     def line(self) -> int:
         """Return ``start.line``."""
+        if self._builtin:
+            return self._builtin[1]
         return self._position.line()
 
     @property
     def column(self) -> int:
         """Return ``start.column``."""
+        if self._builtin:
+            return self._builtin[2]
         return self._position.column()
 
     def __str__(self) -> str:
+        if self._builtin:
+            file, line, column = self._builtin[:3]
+            return '{}@{}.{}'.format(os.path.basename(file), line, column)
         return str(self._position)
 
 
@@ -20,9 +20,25 @@ class JVM:
         self.scala = jpype.JPackage('scala')
         self.viper = jpype.JPackage('viper')
         self.fastparse = jpype.JPackage('fastparse')
+        self._object_array = jpype.JArray(jpype.JClass('java.lang.Object'))
 
     def get_proxy(self, supertype, instance):
         return jpype.JProxy(supertype, inst=instance)
 
+    def to_array(self, elements) -> 'java.lang.Object[]':
+        """
+        Converts the given Python sequence to a Java array in a single call
+        across the bridge.
+        """
+        return self._object_array(elements)
+
+    def attach_thread(self) -> None:
+        """
+        Attaches the current Python thread to the JVM; needed before a thread
+        other than the main thread calls into Java.
+        """
+        if not jpype.isThreadAttachedToJVM():
+            jpype.attachThreadToJVM()
+
     def is_known_class(self, class_object) -> bool:
         return not isinstance(class_object, jpype.JPackage)
@@ -165,9 +165,23 @@ class PythonModule(PythonScope, ContainerInterface, PythonStatementContainer):
         self.file = file
         self.defined_var = None
         self.names_var = None
+        # Included modules with and without the global module, computed by
+        # freeze() once the imports no longer change.
+        self._included_modules = None
         if global_module and type_prefix != '__main__':
             self.add_builtin_vars()
 
+    def freeze(self) -> None:
+        """
+        Precomputes the modules included in this module. Must only be called
+        once the imports of all modules no longer change.
+        """
+        self._included_modules = {
+            include_global: self.get_included_modules(
+                include_global=include_global)
+            for include_global in (True, False)
+        }
+
     def add_builtin_vars(self) -> None:
         """
         Adds builtin variables that are defined in every module.
@@ -265,6 +279,8 @@ class PythonModule(PythonScope, ContainerInterface, PythonStatementContainer):
         module, optionally including the global module, but excluding the modules in the
         given set (to prevent infinite recursion in case of cyclic imports).
         """
+        if not exclude and self._included_modules is not None:
+            return list(self._included_modules[include_global])
         result = [self]
         for p in self.from_imports:
             result.extend(p.get_included_modules(exclude + (self,),
@@ -388,6 +404,65 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
         self.is_adt = name == 'ADT' # This flag is set when the class is
         # defining an algebraic data type or one of its constructors.
         # This flag is set transitively across subclasses.
+        # Lookup tables for all members defined in this class or a
+        # superclass, computed by freeze() once the class no longer changes.
+        self._frozen = False
+        self._method_table = None
+        self._function_table = None
+        self._predicate_table = None
+        self._field_table = None
+        self._static_field_table = None
+        self._all_methods = None
+        self._all_static_fields = None
+        self._all_fields = None
+        self._all_subclasses = None
+
+    def freeze(self) -> None:
+        """
+        Precomputes the tables used to look up the members this class defines
+        or inherits, its fields and its subclasses. Must only be called once
+        neither this class nor any of its super- or subclasses change anymore,
+        i.e., after the analysis result has been processed.
+        """
+        mro = []
+        cls = self
+        while cls is not None:
+            mro.append(cls.python_class)
+            cls = cls.superclass
+        methods = {}
+        functions = {}
+        predicates = {}
+        fields = {}
+        static_fields = {}
+        # Go from the root to this class, s.t. definitions in subclasses
+        # override inherited ones.
+        for cls in reversed(mro):
+            methods.update(cls.static_methods)
+            methods.update(cls.methods)
+            functions.update(cls.functions)
+            predicates.update(cls.predicates)
+            fields.update(cls.fields)
+            static_fields.update(cls.static_fields)
+        self._method_table = methods
+        self._function_table = functions
+        self._predicate_table = predicates
+        self._field_table = fields
+        self._static_field_table = static_fields
+        self._all_methods = {name for cls in mro for name in cls.methods}
+        self._all_static_fields = {name for cls in mro
+                                   for name in cls.static_fields}
+        self._all_fields = [field for cls in mro
+                            for field in cls.fields.values()
+                            if isinstance(field, PythonField) and
+                            field.inherited is None]
+        subclasses = []
+        to_visit = [self]
+        while to_visit:
+            cls = to_visit.pop()
+            subclasses.append(cls)
+            to_visit.extend(reversed(cls.direct_subclasses))
+        self._all_subclasses = subclasses
+        self._frozen = True
 
     @property
     def is_defining_adt(self) -> bool:
@@ -434,6 +509,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
         """
         Returns all direct or indirect subclasses of this class.
         """
+        if self._frozen:
+            return self._all_subclasses
         res = [self]
         for sub in self.direct_subclasses:
             res.extend(sub.all_subclasses)
@@ -452,6 +529,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
 
     @property
     def all_methods(self) -> Set[str]:
+        if self._frozen:
+            return self._all_methods
         result = set()
         if self.superclass:
             result |= self.superclass.all_methods
@@ -460,6 +539,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
 
     @property
     def all_static_fields(self) -> Set[str]:
+        if self._frozen:
+            return self._all_static_fields
         result = set()
         if self.superclass:
             result |= self.superclass.all_static_fields
@@ -509,6 +590,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
         """
         Returns the field with the given name in this class or a superclass.
         """
+        if self._frozen:
+            return self._field_table.get(name)
         if name in self.fields:
             return self.fields[name]
         elif self.superclass is not None:
@@ -521,6 +604,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
         Returns the static field with the given name in this class or a
         superclass.
         """
+        if self._frozen:
+            return self._static_field_table.get(name)
         if name in self.static_fields:
             return self.static_fields[name]
         elif self.superclass is not None:
@@ -532,6 +617,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
         """
         Returns the method with the given name in this class or a superclass.
         """
+        if self._frozen:
+            return self._method_table.get(name)
         if name in self.methods:
             return self.methods[name]
         elif name in self.static_methods:
@@ -546,6 +633,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
         Check the function with the given name exists this class or
         superclass.
         """
+        if self._frozen:
+            return name in self._function_table
         return name in self.functions or (self.superclass.has_function(name)
                if self.superclass is not None else False)
 
@@ -553,6 +642,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
         """
         Returns the function with the given name in this class or a superclass.
         """
+        if self._frozen:
+            return self._function_table.get(name)
         if name in self.functions:
             return self.functions[name]
         elif self.superclass is not None:
@@ -574,6 +665,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
         """
         Returns the predicate with the given name in this class or a superclass.
         """
+        if self._frozen:
+            return self._predicate_table.get(name)
         if name in self.predicates:
             return self.predicates[name]
         elif self.superclass is not None:
@@ -583,6 +676,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
 
     @property
     def all_fields(self) -> List['PythonField']:
+        if self._frozen:
+            return self._all_fields
         fields = []
         cls = self
         while cls is not None:
@@ -597,6 +692,8 @@ class PythonClass(PythonType, PythonNode, PythonScope, ContainerInterface):
         """
         Returns a list of fields defined in the given class or its superclasses.
         """
+        if self._frozen:
+            return [field.sil_field for field in self._all_fields]
         fields = []
         cls = self
         while cls is not None:
@@ -1006,6 +1103,7 @@ class PythonMethod(PythonNode, PythonScope, ContainerInterface, PythonStatementC
         self.predicate = False
         self.all_low = False
         self.preserves_low = False
+        self.timeout = None  # direct
         self.contract_only = contract_only
         self.interface = interface
         self.interface_name = None  # Name to be used in error messages, if different from
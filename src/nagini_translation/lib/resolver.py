@@ -45,7 +45,7 @@ from nagini_translation.lib.util import (
     InvalidProgramException,
     UnsupportedException,
 )
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 
 def get_target(node: ast.AST,
@@ -557,4 +557,82 @@ def pairwise_supertype(t1: PythonType, t2: PythonType) -> Optional[PythonType]:
         return None
     if not t1.superclass:
         return pairwise_supertype(t2.superclass, t1)
-    return pairwise_supertype(t2, t1.superclass)
\ No newline at end of file
+    return pairwise_supertype(t2, t1.superclass)
+
+
+class _LookupRecorder(ContainerInterface):
+    """
+    Stands in for a container whose contents can change during the
+    translation (the translation context or the current method) in a list of
+    containers, and records what the names a lookup consulted were bound to.
+    """
+
+    def __init__(self, contents: Any) -> None:
+        self.contents = contents
+        self.consulted = {}  # type: Dict[str, Optional[PythonNode]]
+
+    def get_contents(self, only_top: bool) -> '_LookupRecorder':
+        return self
+
+    def __contains__(self, name: str) -> bool:
+        value = self.contents[name] if name in self.contents else None
+        self.consulted[name] = value
+        return value is not None
+
+    def __getitem__(self, name: str) -> PythonNode:
+        return self.contents[name]
+
+
+def _unchanged(contents: Any, consulted: Dict[str, Optional[PythonNode]]
+               ) -> bool:
+    """
+    Checks if all given names are still bound to the same nodes.
+    """
+    for name, value in consulted.items():
+        current = contents[name] if name in contents else None
+        if current is not value:
+            return False
+    return True
+
+
+class ResolutionCache:
+    """
+    Memoizes get_target and get_type per AST node, immediate container and
+    current class. The aliases of the translation context and the variables
+    of the current method change during the translation, so every result is
+    stored together with the bindings of the names it looked up there, and is
+    only reused while they are unchanged. The cache holds on to the nodes it
+    has seen, so it is cleared after every translation.
+    """
+
+    def __init__(self) -> None:
+        self._results = {}
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def resolve(self, resolve: Callable, node: ast.AST, ctx: 'Context',
+                containers: List[ContainerInterface],
+                container: PythonNode) -> Any:
+        """
+        Returns the result of ``resolve`` (get_target or get_type) for the
+        given node, looking first in the aliases of the given context and then
+        in the given containers.
+        """
+        aliases = ctx.var_aliases
+        local = isinstance(container, (PythonMethod, PythonIOOperation))
+        contents = container.get_contents(True) if local else None
+        key = (resolve, node, container, ctx.current_class)
+        entry = self._results.get(key)
+        if (entry is not None and _unchanged(aliases, entry[1]) and
+                (not local or _unchanged(contents, entry[2]))):
+            return entry[0]
+        alias_recorder = _LookupRecorder(aliases)
+        local_recorder = _LookupRecorder(contents)
+        if local:
+            containers = [local_recorder if lookup is container else lookup
+                          for lookup in containers]
+        result = resolve(node, [alias_recorder] + containers, container)
+        self._results[key] = (result, alias_recorder.consulted,
+                              local_recorder.consulted)
+        return result
@@ -0,0 +1,68 @@
+"""
+Copyright (c) 2019 ETH Zurich
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+"""
+Collects the names referenced by the members of (parsed) Silver programs,
+which is needed to emit only the parts of the builtin preamble that a
+translated program can reach.
+"""
+
+import re
+
+from typing import Dict, FrozenSet, List, Tuple
+
+
+IDENTIFIER = re.compile(r"[A-Za-z_$][\w$']*")
+
+
+def referenced_names(node: 'silver.ast.Node') -> FrozenSet[str]:
+    """
+    Returns all identifiers occurring in the given Silver node. This
+    over-approximates the names of the functions, domain functions,
+    predicates, methods and fields the node references, since it also
+    contains e.g. names of local variables and types.
+    """
+    return frozenset(IDENTIFIER.findall(str(node)))
+
+
+class ProgramReferences:
+    """
+    Names referenced by the members of a Silver program.
+    """
+
+    def __init__(self, prog: 'silver.ast.Program',
+                 viper_ast: 'ViperAST') -> None:
+        # Names referenced by every function, predicate and method.
+        self.members = {}  # type: Dict[str, FrozenSet[str]]
+        # For every domain, the names of its functions and the names
+        # referenced by each of its axioms, in order.
+        self.domains = {}  # type: Dict[str, Tuple[FrozenSet[str], List[FrozenSet[str]]]]
+        for seq in (prog.functions(), prog.predicates(), prog.methods()):
+            for member in viper_ast.to_list(seq):
+                self.members[member.name()] = referenced_names(member)
+        for domain in viper_ast.to_list(prog.domains()):
+            functions = frozenset(func.name() for func in
+                                  viper_ast.to_list(domain.functions()))
+            axioms = [referenced_names(axiom)
+                      for axiom in viper_ast.to_list(domain.axioms())]
+            self.domains[domain.name()] = (functions, axioms)
+
+
+_references = {}  # type: Dict[int, Tuple['silver.ast.Program', ProgramReferences]]
+
+
+def get_references(prog: 'silver.ast.Program',
+                   viper_ast: 'ViperAST') -> ProgramReferences:
+    """
+    Returns the references of the given program. Since the builtin programs
+    are loaded only once, the result is computed only once per program.
+    """
+    entry = _references.get(id(prog))
+    if entry is None or entry[0] is not prog:
+        entry = (prog, ProgramReferences(prog, viper_ast))
+        _references[id(prog)] = entry
+    return entry[1]
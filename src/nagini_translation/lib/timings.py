@@ -0,0 +1,52 @@
+"""
+Copyright (c) 2019 ETH Zurich
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+import json
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict
+
+
+class Timings:
+    """
+    Wall-clock durations of the phases of a translation and verification run,
+    and of the verification of individual members of the Viper program.
+    """
+
+    def __init__(self) -> None:
+        self.phases = OrderedDict()  # type: Dict[str, float]
+        # Verification time of every member verified as a separate unit.
+        self.members = OrderedDict()  # type: Dict[str, float]
+        # Python origin of the tracked members, by Silver name.
+        self.sources = {}  # type: Dict[str, str]
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Measures the time spent in the body of the with statement and adds it
+        to the phase with the given name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def add_member(self, name: str, duration: float) -> None:
+        self.members[name] = self.members.get(name, 0.0) + duration
+
+    def to_json(self) -> str:
+        members = [{'name': name,
+                    'source': self.sources.get(name),
+                    'seconds': duration}
+                   for name, duration in self.members.items()]
+        members.sort(key=lambda member: -member['seconds'])
+        return json.dumps({'phases': self.phases, 'members': members},
+                          indent=2)
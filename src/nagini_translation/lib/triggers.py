@@ -0,0 +1,136 @@
+"""
+Copyright (c) 2019 ETH Zurich
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+"""
+Static analysis of quantifier bodies on the Python AST: finds terms that can
+serve as triggers for a quantified variable, and trigger terms that can give
+rise to matching loops.
+
+A term can be a trigger if it is a call, a subscript or an ``in`` test that
+mentions the quantified variable, and neither it nor any of its subterms
+contain arithmetic or logical operators. A trigger term may cause a matching
+loop if the quantifier body contains another term of the same shape (same
+function, collection or container) in which the variable occurs inside a
+larger expression: instantiating the quantifier for one term then creates a
+new term that matches the trigger again, e.g. ``xs[i]`` and ``xs[i + 1]``.
+"""
+
+import ast
+
+from nagini_contracts.contracts import CONTRACT_FUNCS, CONTRACT_WRAPPER_FUNCS
+from typing import List, Optional, Tuple
+
+
+def _is_in_test(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Compare) and len(node.ops) == 1 and
+            isinstance(node.ops[0], ast.In))
+
+
+def _is_contract_call(node: ast.Call) -> bool:
+    return (isinstance(node.func, ast.Name) and
+            node.func.id in CONTRACT_FUNCS + CONTRACT_WRAPPER_FUNCS)
+
+
+def term_key(node: ast.AST) -> Optional[Tuple[str, str]]:
+    """
+    Returns the shape of the given term, i.e., which function it calls, which
+    collection it indexes or in which container it tests membership, or None
+    if it is none of these.
+    """
+    if isinstance(node, ast.Call) and not _is_contract_call(node):
+        return 'call', ast.dump(node.func)
+    if isinstance(node, ast.Subscript):
+        return 'subscript', ast.dump(node.value)
+    if _is_in_test(node):
+        return 'in', ast.dump(node.comparators[0])
+    return None
+
+
+def _arguments(node: ast.AST) -> List[ast.AST]:
+    """
+    Returns the arguments of the given term, in which the quantified variable
+    may occur.
+    """
+    if isinstance(node, ast.Call):
+        return list(node.args) + [kw.value for kw in node.keywords]
+    if isinstance(node, ast.Subscript):
+        return [node.slice]
+    return [node.left]
+
+
+def mentions(node: ast.AST, var_name: str) -> bool:
+    """
+    Checks if the given node mentions the variable with the given name.
+    """
+    return any(isinstance(n, ast.Name) and n.id == var_name
+               for n in ast.walk(node))
+
+
+def _is_valid_subterm(node: ast.AST) -> bool:
+    if isinstance(node, (ast.Name, ast.Num, ast.Str, ast.NameConstant)):
+        return True
+    if isinstance(node, ast.Attribute):
+        return _is_valid_subterm(node.value)
+    if isinstance(node, ast.Index):
+        # Subscript slices are wrapped in Index nodes.
+        return _is_valid_subterm(node.value)
+    if term_key(node) is None:
+        return False
+    if isinstance(node, ast.Call) and not _is_valid_subterm(node.func):
+        return False
+    if isinstance(node, ast.Subscript) and not _is_valid_subterm(node.value):
+        return False
+    if _is_in_test(node) and not _is_valid_subterm(node.comparators[0]):
+        return False
+    return all(_is_valid_subterm(arg) for arg in _arguments(node))
+
+
+def trigger_candidates(body: ast.AST, var_name: str) -> List[ast.AST]:
+    """
+    Returns the terms in the given quantifier body that can be triggers for
+    the variable with the given name. Terms that contain another candidate are
+    left out.
+    """
+    candidates = []
+    dumps = set()
+    for node in ast.walk(body):
+        if (term_key(node) is None or not mentions(node, var_name) or
+                not _is_valid_subterm(node)):
+            continue
+        dump = ast.dump(node)
+        if dump not in dumps:
+            dumps.add(dump)
+            candidates.append(node)
+    return [candidate for candidate in candidates
+            if not any(n is not candidate and ast.dump(n) in dumps
+                       for n in ast.walk(candidate))]
+
+
+def find_matching_loops(trigger: ast.AST, body: ast.AST,
+                        var_name: str) -> List[ast.AST]:
+    """
+    Returns the terms in the given quantifier body that match the given
+    trigger term and contain the variable with the given name inside a larger
+    expression, i.e., the terms which can make the trigger cause a matching
+    loop.
+    """
+    key = term_key(trigger)
+    if key is None:
+        return []
+    trigger_dump = ast.dump(trigger)
+    result = []
+    for node in ast.walk(body):
+        if term_key(node) != key or ast.dump(node) == trigger_dump:
+            continue
+        for arg in _arguments(node):
+            if isinstance(arg, ast.Index):
+                arg = arg.value
+            if (mentions(arg, var_name) and
+                    not (isinstance(arg, ast.Name) and arg.id == var_name)):
+                result.append(node)
+                break
+    return result
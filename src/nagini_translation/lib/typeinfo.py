@@ -5,17 +5,21 @@ License, v. 2.0. If a copy of the MPL was not distributed with this
 file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
+import ast
+import hashlib
+import json
 import logging
 import mypy.build
 import os
 
 from mypy.build import BuildSource
+from mypy.fixup import TypeFixer
 from nagini_translation.lib import config
 from nagini_translation.lib.constants import IGNORED_IMPORTS, LITERALS
 from nagini_translation.lib.util import (
     construct_lambda_prefix,
 )
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 logger = logging.getLogger('nagini_translation.lib.typeinfo')
@@ -35,8 +39,67 @@ class TypeException(Exception):
         self.messages = messages
 
 
+class TypeInterner:
+    """
+    Hash-conses mypy types: maps every type to a canonical key which is the
+    same object for all structurally equal types, s.t. types can be compared
+    by identity. Only instances, tuples, unions, None and void have a key;
+    types containing other types (e.g. type variables) have none.
+    """
+
+    def __init__(self) -> None:
+        self._keys = {}  # type: Dict[int, Tuple[Any, Optional[Tuple]]]
+        self._canonical = {}  # type: Dict[Tuple, Tuple]
+
+    def intern(self, type) -> Optional[Tuple]:
+        """
+        Returns the canonical key of the given type, or None if it has none.
+        """
+        entry = self._keys.get(id(type))
+        if entry is not None and entry[0] is type:
+            return entry[1]
+        key = self._compute_key(type)
+        if key is not None:
+            key = self._canonical.setdefault(key, key)
+        # Keep the type alive, s.t. its id is not reused.
+        self._keys[id(type)] = (type, key)
+        return key
+
+    def _compute_key(self, type) -> Optional[Tuple]:
+        if isinstance(type, mypy.nodes.TypeInfo):
+            return 'class', type._fullname
+        if isinstance(type, mypy.types.Instance):
+            args = self._intern_all(type.args)
+            if args is None:
+                return None
+            return 'instance', type.type._fullname, type.erased, args
+        if isinstance(type, mypy.types.TupleType):
+            items = self._intern_all(type.items)
+            fallback = self.intern(type.fallback)
+            if items is None or fallback is None:
+                return None
+            return 'tuple', items, fallback
+        if isinstance(type, mypy.types.UnionType):
+            items = self._intern_all(type.items)
+            if items is None:
+                return None
+            return 'union', items
+        if isinstance(type, mypy.types.NoneTyp):
+            return 'none',
+        if isinstance(type, mypy.types.Void):
+            return 'void',
+        return None
+
+    def _intern_all(self, types) -> Optional[Tuple]:
+        keys = tuple(self.intern(type) for type in types)
+        if None in keys:
+            return None
+        return keys
+
+
 class TypeVisitor(mypy.traverser.TraverserVisitor):
-    def __init__(self, type_map, path, ignored_lines):
+    def __init__(self, type_map, path, ignored_lines,
+                 interner: TypeInterner = None):
         self.prefix = []
         self.all_types = {}
         self.alt_types = {}
@@ -45,6 +108,7 @@ class TypeVisitor(mypy.traverser.TraverserVisitor):
         self.ignored_lines = ignored_lines
         self.type_aliases = {}
         self.type_vars = {}
+        self.interner = interner or TypeInterner()
 
     def _is_result_call(self, node: mypy.nodes.Node) -> bool:
         """Checks if call is either ``Result`` or ``RaisedException``."""
@@ -177,6 +241,12 @@ class TypeVisitor(mypy.traverser.TraverserVisitor):
         self.all_types[key] = type
 
     def type_equals(self, t1, t2):
+        if t1 is t2:
+            return True
+        key1 = self.interner.intern(t1)
+        key2 = self.interner.intern(t2)
+        if key1 is not None and key2 is not None:
+            return key1 is key2
         if str(t1) == str(t2):
             return True
         if (isinstance(t1, mypy.types.FunctionLike) and
@@ -232,20 +302,142 @@ class TypeVisitor(mypy.traverser.TraverserVisitor):
             super().visit_comparison_expr(o)
 
 
+MODULE_TYPE_KEY = '.nagini_module'
+
+
+def _serialize_type(type) -> Any:
+    if isinstance(type, str):
+        # Module references are represented by their full name.
+        return {MODULE_TYPE_KEY: type}
+    return type.serialize()
+
+
+def _deserialize_type(data: Any, fixer: TypeFixer):
+    if isinstance(data, dict) and MODULE_TYPE_KEY in data:
+        return data[MODULE_TYPE_KEY]
+    result = mypy.types.Type.deserialize(data)
+    result.accept(fixer)
+    return result
+
+
+class ModuleTypes:
+    """
+    The type information collected for a single module. Can be stored as a
+    snapshot s.t. modules mypy loads from its incremental cache (and thus does
+    not type check again) do not have to be visited again either.
+    """
+
+    def __init__(self, path: str, digest: str) -> None:
+        self.path = path
+        self.digest = digest
+        self.all_types = {}
+        self.alt_types = {}
+        self.type_aliases = {}
+        self.type_vars = {}
+
+    @classmethod
+    def from_visitor(cls, path: str, digest: str,
+                     visitor: 'TypeVisitor') -> 'ModuleTypes':
+        result = cls(path, digest)
+        result.all_types = visitor.all_types
+        result.alt_types = visitor.alt_types
+        result.type_aliases = visitor.type_aliases
+        result.type_vars = visitor.type_vars
+        return result
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'digest': self.digest,
+            'all_types': [[list(key), _serialize_type(type)]
+                          for key, type in self.all_types.items()],
+            'alt_types': [[list(key),
+                           [[line, col, _serialize_type(type)]
+                            for (line, col), type in alts.items()]]
+                          for key, alts in self.alt_types.items()],
+            'type_aliases': [[list(key), _serialize_type(type)]
+                             for key, type in self.type_aliases.items()],
+            'type_vars': [[list(key), _serialize_type(bound),
+                           [_serialize_type(value) for value in values]]
+                          for key, (bound, values) in self.type_vars.items()],
+        }
+
+    @classmethod
+    def deserialize(cls, data: Dict[str, Any],
+                    fixer: TypeFixer) -> 'ModuleTypes':
+        result = cls(data['path'], data['digest'])
+        for key, type in data['all_types']:
+            result.all_types[tuple(key)] = _deserialize_type(type, fixer)
+        for key, alts in data['alt_types']:
+            result.alt_types[tuple(key)] = {
+                (line, col): _deserialize_type(type, fixer)
+                for line, col, type in alts
+            }
+        for key, type in data['type_aliases']:
+            result.type_aliases[tuple(key)] = _deserialize_type(type, fixer)
+        for key, bound, values in data['type_vars']:
+            result.type_vars[tuple(key)] = (
+                _deserialize_type(bound, fixer),
+                [_deserialize_type(value, fixer) for value in values])
+        return result
+
+
+class Scope:
+    """
+    Node of the trie that indexes the collected types by scope. The path from
+    the root to a node is the qualified name of the node; the node holds the
+    type (and alternative types) of that name, if any.
+    """
+
+    __slots__ = ('children', 'type', 'alts')
+
+    def __init__(self) -> None:
+        self.children = {}  # type: Dict[str, Scope]
+        self.type = None
+        self.alts = None
+
+
 class TypeInfo:
     """
     Provides type information for all variables and functions in a given
     Python module.
+    If a cache directory is given, mypy runs in incremental mode, and the type
+    information of every module is stored as a snapshot which is loaded
+    instead of visiting the module if mypy did not need to check it again.
     """
 
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None):
         self.all_types = {}
         self.alt_types = {}
         self.files = {}
         self.type_aliases = {}
         self.type_vars = {}
+        self.cache_dir = cache_dir
+        self.interner = TypeInterner()
+        self._scopes = Scope()
+        self._prefixes = {}
 
-    def _create_options(self, strict_optional: bool):
+    def _index(self) -> None:
+        """
+        Builds the trie of scopes from the collected types and the map from
+        absolute module paths to module names.
+        """
+        self._scopes = Scope()
+        for key, type in self.all_types.items():
+            scope = self._scopes
+            for part in key:
+                child = scope.children.get(part)
+                if child is None:
+                    child = Scope()
+                    scope.children[part] = child
+                scope = child
+            scope.type = type
+            scope.alts = self.alt_types.get(key)
+        self._prefixes = {}
+        for prefix, path in self.files.items():
+            self._prefixes.setdefault(os.path.abspath(path), prefix)
+
+    def _create_options(self, strict_optional: bool, incremental: bool = False):
         """
         Creates an Options object for mypy and activates strict optional typing
         based on the given argument.
@@ -260,8 +452,96 @@ class TypeInfo:
         # enable it like this
         mypy.experiments.STRICT_OPTIONAL = strict_optional
         result.fast_parser = True
+        if incremental:
+            # Results for both settings must not overwrite each other.
+            sub_dir = 'strict' if strict_optional else 'non_strict'
+            result.incremental = True
+            result.cache_dir = os.path.join(self.cache_dir, 'mypy', sub_dir)
         return result
 
+    def _build(self, filename: str, strict_optional: bool,
+               incremental: bool) -> mypy.build.BuildResult:
+        options = self._create_options(strict_optional, incremental)
+        return mypy.build.build([BuildSource(filename, None, None)], options,
+                                bin_dir=config.mypy_dir)
+
+    def _snapshot_path(self, module_name: str) -> str:
+        return os.path.join(self.cache_dir, 'snapshots', module_name + '.json')
+
+    def _store_snapshot(self, module_name: str, types: ModuleTypes) -> None:
+        try:
+            data = json.dumps(types.serialize())
+        except NotImplementedError:
+            # Some type cannot be serialized; the module will be type checked
+            # from scratch the next time.
+            return
+        path = self._snapshot_path(module_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(data)
+
+    def _load_snapshot(self, module_name: str, digest: str,
+                       modules: Dict[str, mypy.nodes.MypyFile]) -> Optional[ModuleTypes]:
+        try:
+            with open(self._snapshot_path(module_name), 'r') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning('Ignoring corrupt type snapshot of %s: %s',
+                           module_name, e)
+            return None
+        if data['digest'] != digest:
+            return None
+        return ModuleTypes.deserialize(data, TypeFixer(modules))
+
+    def _digest(self, path: str) -> str:
+        with open(path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+
+    def _collect_types(self, result: mypy.build.BuildResult) -> bool:
+        """
+        Collects the type information of all modules in the given build result.
+        Returns False if a module was not type checked in the build and no
+        valid snapshot of its types exists.
+        """
+        self.all_types = {}
+        self.alt_types = {}
+        self.files = {}
+        self.type_aliases = {}
+        self.type_vars = {}
+        for name, file in result.files.items():
+            if name in IGNORED_IMPORTS:
+                continue
+            path = file.path
+            digest = self._digest(path) if self.cache_dir else None
+            if not self.cache_dir or file.defs:
+                # The module has been type checked in this build.
+                visitor = TypeVisitor(result.types, name, file.ignored_lines,
+                                      self.interner)
+                visitor.prefix = name.split('.')
+                file.accept(visitor)
+                module_types = ModuleTypes.from_visitor(path, digest, visitor)
+                if self.cache_dir:
+                    self._store_snapshot(name, module_types)
+            else:
+                # Modules loaded from mypy's cache have no definitions.
+                module_types = self._load_snapshot(name, digest,
+                                                   result.files)
+                if module_types is None:
+                    with open(path, 'r') as source:
+                        if ast.parse(source.read()).body:
+                            return False
+                    # The module is actually empty.
+                    module_types = ModuleTypes(path, digest)
+            self.files[name] = path
+            self.all_types.update(module_types.all_types)
+            self.alt_types.update(module_types.alt_types)
+            self.type_aliases.update(module_types.type_aliases)
+            self.type_vars.update(module_types.type_vars)
+        self._index()
+        return True
+
     def check(self, filename: str) -> bool:
         """
         Typechecks the given file and collects all type information needed for
@@ -274,76 +554,64 @@ class TypeInfo:
             raise TypeException(errors)
 
         try:
-            options_strict = self._create_options(True)
-            res_strict = mypy.build.build(
-                [BuildSource(filename, None, None)],
-                options_strict, bin_dir=config.mypy_dir
-                )
+            incremental = self.cache_dir is not None
+            res_strict = self._build(filename, True, incremental)
 
             if res_strict.errors:
                 # Run mypy a second time with strict optional checking disabled,
                 # s.t. we don't get overapproximated none-related errors.
-                options_non_strict = self._create_options(False)
-                res_non_strict = mypy.build.build(
-                    [BuildSource(filename, None, None)],
-                    options_non_strict, bin_dir=config.mypy_dir
-                )
+                res_non_strict = self._build(filename, False, incremental)
                 if res_non_strict.errors:
                     report_errors(res_non_strict.errors)
-            for name, file in res_strict.files.items():
-                if name in IGNORED_IMPORTS:
-                    continue
-                self.files[name] = file.path
-                visitor = TypeVisitor(res_strict.types, name,
-                                      file.ignored_lines)
-                visitor.prefix = name.split('.')
-                file.accept(visitor)
-                self.all_types.update(visitor.all_types)
-                self.alt_types.update(visitor.alt_types)
-                self.type_aliases.update(visitor.type_aliases)
-                self.type_vars.update(visitor.type_vars)
+            if not self._collect_types(res_strict):
+                # Some module was loaded from mypy's cache, but we have no
+                # snapshot of its types; check everything from scratch.
+                res_strict = self._build(filename, True, False)
+                self._collect_types(res_strict)
             return True
         except mypy.errors.CompileError as e:
             report_errors(e.messages)
 
     def get_type_prefix(self, name: str) -> str:
-        name = os.path.abspath(name)
-        for prefix, path in self.files.items():
-            path = os.path.abspath(path)
-            if path == name:
-                return prefix
-        return None
+        return self._prefixes.get(os.path.abspath(name))
 
     def get_type(self, prefix: List[str], name: str):
         """
         Looks up the inferred or annotated type for the given name in the given
-        prefix
+        prefix, or in the innermost enclosing scope that defines it.
         """
-        key = tuple(prefix + [name])
-        result = self.all_types.get(key)
-        alts = self.alt_types.get(key)
-        if result is None:
-            if not prefix:
-                return None, None
-            else:
-                return self.get_type(prefix[:len(prefix) - 1], name)
+        found = None
+        scope = self._scopes
+        for part in prefix:
+            child = scope.children.get(name)
+            if child is not None and child.type is not None:
+                found = child
+            scope = scope.children.get(part)
+            if scope is None:
+                break
         else:
-            return result, alts
+            child = scope.children.get(name)
+            if child is not None and child.type is not None:
+                found = child
+        if found is None:
+            return None, None
+        return found.type, found.alts
 
     def get_func_type(self, prefix: List[str]):
         """
         Looks up the type of the function which creates the given context
         """
-        result = self.all_types.get(tuple(prefix))
-        if result is None:
-            if len(prefix) == 0:
-                return None
-            else:
-                return self.get_func_type(prefix[:len(prefix) - 1])
-        else:
-            if isinstance(result, mypy.types.FunctionLike):
-                result = result.ret_type
-            return result
+        result = self._scopes.type
+        scope = self._scopes
+        for part in prefix:
+            scope = scope.children.get(part)
+            if scope is None:
+                break
+            if scope.type is not None:
+                result = scope.type
+        if isinstance(result, mypy.types.FunctionLike):
+            result = result.ret_type
+        return result
 
     def is_normal_type(self, type: mypy.types.Type) -> bool:
         return isinstance(type, mypy.nodes.TypeInfo)
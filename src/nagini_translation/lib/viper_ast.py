@@ -6,6 +6,7 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
 import types
+import weakref
 
 from nagini_translation.lib.constants import FUNCTION_DOMAIN_NAME
 from nagini_translation.lib.errors import error_manager, Rules
@@ -23,6 +24,24 @@ class Function0:
 LONG_SIZE = 2147483647
 
 
+class NodeFacts:
+    """
+    Information about an expression created by ViperAST that is kept on the
+    Python side, s.t. it can be queried without calling into Scala. Types and
+    purity are None if they are not known. The expression itself is only
+    referenced weakly.
+    """
+
+    __slots__ = ('node', 'typ', 'pure', 'funcname', 'args')
+
+    def __init__(self, node, typ, pure, funcname, args):
+        self.node = node
+        self.typ = typ
+        self.pure = pure
+        self.funcname = funcname
+        self.args = args
+
+
 class ViperAST:
     """
     Provides convenient access to the classes which constitute the Viper AST.
@@ -70,6 +89,22 @@ class ViperAST:
         self.Perm = getconst('Perm')
         self.sourcefile = sourcefile
         self.none = getobject(scala, 'None')
+        # Immutable collections that can be shared by all nodes.
+        self.nil = getobject(scala.collection.immutable, 'Nil')
+        self._cons = getattr(self.nil, '$colon$colon')
+        self._empty_map = scala.collection.immutable.HashMap()
+        self._wrapped_array = getobject(scala.collection.mutable,
+                                        'WrappedArray')
+        self._converters = getobject(scala.collection, 'JavaConverters')
+        # Facts about created expressions and the types of created fields,
+        # keyed by the identity of their Python proxies. Facts are dropped
+        # when the proxy they describe is garbage collected, s.t. they do
+        # not keep the translated program alive.
+        self._facts = {}
+        # Instantiations of domain functions, keyed by domain and function
+        # name, declared result type and type variable map (see
+        # _domain_func_type).
+        self._domain_func_types = {}
 
     def is_available(self) -> bool:
         """
@@ -77,6 +112,92 @@ class ViperAST:
         """
         return self.jvm.is_known_class(self.ast.Program)
 
+    def _record(self, node, typ, pure, funcname=None, args=None):
+        key = id(node)
+
+        def forget(ref):
+            facts = self._facts.get(key)
+            if facts is not None and facts.node is ref:
+                del self._facts[key]
+        try:
+            ref = weakref.ref(node, forget)
+        except TypeError:
+            # Proxies that do not support weak references are queried in
+            # Scala.
+            return node
+        self._facts[key] = NodeFacts(ref, typ, pure, funcname, args)
+        return node
+
+    def _facts_of(self, node):
+        facts = self._facts.get(id(node))
+        if facts is not None and facts.node() is node:
+            return facts
+        return None
+
+    def _typ_of(self, node):
+        facts = self._facts_of(node)
+        return facts.typ if facts is not None else None
+
+    def _pure(self, *nodes):
+        result = True
+        for node in nodes:
+            facts = self._facts_of(node)
+            if facts is None or facts.pure is None:
+                result = None
+            elif not facts.pure:
+                return False
+        return result
+
+    def typ(self, expr):
+        """
+        Returns the Silver type of the given expression, without calling into
+        Scala if the expression has been created by this object.
+        """
+        facts = self._facts_of(expr)
+        if facts is not None and facts.typ is not None:
+            return facts.typ
+        return expr.typ()
+
+    def is_pure(self, expr) -> bool:
+        """
+        Checks if the given expression is pure, without calling into Scala if
+        the expression has been created by this object.
+        """
+        facts = self._facts_of(expr)
+        if facts is not None and facts.pure is not None:
+            return facts.pure
+        return expr.isPure()
+
+    def _is_builtin_type(self, typ) -> bool:
+        return (typ is self.Int or typ is self.Bool or typ is self.Ref or
+                typ is self.Perm)
+
+    def same_type(self, left, right) -> bool:
+        """
+        Checks if the given types are equal; compares the builtin types by
+        identity.
+        """
+        if left is right:
+            return True
+        if self._is_builtin_type(left) and self._is_builtin_type(right):
+            return False
+        return left == right
+
+    def has_type(self, expr, typ) -> bool:
+        return self.same_type(self.typ(expr), typ)
+
+    def func_app(self, expr):
+        """
+        If the given expression is a function application, returns the name
+        of the function and the list of arguments, otherwise None.
+        """
+        facts = self._facts_of(expr)
+        if facts is not None and facts.funcname is not None:
+            return facts.funcname, facts.args
+        if isinstance(expr, self.ast.FuncApp):
+            return expr.funcname(), self.to_list(expr.args())
+        return None
+
     def function_domain_type(self):
         return self.DomainType(FUNCTION_DOMAIN_NAME, {}, [])
 
@@ -94,20 +215,21 @@ class ViperAST:
             list.append(lsttoappend)
 
     def to_seq(self, list):
-        result = self.scala.collection.mutable.ArraySeq(len(list))
-        for index in range(0, len(list)):
-            result.update(index, list[index])
-        return result.toList()
+        # Converts the elements in bulk instead of crossing the bridge once
+        # per element; most sequences are empty or singletons.
+        if not list:
+            return self.nil
+        if len(list) == 1:
+            return self._cons(list[0])
+        array = self.jvm.to_array(list)
+        return self._wrapped_array.make(array).toList()
 
     def to_list(self, seq):
-        result = []
-        iterator = seq.toIterator()
-        while iterator.hasNext():
-            result.append(iterator.next())
-        return result
+        java_list = self._converters.seqAsJavaListConverter(seq).asJava()
+        return list(java_list.toArray())
 
     def to_map(self, dict):
-        result = self.scala.collection.immutable.HashMap()
+        result = self._empty_map
         for k, v in dict.items():
             result = result.updated(k, v)
         return result
@@ -157,7 +279,8 @@ class ViperAST:
                             self.NoTrafos)
 
     def Field(self, name, type, position, info):
-        return self.ast.Field(name, type, position, info, self.NoTrafos)
+        result = self.ast.Field(name, type, position, info, self.NoTrafos)
+        return self._record(result, type, None)
 
     def Predicate(self, name, args, body, position, info):
         body = self.scala.Some(body) if body is not None else self.none
@@ -170,7 +293,8 @@ class ViperAST:
                                         info, self.NoTrafos)
 
     def PredicateAccessPredicate(self, loc, perm, position, info):
-        return self.ast.PredicateAccessPredicate(loc, perm, position, info, self.NoTrafos)
+        result = self.ast.PredicateAccessPredicate(loc, perm, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, False)
 
     def Fold(self, predicate, position, info):
         return self.ast.Fold(predicate, position, info, self.NoTrafos)
@@ -179,7 +303,8 @@ class ViperAST:
         return self.ast.Unfold(predicate, position, info, self.NoTrafos)
 
     def Unfolding(self, predicate, expr, position, info):
-        return self.ast.Unfolding(predicate, expr, position, info, self.NoTrafos)
+        result = self.ast.Unfolding(predicate, expr, position, info, self.NoTrafos)
+        return self._record(result, self._typ_of(expr), self._pure(expr))
 
     def SeqType(self, element_type):
         return self.ast.SeqType(element_type)
@@ -199,6 +324,26 @@ class ViperAST:
         return self.ast.DomainFunc(name, self.to_seq(args), type, unique,
                                    position, info, domain_name, self.NoTrafos)
 
+    def _domain_func_type(self, domain_name, func_name, type, type_var_map):
+        """
+        Returns the Scala type variable map, a Function0 proxy returning the
+        declared result type and the actual result type of an application of
+        the given domain function. These are shared by all applications with
+        equal result types and type variable maps.
+        """
+        key = (domain_name, func_name, type,
+               frozenset(type_var_map.items()))
+        entry = self._domain_func_types.get(key)
+        if entry is None:
+            def type_passed_apply(slf):
+                return type
+            scala_map = self.to_map(type_var_map)
+            result_type = type.substitute(scala_map) if type_var_map else type
+            entry = (scala_map, self.to_function0(type_passed_apply),
+                     result_type)
+            self._domain_func_types[key] = entry
+        return entry
+
     def DomainAxiom(self, name, expr, position, info, domain_name):
         return self.ast.DomainAxiom(name, expr, position, info, domain_name,
                                     self.NoTrafos)
@@ -211,22 +356,14 @@ class ViperAST:
 
     def DomainFuncApp(self, func_name, args, type_passed,
                       position, info, domain_name, type_var_map={}):
-        arg_decls = [self.LocalVarDecl('arg' + str(i), arg.typ(), arg.pos(),
-                                       arg.info())
-                     for i, arg in enumerate(args)]
-
-        def type_passed_apply(slf):
-            return type_passed
-
-        def args_passed_apply(slf):
-            return self.to_seq(arg_decls)
-
-        type_passed_func = self.to_function0(type_passed_apply)
+        self.used_names.add(func_name)
+        scala_map, type_passed_func, result_type = self._domain_func_type(
+            domain_name, func_name, type_passed, type_var_map)
         result = self.ast.DomainFuncApp(func_name, self.to_seq(args),
-                                        self.to_map(type_var_map), position,
+                                        scala_map, position,
                                         info, type_passed_func,
                                         domain_name, self.NoTrafos)
-        return result
+        return self._record(result, result_type, self._pure(*args))
 
     def TypeVar(self, name):
         return self.ast.TypeVar(name)
@@ -237,6 +374,7 @@ class ViperAST:
                                    self.to_seq(targets), position, info, self.NoTrafos)
 
     def NewStmt(self, lhs, fields, position, info):
+        self.used_names.update(field.name() for field in fields)
         return self.ast.NewStmt(lhs, self.to_seq(fields), position, info, self.NoTrafos)
 
     def Label(self, name, position, info):
@@ -256,16 +394,22 @@ class ViperAST:
         return self.ast.FieldAssign(lhs, rhs, position, info, self.NoTrafos)
 
     def FieldAccess(self, receiver, field, position, info):
-        return self.ast.FieldAccess(receiver, field, position, info, self.NoTrafos)
+        self.used_names.add(field.name())
+        result = self.ast.FieldAccess(receiver, field, position, info, self.NoTrafos)
+        return self._record(result, self._typ_of(field),
+                            self._pure(receiver))
 
     def FieldAccessPredicate(self, fieldacc, perm, position, info):
-        return self.ast.FieldAccessPredicate(fieldacc, perm, position, info, self.NoTrafos)
+        result = self.ast.FieldAccessPredicate(fieldacc, perm, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, False)
 
     def Old(self, expr, position, info):
-        return self.ast.Old(expr, position, info, self.NoTrafos)
+        result = self.ast.Old(expr, position, info, self.NoTrafos)
+        return self._record(result, self._typ_of(expr), self._pure(expr))
 
     def LabelledOld(self, expr, label, position, info):
-        return self.ast.LabelledOld(expr, label, position, info, self.NoTrafos)
+        result = self.ast.LabelledOld(expr, label, position, info, self.NoTrafos)
+        return self._record(result, self._typ_of(expr), self._pure(expr))
 
     def Inhale(self, expr, position, info):
         return self.ast.Inhale(expr, position, info, self.NoTrafos)
@@ -280,19 +424,24 @@ class ViperAST:
         return self.ast.Assert(expr, position, info, self.NoTrafos)
 
     def FullPerm(self, position, info):
-        return self.ast.FullPerm(position, info, self.NoTrafos)
+        result = self.ast.FullPerm(position, info, self.NoTrafos)
+        return self._record(result, self.Perm, True)
 
     def NoPerm(self, position, info):
-        return self.ast.NoPerm(position, info, self.NoTrafos)
+        result = self.ast.NoPerm(position, info, self.NoTrafos)
+        return self._record(result, self.Perm, True)
 
     def WildcardPerm(self, position, info):
-        return self.ast.WildcardPerm(position, info, self.NoTrafos)
+        result = self.ast.WildcardPerm(position, info, self.NoTrafos)
+        return self._record(result, self.Perm, True)
 
     def FractionalPerm(self, left, right, position, info):
-        return self.ast.FractionalPerm(left, right, position, info, self.NoTrafos)
+        result = self.ast.FractionalPerm(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Perm, self._pure(left, right))
 
     def CurrentPerm(self, location, position, info):
-        return self.ast.CurrentPerm(location, position, info, self.NoTrafos)
+        result = self.ast.CurrentPerm(location, position, info, self.NoTrafos)
+        return self._record(result, self.Perm, True)
 
     def ForPerm(self, variable, access, body, position, info):
         if isinstance(access, self.ast.Predicate):
@@ -302,72 +451,94 @@ class ViperAST:
                                 position, info, self.NoTrafos)
 
     def PermMinus(self, exp, position, info):
-        return self.ast.PermMinus(exp, position, info, self.NoTrafos)
+        result = self.ast.PermMinus(exp, position, info, self.NoTrafos)
+        return self._record(result, self.Perm, self._pure(exp))
 
     def PermAdd(self, left, right, position, info):
-        return self.ast.PermAdd(left, right, position, info, self.NoTrafos)
+        result = self.ast.PermAdd(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Perm, self._pure(left, right))
 
     def PermSub(self, left, right, position, info):
-        return self.ast.PermSub(left, right, position, info, self.NoTrafos)
+        result = self.ast.PermSub(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Perm, self._pure(left, right))
 
     def PermMul(self, left, right, position, info):
-        return self.ast.PermMul(left, right, position, info, self.NoTrafos)
+        result = self.ast.PermMul(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Perm, self._pure(left, right))
 
     def IntPermMul(self, left, right, position, info):
-        return self.ast.IntPermMul(left, right, position, info, self.NoTrafos)
+        result = self.ast.IntPermMul(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Perm, self._pure(left, right))
 
     def PermDiv(self, left, right, position, info):
-        return self.ast.PermDiv(left, right, position, info, self.NoTrafos)
+        result = self.ast.PermDiv(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Perm, self._pure(left, right))
 
     def PermLtCmp(self, left, right, position, info):
-        return self.ast.PermLtCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.PermLtCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def PermLeCmp(self, left, right, position, info):
-        return self.ast.PermLeCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.PermLeCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def PermGtCmp(self, left, right, position, info):
-        return self.ast.PermGtCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.PermGtCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def PermGeCmp(self, left, right, position, info):
-        return self.ast.PermGeCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.PermGeCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def Not(self, expr, position, info):
-        return self.ast.Not(expr, position, info, self.NoTrafos)
+        result = self.ast.Not(expr, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(expr))
 
     def Minus(self, expr, position, info):
-        return self.ast.Minus(expr, position, info, self.NoTrafos)
+        result = self.ast.Minus(expr, position, info, self.NoTrafos)
+        return self._record(result, self.Int, self._pure(expr))
 
     def CondExp(self, cond, then, els, position, info):
-        return self.ast.CondExp(cond, then, els, position, info, self.NoTrafos)
+        result = self.ast.CondExp(cond, then, els, position, info, self.NoTrafos)
+        return self._record(result, self._typ_of(then), self._pure(cond, then, els))
 
     def EqCmp(self, left, right, position, info):
-        return self.ast.EqCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.EqCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def NeCmp(self, left, right, position, info):
-        return self.ast.NeCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.NeCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def GtCmp(self, left, right, position, info):
-        return self.ast.GtCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.GtCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def GeCmp(self, left, right, position, info):
-        return self.ast.GeCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.GeCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def LtCmp(self, left, right, position, info):
-        return self.ast.LtCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.LtCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def LeCmp(self, left, right, position, info):
-        return self.ast.LeCmp(left, right, position, info, self.NoTrafos)
+        result = self.ast.LeCmp(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def IntLit(self, num, position, info):
-        return self.ast.IntLit(self.to_big_int(num), position, info, self.NoTrafos)
+        result = self.ast.IntLit(self.to_big_int(num), position, info, self.NoTrafos)
+        return self._record(result, self.Int, True)
 
     def Implies(self, left, right, position, info):
-        return self.ast.Implies(left, right, position, info, self.NoTrafos)
+        result = self.ast.Implies(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def FuncApp(self, name, args, position, info, type, formalargs=None):
         self.used_names.add(name)
-        return self.ast.FuncApp(name, self.to_seq(args), position, info, type,
-                                self.NoTrafos)
+        result = self.ast.FuncApp(name, self.to_seq(args), position, info, type,
+                                  self.NoTrafos)
+        return self._record(result, type, self._pure(*args), name, list(args))
 
     def ExplicitSeq(self, elems, position, info):
         return self.ast.ExplicitSeq(self.to_seq(elems), position, info, self.NoTrafos)
@@ -391,28 +562,34 @@ class ViperAST:
         return self.ast.LocalVarDecl(name, type, position, info, self.NoTrafos)
 
     def LocalVar(self, name, type, position, info):
-        return self.ast.LocalVar(name, type, position, info, self.NoTrafos)
+        result = self.ast.LocalVar(name, type, position, info, self.NoTrafos)
+        return self._record(result, type, True)
 
     def Result(self, type, position, info):
-        return self.ast.Result(type, position, info, self.NoTrafos)
+        result = self.ast.Result(type, position, info, self.NoTrafos)
+        return self._record(result, type, True)
 
     def AnySetContains(self, elem, s, position, info):
-        return self.ast.AnySetContains(elem, s, position, info, self.NoTrafos)
+        result = self.ast.AnySetContains(elem, s, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(elem, s))
 
     def AnySetUnion(self, left, right, position, info):
         return self.ast.AnySetUnion(left, right, position, info, self.NoTrafos)
 
     def AnySetSubset(self, left, right, position, info):
-        return self.ast.AnySetSubset(left, right, position, info, self.NoTrafos)
+        result = self.ast.AnySetSubset(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def SeqAppend(self, left, right, position, info):
         return self.ast.SeqAppend(left, right, position, info, self.NoTrafos)
 
     def SeqContains(self, elem, s, position, info):
-        return self.ast.SeqContains(elem, s, position, info, self.NoTrafos)
+        result = self.ast.SeqContains(elem, s, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(elem, s))
 
     def SeqLength(self, s, position, info):
-        return self.ast.SeqLength(s, position, info, self.NoTrafos)
+        result = self.ast.SeqLength(s, position, info, self.NoTrafos)
+        return self._record(result, self.Int, self._pure(s))
 
     def SeqIndex(self, s, ind, position, info):
         return self.ast.SeqIndex(s, ind, position, info, self.NoTrafos)
@@ -424,25 +601,32 @@ class ViperAST:
         return self.ast.SeqDrop(s, end, position, info, self.NoTrafos)
 
     def Add(self, left, right, position, info):
-        return self.ast.Add(left, right, position, info, self.NoTrafos)
+        result = self.ast.Add(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Int, self._pure(left, right))
 
     def Sub(self, left, right, position, info):
-        return self.ast.Sub(left, right, position, info, self.NoTrafos)
+        result = self.ast.Sub(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Int, self._pure(left, right))
 
     def Mul(self, left, right, position, info):
-        return self.ast.Mul(left, right, position, info, self.NoTrafos)
+        result = self.ast.Mul(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Int, self._pure(left, right))
 
     def Div(self, left, right, position, info):
-        return self.ast.Div(left, right, position, info, self.NoTrafos)
+        result = self.ast.Div(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Int, self._pure(left, right))
 
     def Mod(self, left, right, position, info):
-        return self.ast.Mod(left, right, position, info, self.NoTrafos)
+        result = self.ast.Mod(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Int, self._pure(left, right))
 
     def And(self, left, right, position, info):
-        return self.ast.And(left, right, position, info, self.NoTrafos)
+        result = self.ast.And(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def Or(self, left, right, position, info):
-        return self.ast.Or(left, right, position, info, self.NoTrafos)
+        result = self.ast.Or(left, right, position, info, self.NoTrafos)
+        return self._record(result, self.Bool, self._pure(left, right))
 
     def If(self, cond, thn, els, position, info):
         thn_seqn = self.Seqn([thn], position, info)
@@ -450,19 +634,25 @@ class ViperAST:
         return self.ast.If(cond, thn_seqn, els_seqn, position, info, self.NoTrafos)
 
     def TrueLit(self, position, info):
-        return self.ast.TrueLit(position, info, self.NoTrafos)
+        result = self.ast.TrueLit(position, info, self.NoTrafos)
+        return self._record(result, self.Bool, True)
 
     def FalseLit(self, position, info):
-        return self.ast.FalseLit(position, info, self.NoTrafos)
+        result = self.ast.FalseLit(position, info, self.NoTrafos)
+        return self._record(result, self.Bool, True)
 
     def NullLit(self, position, info):
-        return self.ast.NullLit(position, info, self.NoTrafos)
+        result = self.ast.NullLit(position, info, self.NoTrafos)
+        return self._record(result, self.Ref, True)
 
     def Forall(self, variables, triggers, exp, position, info):
         res = self.ast.Forall(self.to_seq(variables), self.to_seq(triggers),
                                exp, position, info, self.NoTrafos)
-        if res.isPure():
-            return res
+        pure = self._pure(exp)
+        if pure is None:
+            pure = res.isPure()
+        if pure:
+            return self._record(res, self.Bool, True)
         else:
             desugared = self.to_list(self.QPs.desugarSourceQuantifiedPermissionSyntax(res))
             result = self.TrueLit(position, info)
@@ -472,7 +662,7 @@ class ViperAST:
 
     def Exists(self, variables, exp, position, info):
         res = self.ast.Exists(self.to_seq(variables), exp, position, info, self.NoTrafos)
-        return res
+        return self._record(res, self.Bool, self._pure(exp))
 
     def Trigger(self, exps, position, info):
         return self.ast.Trigger(self.to_seq(exps), position, info, self.NoTrafos)
@@ -518,14 +708,14 @@ class ViperAST:
         path = self.java.nio.file.Paths.get(file, [])
         start = self.ast.LineColumnPosition(expr.lineno, expr.col_offset)
         id = error_manager.add_error_information(
-            expr, list(vias), error_string, rules)
+            expr, vias, error_string, rules)
         if hasattr(expr, 'end_lineno') and hasattr(expr, 'end_col_offset'):
             end = self.ast.LineColumnPosition(expr.end_lineno,
                                               expr.end_col_offset)
             end = self.scala.Some(end)
         else:
             end = self.none
-        return self.ast.IdentifierPosition(path, start, end, id)
+        return self.ast.IdentifierPosition(path, start, end, str(id))
 
     def is_heap_dependent(self, expr) -> bool:
         """
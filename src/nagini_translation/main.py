@@ -7,6 +7,8 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import argparse
 import astunparse
+import glob
+import hashlib
 import inspect
 import json
 import logging
@@ -23,10 +25,11 @@ import nagini_translation.mypy_patches.optional_patch
 from jpype import JavaException
 from nagini_translation.analyzer import Analyzer
 from nagini_translation.sif_translator import SIFTranslator
-from nagini_translation.lib import config
+from nagini_translation.lib import builtin_positions, config
 from nagini_translation.lib.constants import DEFAULT_SERVER_SOCKET
 from nagini_translation.lib.errors import error_manager
 from nagini_translation.lib.jvmaccess import JVM
+from nagini_translation.lib.timings import Timings
 from nagini_translation.lib.typedefs import Program
 from nagini_translation.lib.typeinfo import TypeException, TypeInfo
 from nagini_translation.lib.util import (
@@ -35,6 +38,7 @@ from nagini_translation.lib.util import (
     UnsupportedException,
 )
 from nagini_translation.lib.viper_ast import ViperAST
+from nagini_translation.quantifier_profile import print_quantifier_profile
 from nagini_translation.sif.lib.util import (
     configure_mpp_transformation,
     set_all_low_methods,
@@ -42,14 +46,25 @@ from nagini_translation.sif.lib.util import (
 )
 from nagini_translation.sif.lib.viper_ast_extended import ViperASTExtended
 from nagini_translation.translator import Translator
+from nagini_translation.verification_cache import (
+    classpath_digest,
+    environment_options,
+    VerificationCache,
+)
 from nagini_translation.verifier import (
-    Carbon,
+    create_verifier,
+    ErrorStream,
+    Failure,
     get_arp_plugin,
-    Silicon,
+    merge_results,
+    parse_portfolio,
+    PortfolioConfiguration,
+    split_program,
     VerificationResult,
+    VerifierPool,
     ViperVerifier
 )
-from typing import Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 
 TYPE_ERROR_PATTERN = r"^(?P<file>.*):(?P<line>\d+): error: (?P<msg>.*)$"
@@ -80,23 +95,332 @@ def parse_sil_file(sil_path: str, jvm):
     return program.get()
 
 
-def load_sil_files(jvm: JVM, sif: bool = False):
+_SIL_PROGRAMS = {}
+"""
+Parsed builtin Silver programs, keyed by mode (SIF or not).
+"""
+
+_SIL_DIGESTS = {}
+"""
+Digests of the Silver resources of each mode, computed once per process.
+"""
+
+_SIL_NAMES = {}
+"""
+Names of the members of the builtin Silver programs, keyed by mode.
+"""
+
+
+def _sil_resources_path(sif: bool) -> str:
     current_path = os.path.dirname(inspect.stack()[0][1])
     if sif:
-        resources_path = os.path.join(current_path, 'sif', 'resources')
-    else:
-        resources_path = os.path.join(current_path, 'resources')
-    return parse_sil_file(os.path.join(resources_path, 'all.sil'), jvm)
+        return os.path.join(current_path, 'sif', 'resources')
+    return os.path.join(current_path, 'resources')
+
+
+def _sil_resources_digest(sif: bool) -> str:
+    """
+    Returns a digest of all Silver resources the builtin program of the given
+    mode is parsed from, and of the names and sizes of the jars on the
+    classpath the Viper AST classes come from.
+    """
+    if sif in _SIL_DIGESTS:
+        return _SIL_DIGESTS[sif]
+    hasher = hashlib.sha256(classpath_digest().encode())
+    base_path = _sil_resources_path(False)
+    paths = glob.glob(os.path.join(base_path, '*.sil'))
+    if sif:
+        paths.append(os.path.join(_sil_resources_path(True), 'all.sil'))
+    for sil_path in sorted(paths):
+        with open(sil_path, 'rb') as file:
+            name = os.path.relpath(sil_path, base_path)
+            hasher.update(name.encode() + b'\0' + file.read())
+    _SIL_DIGESTS[sif] = hasher.hexdigest()
+    return _SIL_DIGESTS[sif]
+
+
+def _serialized_sil_path(cache_dir: str, sif: bool, digest: str) -> str:
+    mode = 'sif' if sif else 'default'
+    return os.path.join(cache_dir, 'sil', '{}.{}.ser'.format(mode, digest))
+
+
+def serializable_sil_program(jvm: JVM, program: 'silver.ast.Program',
+                             sif: bool
+                             ) -> Tuple['silver.ast.Program',
+                                        List[builtin_positions.BuiltinPosition]]:
+    """
+    Returns a copy of the given builtin program in which all source positions
+    are replaced by placeholders, and the table of the original positions
+    (see builtin_positions).
+    """
+    viper_ast = ViperAST(jvm, jvm.java, jvm.scala, jvm.viper, None)
+    ast = viper_ast.ast
+    positions = []
+
+    def convert(value):
+        if isinstance(value, ast.Node):
+            return rebuild(value)
+        if isinstance(value, jvm.scala.collection.Seq):
+            elements = viper_ast.to_list(value)
+            converted = [convert(element) for element in elements]
+            if all(new is old for new, old in zip(converted, elements)):
+                return value
+            return viper_ast.to_seq(converted)
+        if isinstance(value, jvm.scala.Some):
+            converted = convert(value.get())
+            return value if converted is value.get() else jvm.scala.Some(
+                converted)
+        return value
+
+    def rebuild(node):
+        children = viper_ast.to_list(node.children())
+        converted = [convert(child) for child in children]
+        result = node
+        if any(new is not old for new, old in zip(converted, children)):
+            result = node.duplicate(viper_ast.to_seq(converted))
+        pos = node.pos() if isinstance(node, ast.Positioned) else None
+        if isinstance(pos, ast.AbstractSourcePosition):
+            start = pos.start()
+            end = pos.end().get() if pos.end().isDefined() else None
+            column = builtin_positions.placeholder_column(len(positions), sif)
+            positions.append((
+                builtin_positions.relative_file(str(pos.file())),
+                start.line(), start.column(),
+                end.line() if end else None, end.column() if end else None))
+            placeholder = ast.LineColumnPosition(start.line(), column)
+            result = result.duplicateMeta(jvm.scala.Tuple3(
+                placeholder, node.info(), node.errT()))
+        return result
+
+    return rebuild(program), positions
+
+
+def _load_serialized_sil_program(jvm: JVM, path: str, sif: bool):
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path + '.positions.json', 'r') as file:
+            positions = json.load(file)
+        stream = jvm.java.io.ObjectInputStream(
+            jvm.java.io.BufferedInputStream(jvm.java.io.FileInputStream(path)))
+        try:
+            program = stream.readObject()
+        finally:
+            stream.close()
+    except (JavaException, OSError, ValueError) as e:
+        logging.warning('Cannot load serialized builtin program %s: %s', path,
+                        e)
+        return None
+    builtin_positions.register(positions, sif)
+    return program
+
+
+def _store_serialized_sil_program(jvm: JVM, program, path: str,
+                                  sif: bool) -> None:
+    tmp_path = path + '.' + str(os.getpid()) + '.tmp'
+    try:
+        serializable, positions = serializable_sil_program(jvm, program, sif)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path + '.positions.json', 'w') as file:
+            json.dump(positions, file)
+        stream = jvm.java.io.ObjectOutputStream(
+            jvm.java.io.BufferedOutputStream(
+                jvm.java.io.FileOutputStream(tmp_path)))
+        try:
+            stream.writeObject(serializable)
+        finally:
+            stream.close()
+        # The program is only loaded if its positions exist.
+        os.replace(tmp_path + '.positions.json', path + '.positions.json')
+        os.replace(tmp_path, path)
+    except (JavaException, OSError) as e:
+        # Parsing again next time is slower but correct.
+        logging.warning('Cannot store serialized builtin program %s: %s', path,
+                        e)
+    finally:
+        for leftover in (tmp_path, tmp_path + '.positions.json'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+def load_sil_files(jvm: JVM, sif: bool = False, cache_dir: str = None):
+    """
+    Returns the builtin Silver program for the given mode. Programs are cached
+    in memory per mode. If a cache directory is given, they are loaded from
+    their serialized form there if it matches the current resources and
+    backend; otherwise, they are parsed and the serialized form is stored
+    for the next process. The positions of a loaded program are placeholders
+    (see builtin_positions).
+    """
+    if sif in _SIL_PROGRAMS:
+        return _SIL_PROGRAMS[sif]
+    serialized_path = None
+    program = None
+    if cache_dir:
+        serialized_path = _serialized_sil_path(cache_dir, sif,
+                                               _sil_resources_digest(sif))
+        program = _load_serialized_sil_program(jvm, serialized_path, sif)
+    if program is None:
+        program = parse_sil_file(
+            os.path.join(_sil_resources_path(sif), 'all.sil'), jvm)
+        if serialized_path:
+            _store_serialized_sil_program(jvm, program, serialized_path, sif)
+    _SIL_PROGRAMS[sif] = program
+    return program
+
+
+def prepare_sil_files() -> None:
+    """
+    Entry point that stores the builtin Silver programs of all modes in
+    serialized form in the cache directory given as its argument, s.t. later
+    runs with that cache directory need not parse them.
+    """
+    parser = argparse.ArgumentParser(
+        description='Serializes the builtin Silver programs.')
+    parser.add_argument('cache_dir', help='Nagini cache directory')
+    args = parser.parse_args()
+    jvm = JVM(config.classpath)
+    for sif in (False, True):
+        load_sil_files(jvm, sif, args.cache_dir)
+
+
+_CHECKED_MEMBERS = {}
+"""
+Fingerprints of the members of previously translated programs that passed the
+consistency check, by the path of the program and the name of the member.
+"""
+
+
+def translation_fingerprints(source_fingerprints: Dict[str, str],
+                             dependencies: Dict[str, Set[str]],
+                             options: str,
+                             builtins: Set[str] = frozenset()
+                             ) -> Dict[str, Optional[str]]:
+    """
+    Returns fingerprints of the translations of all members with the given
+    source fingerprints. A member is translated in the same way as long as
+    the translation options, its Python source and that of the members it
+    depends on are unchanged. The given builtin members do not change within
+    a process. Any other dependency without a source fingerprint may have
+    changed without notice, so members that depend on one get the
+    fingerprint None, which never matches.
+    """
+    result = {}
+    for name, source in source_fingerprints.items():
+        hasher = hashlib.sha256(options.encode())
+        hasher.update(b'\0' + source.encode())
+        for dependency in sorted(dependencies.get(name, ())):
+            dependency_source = source_fingerprints.get(dependency)
+            if dependency_source is None:
+                if dependency not in builtins:
+                    hasher = None
+                    break
+                dependency_source = ''
+            hasher.update('\n{} {}'.format(dependency,
+                                            dependency_source).encode())
+        result[name] = hasher.hexdigest() if hasher else None
+    return result
+
+
+def _builtin_names(program: 'silver.ast.Program', viper_ast: ViperAST,
+                   sif: bool) -> Set[str]:
+    """
+    Returns the names of the functions, predicates and methods of the given
+    builtin program of the given mode.
+    """
+    if sif not in _SIL_NAMES:
+        _SIL_NAMES[sif] = {
+            member.name() for seq in (program.functions(),
+                                      program.predicates(), program.methods())
+            for member in viper_ast.to_list(seq)}
+    return _SIL_NAMES[sif]
+
+
+def check_consistency(prog: 'silver.ast.Program', viper_ast: ViperAST,
+                      mode: str = 'full', path: str = None,
+                      fingerprints: Dict[str, str] = None
+                      ) -> List['ConsistencyError']:
+    """
+    Runs the consistency check on the given program and returns the errors
+    found. In mode 'full', the entire program is checked. In mode 'changed',
+    only the program-level checks are performed on the program itself, and
+    only those members are checked whose fingerprint differs from that of the
+    last member of the same name in a program with the same path that passed
+    the check. Members are fingerprinted by the given translation
+    fingerprints (see translation_fingerprints) or, if they have none, by
+    their Silver text; members whose translation fingerprint is None are
+    always checked. In mode 'off', nothing is checked.
+    """
+    if mode == 'off':
+        return []
+    if mode == 'full':
+        errors = prog.checkTransitively()
+        return [] if errors.isEmpty() else viper_ast.to_list(errors)
+    fingerprints = fingerprints or {}
+    checked = _CHECKED_MEMBERS.setdefault(path, {})
+    errors = viper_ast.to_list(prog.check())
+    for seq in (prog.domains(), prog.fields(), prog.functions(),
+                prog.predicates(), prog.methods()):
+        for member in viper_ast.to_list(seq):
+            name = member.name()
+            if name in fingerprints:
+                fingerprint = fingerprints[name]
+            else:
+                fingerprint = hashlib.sha256(str(member).encode()).hexdigest()
+            if fingerprint is not None and checked.get(name) == fingerprint:
+                continue
+            member_errors = member.checkTransitively()
+            if member_errors.isEmpty() and fingerprint is not None:
+                checked[name] = fingerprint
+            else:
+                checked.pop(name, None)
+                errors.extend(viper_ast.to_list(member_errors))
+    return errors
 
 
 def translate(path: str, jvm: JVM, selected: Set[str] = set(),
               sif: bool = False, arp: bool = False, ignore_global: bool = False,
-              reload_resources: bool = False, verbose: bool = False) -> Program:
+              reload_resources: bool = False, verbose: bool = False,
+              dependencies: Dict[str, Set[str]] = None,
+              source_fingerprints: Dict[str, str] = None,
+              clear_errors: bool = True,
+              source_files: Set[str] = None,
+              cache_dir: str = None,
+              prune_preamble: bool = True,
+              finite_hierarchy: bool = False,
+              warnings: List[str] = None,
+              timings: Timings = None,
+              consistency_check: str = 'full',
+              timeouts: Dict[str, int] = None) -> Program:
     """
-    Translates the Python module at the given path to a Viper program
+    Translates the Python module at the given path to a Viper program.
+    If a dependencies dict is given, the dependencies of all members of the
+    program are tracked and stored in it; digests of the Python source of
+    these members are stored in the source_fingerprints dict, if given.
+    Error information of previous translations is discarded unless
+    clear_errors is False, which is needed while results of previous
+    translations are still being converted. If a source_files set is given,
+    the paths of all modules the program was translated from are added to it.
+    If a cache directory is given, type information of unchanged modules and
+    the parsed builtin Silver programs are loaded from there. Unless prune_preamble is False, only those parts of the
+    builtin preamble and the type domain that the program can reach are
+    emitted. If finite_hierarchy is True, subtyping between classes is
+    encoded by precomputed intervals of the class hierarchy. If a warnings
+    list is given, warnings about likely performance problems found during the
+    translation are added to it. If a Timings object is given, the durations
+    of all phases of the translation are recorded in it. The
+    consistency_check mode determines how much of the translated program is
+    checked for consistency (see check_consistency). If a timeouts dict is
+    given, the time limits declared for the verification of the program's
+    members are stored in it.
+    The builtin Silver programs are cached per mode, so reload_resources is
+    no longer needed when switching modes and only kept for compatibility.
     """
+    if timings is None:
+        timings = Timings()
     path = os.path.abspath(path)
-    error_manager.clear()
+    if clear_errors:
+        error_manager.clear()
     current_path = os.path.dirname(inspect.stack()[0][1])
     resources_path = os.path.join(current_path, 'resources')
 
@@ -108,10 +432,13 @@ def translate(path: str, jvm: JVM, selected: Set[str] = set(),
         raise Exception('Viper not found on classpath.')
     if sif and not viper_ast.is_extension_available():
         raise Exception('Viper AST SIF extension not found on classpath.')
-    types = TypeInfo()
-    type_correct = types.check(path)
+    types = TypeInfo(os.path.join(cache_dir, 'types') if cache_dir else None)
+    with timings.phase('type check'):
+        type_correct = types.check(path)
     if not type_correct:
         return None
+    if source_files is not None:
+        source_files.update(types.files.values())
 
     analyzer = Analyzer(types, path, selected)
     main_module = analyzer.module
@@ -119,18 +446,40 @@ def translate(path: str, jvm: JVM, selected: Set[str] = set(),
         analyzer.add_native_silver_builtins(json.loads(file.read()))
 
     main_module.add_builtin_vars()
-    collect_modules(analyzer, path)
+    collect_modules(analyzer, path, timings)
     if sif:
         translator = SIFTranslator(jvm, path, types, viper_ast)
     else:
         translator = Translator(jvm, path, types, viper_ast)
-    analyzer.process(translator)
-    if 'sil_programs' not in globals() or reload_resources:
-        global sil_programs
-        sil_programs = load_sil_files(jvm, sif)
+    with timings.phase('process'):
+        analyzer.process(translator)
+    with timings.phase('load builtins'):
+        sil_programs = load_sil_files(jvm, sif, cache_dir)
     modules = [main_module.global_module] + list(analyzer.modules.values())
-    prog = translator.translate_program(modules, sil_programs, selected,
-                                        arp=arp, ignore_global=ignore_global)
+    track_dependencies = dependencies is not None
+    with timings.phase('translate program'):
+        prog = translator.translate_program(
+            modules, sil_programs, selected, arp=arp,
+            ignore_global=ignore_global, track_dependencies=track_dependencies,
+            prune_preamble=prune_preamble, finite_hierarchy=finite_hierarchy)
+    if warnings is not None:
+        warnings.extend(translator.get_warnings())
+    fingerprints = None
+    if track_dependencies:
+        member_dependencies = translator.get_dependencies()
+        member_sources = translator.get_source_fingerprints()
+        dependencies.update(member_dependencies)
+        if source_fingerprints is not None:
+            source_fingerprints.update(member_sources)
+        if consistency_check == 'changed':
+            options = repr((sif, arp, ignore_global, prune_preamble,
+                            finite_hierarchy, sorted(selected)))
+            fingerprints = translation_fingerprints(
+                member_sources, member_dependencies, options,
+                _builtin_names(sil_programs, viper_ast, sif))
+        timings.sources.update(translator.get_source_names())
+    if timeouts is not None:
+        timeouts.update(translator.get_timeouts())
     if sif:
         set_all_low_methods(jvm, viper_ast.all_low_methods)
         set_preserves_low_methods(jvm, viper_ast.preserves_low_methods)
@@ -142,15 +491,21 @@ def translate(path: str, jvm: JVM, selected: Set[str] = set(),
                                      seq_opt=True,
                                      act_opt=True,
                                      func_opt=True)
-        prog = jvm.viper.silver.sif.SIFExtendedTransformer.transform(prog, False)
+        with timings.phase('SIF transformation'):
+            prog = jvm.viper.silver.sif.SIFExtendedTransformer.transform(
+                prog, False)
         if verbose:
             print('Transformation to MPP successful.')
     if arp:
-        prog = get_arp_plugin(jvm).before_verify(prog)
+        with timings.phase('ARP transformation'):
+            prog = get_arp_plugin(jvm).before_verify(prog)
         if verbose:
             print('ARP transformation successful.')
     # Run consistency check in translated AST
-    consistency_errors = viper_ast.to_list(prog.checkTransitively())
+    with timings.phase('consistency check'):
+        consistency_errors = check_consistency(prog, viper_ast,
+                                               consistency_check, path,
+                                               fingerprints)
     for error in consistency_errors:
         print(error.toString())
     if consistency_errors:
@@ -159,38 +514,141 @@ def translate(path: str, jvm: JVM, selected: Set[str] = set(),
     return prog
 
 
-def collect_modules(analyzer: Analyzer, path: str) -> None:
+def collect_modules(analyzer: Analyzer, path: str,
+                    timings: Timings = None) -> None:
     """
     Starting from the main module, finds all imports and sets up all modules
     for them.
     """
+    if timings is None:
+        timings = Timings()
     analyzer.module_index = 0
-    analyzer.collect_imports(path)
+    with timings.phase('collect imports'):
+        analyzer.collect_imports(path)
 
-    analyzer.analyze()
+    with timings.phase('analyze'):
+        analyzer.analyze()
 
-    # Carry out all tasks that were deferred to the end of the analysis.
-    for task in analyzer.deferred_tasks:
-        task()
+        # Carry out all tasks that were deferred to the end of the analysis.
+        for task in analyzer.deferred_tasks:
+            task()
 
 
 def verify(prog: 'viper.silver.ast.Program', path: str,
-           jvm: JVM, backend=ViperVerifier.silicon, arp=False) -> VerificationResult:
+           jvm: JVM, backend=ViperVerifier.silicon, arp=False, workers: int = 1,
+           dependencies: Dict[str, Set[str]] = None,
+           cache: VerificationCache = None,
+           source_fingerprints: Dict[str, str] = None,
+           profile: Dict[str, 'Counter'] = None,
+           timings: Timings = None,
+           portfolio: List[PortfolioConfiguration] = None,
+           timeout: float = None,
+           timeouts: Dict[str, int] = None,
+           on_failure: Callable[[str, Failure], None] = None
+           ) -> VerificationResult:
     """
-    Verifies the given Viper program
+    Verifies the given Viper program. If the dependencies of the program's
+    members are known and either more than one worker is requested, a
+    cache is given, quantifiers are to be profiled or time limits are given,
+    or if time limits are declared in the timeouts dict, the program is
+    split into one unit per method; without known dependencies, every unit
+    contains the entire program (see split_program). Units with a cached result
+    are skipped, all others are verified concurrently. If a profile dict is
+    given, the quantifier instantiations of every unit are stored in it; if a
+    Timings object is given, the overall verification time and, if the program
+    is split, that of every unit are recorded in it. If a
+    portfolio is given, the program (or each unit) is verified with all of its
+    configurations concurrently, and the first successful result is used.
+    The verification of a unit is aborted after the number of seconds given
+    for its member in the timeouts dict, or otherwise after the given default
+    timeout; the result then records the unit as timed out. If on_failure is
+    given, the backend passes the errors of every member to it as soon as they
+    are known (Silicon only).
     """
+    split = (workers > 1 or cache or profile is not None or
+             timeout is not None or bool(timeouts))
+    if timings is None:
+        timings = Timings()
     try:
-        if backend == ViperVerifier.silicon:
-            verifier = Silicon(jvm, path)
-        elif backend == ViperVerifier.carbon:
-            verifier = Carbon(jvm, path)
-        vresult = verifier.verify(prog, arp=arp)
-        return vresult
+        with timings.phase('verify'):
+            if split and (dependencies is not None or timeouts):
+                return verify_units(prog, path, jvm, backend, arp, workers,
+                                    dependencies or {}, cache,
+                                    source_fingerprints,
+                                    profile, timings, portfolio, timeout,
+                                    timeouts, on_failure)
+            verifier = create_verifier(jvm, path, backend, portfolio=portfolio,
+                                       stream=on_failure is not None)
+            try:
+                vresult = verifier.verify(prog, arp=arp, on_failure=on_failure)
+            finally:
+                if portfolio:
+                    verifier.shutdown()
+            return vresult
     except JavaException as je:
         print(je.stacktrace())
         traceback.print_exc()
 
 
+def verify_units(prog: 'viper.silver.ast.Program', path: str, jvm: JVM,
+                 backend: ViperVerifier, arp: bool, workers: int,
+                 dependencies: Dict[str, Set[str]],
+                 cache: Optional[VerificationCache],
+                 source_fingerprints: Optional[Dict[str, str]],
+                 profile: Dict[str, 'Counter'] = None,
+                 timings: Timings = None,
+                 portfolio: List[PortfolioConfiguration] = None,
+                 timeout: float = None,
+                 timeouts: Dict[str, int] = None,
+                 on_failure: Callable[[str, Failure], None] = None
+                 ) -> VerificationResult:
+    """
+    Splits the given program into verification units, replays the results of
+    cached units and verifies the remaining ones on a pool of backends, each
+    within its time limit.
+    """
+    timeouts = timeouts or {}
+    viper_ast = ViperAST(jvm, jvm.java, jvm.scala, jvm.viper, path)
+    units = split_program(prog, dependencies, viper_ast)
+    results = []
+    pending = []
+    if cache:
+        cache.clear_digests()
+    for unit in units:
+        key = None
+        if cache:
+            key = cache.fingerprint(unit.program, source_fingerprints or {},
+                                    viper_ast)
+            cached = cache.lookup(key)
+            if cached is not None:
+                results.append(cached)
+                continue
+        pending.append((unit, key))
+    if not pending:
+        return merge_results(results)
+    pool = VerifierPool(jvm, path, backend, min(workers, len(pending)),
+                        profile_quantifiers=profile is not None,
+                        portfolio=portfolio, stream=on_failure is not None)
+    try:
+        futures = [pool.submit(unit.program, arp,
+                               timeouts.get(unit.name, timeout), unit.name,
+                               on_failure)
+                   for unit, _ in pending]
+        for (unit, key), future in zip(pending, futures):
+            result = future.result()
+            # A timeout says nothing about the unit, so it is not cached.
+            if key is not None and not result.partial:
+                cache.store(key, result)
+            if profile is not None and result.instantiations is not None:
+                profile[unit.name] = result.instantiations
+            if timings is not None and result.duration is not None:
+                timings.add_member(unit.name, result.duration)
+            results.append(result)
+    finally:
+        pool.shutdown()
+    return merge_results(results)
+
+
 def _parse_log_level(log_level_string: str) -> int:
     """ Parses the log level provided by the user.
     """
@@ -288,6 +746,75 @@ def main() -> None:
         action='store_true',
         help='Start Nagini server'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='number of backend instances verifying methods in parallel',
+        default=1
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=None,
+        help='directory in which the parsed builtin Silver programs, type '
+             'information of unchanged modules and verification results of '
+             'unchanged methods are cached between runs'
+    )
+    parser.add_argument(
+        '--full-preamble',
+        action='store_true',
+        help='emit the complete builtin preamble and type domain instead of '
+             'only the parts the program uses'
+    )
+    parser.add_argument(
+        '--finite-hierarchy',
+        action='store_true',
+        help='encode subtyping between classes by precomputed intervals of the '
+             'class hierarchy instead of quantified exclusion axioms'
+    )
+    parser.add_argument(
+        '--profile-quantifiers',
+        action='store_true',
+        help='report the quantifier instantiations of every method, mapped back '
+             'to their Python or builtin source (Silicon only)'
+    )
+    parser.add_argument(
+        '--timings-json',
+        default=None,
+        help='write the duration of every translation and verification phase '
+             'as JSON to the specified file, including the verification time '
+             'of every method if methods are verified separately (e.g. with '
+             '--workers)'
+    )
+    parser.add_argument(
+        '--consistency-check',
+        choices=['full', 'changed', 'off'],
+        default='full',
+        help='check the entire translated program for consistency (default), '
+             'only the members that changed since the last translation in '
+             'this process, or nothing'
+    )
+    parser.add_argument(
+        '--portfolio',
+        default=None,
+        help='verify with several backend configurations concurrently and use '
+             'the first successful result; comma-separated list of silicon, '
+             'silicon:SEED (Z3 random seed) and carbon'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=None,
+        help='abort the verification of every method after the given number '
+             'of seconds and report it as timed out, unless the method '
+             'declares its own limit with the Timeout decorator'
+    )
+    parser.add_argument(
+        '--stream-errors',
+        action='store_true',
+        help='print the errors of every method as soon as the backend reports '
+             'them instead of after the entire program has been verified '
+             '(Silicon only)'
+    )
     args = parser.parse_args()
 
     config.classpath = args.viper_jar_path
@@ -302,38 +829,112 @@ def main() -> None:
         parser.error('missing argument: --z3')
     if args.verifier == 'carbon' and not config.classpath:
         parser.error('missing argument: --boogie')
+    if args.profile_quantifiers and args.verifier != 'silicon':
+        parser.error('--profile-quantifiers requires --verifier silicon')
+    if args.timeout is not None and args.timeout <= 0:
+        parser.error('--timeout must be positive')
+    if args.portfolio:
+        try:
+            args.portfolio = parse_portfolio(args.portfolio)
+        except ValueError as e:
+            parser.error(str(e))
+        if (any(configuration.backend == ViperVerifier.carbon
+                for configuration in args.portfolio) and
+                not config.boogie_path):
+            parser.error('missing argument: --boogie')
+        if args.profile_quantifiers:
+            parser.error('--profile-quantifiers cannot be used with '
+                         '--portfolio')
+    if args.stream_errors and (args.verifier != 'silicon' or args.portfolio):
+        parser.error('--stream-errors requires --verifier silicon and cannot '
+                     'be used with --portfolio')
 
     logging.basicConfig(level=args.log)
 
     os.environ['MYPYPATH'] = config.mypy_path
     jvm = JVM(config.classpath)
     if args.server:
-        import zmq
-        context = zmq.Context()
-        socket = context.socket(zmq.REP)
-        socket.bind(DEFAULT_SERVER_SOCKET)
-        global sil_programs
-        sil_programs = load_sil_files(jvm, args.sif)
-
-        while True:
-            file = socket.recv_string()
-            response = ['']
-
-            def add_response(part):
-                response[0] = response[0] + '\n' + part
-
-            translate_and_verify(file, jvm, args, add_response, arp=args.arp)
-            socket.send_string(response[0])
+        from nagini_translation.server import NaginiServer
+        load_sil_files(jvm, args.sif, args.cache_dir)
+        server = NaginiServer(jvm, args)
+        server.serve(DEFAULT_SERVER_SOCKET)
     else:
         translate_and_verify(args.python_file, jvm, args, arp=args.arp)
 
 
+def print_translation_failure(e: Exception, python_file: str,
+                              print=print) -> None:
+    """
+    Reports an exception that occurred while translating the given file.
+    """
+    if isinstance(e, ConsistencyException):
+        print(e.message + ': Translated AST contains inconsistencies.')
+        return
+    print("Translation failed")
+    if isinstance(e, (InvalidProgramException, UnsupportedException)):
+        if isinstance(e, InvalidProgramException):
+            issue = 'Invalid program: '
+            if e.message:
+                issue += e.message
+            else:
+                issue += e.code
+        else:
+            issue = 'Not supported: '
+            if e.args[0]:
+                issue += e.args[0]
+            else:
+                issue += astunparse.unparse(e.node)
+        line = str(e.node.lineno)
+        col = str(e.node.col_offset)
+        print(issue + ' (' + python_file + '@' + line + '.' + col + ')')
+    if isinstance(e, TypeException):
+        for msg in e.messages:
+            parts = TYPE_ERROR_MATCHER.match(msg)
+            if parts:
+                parts = parts.groupdict()
+                file = parts['file']
+                if file == '__main__':
+                    file = python_file
+                msg = parts['msg']
+                line = parts['line']
+                print('Type error: ' + msg + ' (' + file + '@' + line + '.0)')
+            else:
+                print(msg)
+
+
 def translate_and_verify(python_file, jvm, args, print=print, arp=False):
     try:
         start = time.time()
         selected = set(args.select.split(',')) if args.select else set()
+        # Cached units are not verified again, so they cannot be profiled.
+        if args.cache_dir and not args.profile_quantifiers:
+            options = [args.verifier, str(arp), str(config.z3_path),
+                       str(args.portfolio)] + environment_options()
+            cache = VerificationCache(
+                os.path.join(args.cache_dir, 'verification'), options)
+        else:
+            cache = None
+        profile = {} if args.profile_quantifiers else None
+        timings = Timings() if args.timings_json else None
+        stream = None
+        split = (args.workers > 1 or cache is not None or profile is not None or
+                 args.timeout is not None)
+        dependencies = {} if split else None
+        source_fingerprints = {} if split else None
+        timeouts = {}
+        warnings = []
         prog = translate(python_file, jvm, selected, args.sif,
-                         ignore_global=args.ignore_global, arp=arp, verbose=args.verbose)
+                         ignore_global=args.ignore_global, arp=arp, verbose=args.verbose,
+                         dependencies=dependencies,
+                         source_fingerprints=source_fingerprints,
+                         cache_dir=args.cache_dir,
+                         prune_preamble=not args.full_preamble,
+                         finite_hierarchy=args.finite_hierarchy,
+                         warnings=warnings, timings=timings,
+                         consistency_check=args.consistency_check,
+                         timeouts=timeouts)
+        for warning in warnings:
+            print('Warning: ' + warning)
         if args.print_silver:
             if args.verbose:
                 print('Result:')
@@ -351,51 +952,54 @@ def translate_and_verify(python_file, jvm, args, print=print, arp=False):
             print("Run, Total, Start, End, Time".format())
             for i in range(args.benchmark):
                 start = time.time()
-                prog = translate(python_file, jvm, selected, args.sif, arp=arp)
-                vresult = verify(prog, python_file, jvm, backend=backend, arp=arp)
+                dependencies = {} if split else None
+                source_fingerprints = {} if split else None
+                prog = translate(python_file, jvm, selected, args.sif, arp=arp,
+                                 dependencies=dependencies,
+                                 source_fingerprints=source_fingerprints,
+                                 cache_dir=args.cache_dir,
+                                 prune_preamble=not args.full_preamble,
+                                 finite_hierarchy=args.finite_hierarchy,
+                                 consistency_check=args.consistency_check,
+                                 timeouts=timeouts)
+                vresult = verify(prog, python_file, jvm, backend=backend, arp=arp,
+                                 workers=args.workers, dependencies=dependencies,
+                                 cache=cache,
+                                 source_fingerprints=source_fingerprints,
+                                 portfolio=args.portfolio,
+                                 timeout=args.timeout, timeouts=timeouts)
                 end = time.time()
                 print("{}, {}, {}, {}, {}".format(
                     i, args.benchmark, start, end, end - start))
         else:
-            vresult = verify(prog, python_file, jvm, backend=backend, arp=arp)
+            if args.stream_errors:
+                stream = ErrorStream(args.ide_mode, args.show_viper_errors,
+                                     lambda member, error: print(error))
+            vresult = verify(prog, python_file, jvm, backend=backend, arp=arp,
+                             workers=args.workers, dependencies=dependencies,
+                             cache=cache, source_fingerprints=source_fingerprints,
+                             profile=profile, timings=timings,
+                             portfolio=args.portfolio,
+                             timeout=args.timeout, timeouts=timeouts,
+                             on_failure=stream)
         if args.verbose:
             print("Verification completed.")
-        print(vresult.to_string(args.ide_mode, args.show_viper_errors))
+        # Errors that have been streamed are not printed again.
+        print(vresult.to_string(args.ide_mode, args.show_viper_errors,
+                                stream.emitted if stream else frozenset()))
+        if profile:
+            viper_ast = ViperAST(jvm, jvm.java, jvm.scala, jvm.viper,
+                                 python_file)
+            print_quantifier_profile(profile, prog, viper_ast, python_file,
+                                     print)
         duration = '{:.2f}'.format(time.time() - start)
         print('Verification took ' + duration + ' seconds.')
-    except (TypeException, InvalidProgramException, UnsupportedException) as e:
-        print("Translation failed")
-        if isinstance(e, (InvalidProgramException, UnsupportedException)):
-            if isinstance(e, InvalidProgramException):
-                issue = 'Invalid program: '
-                if e.message:
-                    issue += e.message
-                else:
-                    issue += e.code
-            else:
-                issue = 'Not supported: '
-                if e.args[0]:
-                    issue += e.args[0]
-                else:
-                    issue += astunparse.unparse(e.node)
-            line = str(e.node.lineno)
-            col = str(e.node.col_offset)
-            print(issue + ' (' + python_file + '@' + line + '.' + col + ')')
-        if isinstance(e, TypeException):
-            for msg in e.messages:
-                parts = TYPE_ERROR_MATCHER.match(msg)
-                if parts:
-                    parts = parts.groupdict()
-                    file = parts['file']
-                    if file == '__main__':
-                        file = python_file
-                    msg = parts['msg']
-                    line = parts['line']
-                    print('Type error: ' + msg + ' (' + file + '@' + line + '.0)')
-                else:
-                    print(msg)
-    except ConsistencyException as e:
-        print(e.message + ': Translated AST contains inconsistencies.')
+        if timings is not None:
+            with open(args.timings_json, 'w') as fp:
+                fp.write(timings.to_json())
+    except (TypeException, InvalidProgramException, UnsupportedException,
+            ConsistencyException) as e:
+        print_translation_failure(e, python_file, print)
 
     except JavaException as e:
         print(e.stacktrace())
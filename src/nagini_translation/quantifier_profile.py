@@ -0,0 +1,217 @@
+"""
+Copyright (c) 2019 ETH Zurich
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+"""
+Profiling of quantifier instantiations. Z3 is made to write a trace of the
+instantiations it performs; the trace is summarized per quantifier ID, and
+quantifier IDs are mapped back to the Python quantifiers or the builtin
+Silver resources and domain axioms they stem from, using the positions of
+the quantifiers in the verified program.
+"""
+
+import ast
+import glob
+import os
+import re
+import tempfile
+
+from collections import Counter
+from nagini_translation.lib import builtin_positions
+from nagini_translation.lib.errors import error_manager
+from nagini_translation.lib.util import get_func_name, pprint
+from typing import Dict, List
+
+
+# Silicon names quantifiers after the line of their source position.
+QID_LINE = re.compile(r'\bprog\.l(\d+)')
+
+QUANTIFIER_FUNCS = ('Forall', 'Exists')
+
+RESOURCE_AXIOM = re.compile(r'\baxiom\s+(\w+)')
+
+
+class QuantifierProfiler:
+    """
+    Makes a Z3 instance write a trace of its quantifier instantiations to a
+    temporary file and summarizes it.
+    """
+
+    def __init__(self) -> None:
+        fd, self.trace_path = tempfile.mkstemp(suffix='.z3-trace')
+        os.close(fd)
+
+    def z3_args(self) -> str:
+        """
+        Returns the arguments that make Z3 write the trace, in the format
+        expected by Silicon's --z3Args option.
+        """
+        return '"trace=true trace_file_name={}"'.format(self.trace_path)
+
+    def collect(self) -> Counter:
+        """
+        Returns the number of instantiations per quantifier ID in the trace
+        written by the last Z3 instance, which must have terminated.
+        """
+        try:
+            with open(self.trace_path, 'r') as trace:
+                return parse_trace(trace)
+        except OSError:
+            return Counter()
+
+    def remove(self) -> None:
+        if os.path.exists(self.trace_path):
+            os.remove(self.trace_path)
+
+
+def parse_trace(lines) -> Counter:
+    """
+    Counts the instantiations per quantifier ID in the given Z3 trace.
+    """
+    qids = {}
+    matches = {}
+    result = Counter()
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            continue
+        kind = parts[0]
+        if kind == '[mk-quant]' and len(parts) > 2:
+            # [mk-quant] #id qid num-vars patterns... body
+            qids[parts[1]] = parts[2]
+        elif kind == '[new-match]' and len(parts) > 2:
+            # [new-match] fingerprint #quant #pattern bindings... ; blamed...
+            matches[parts[1]] = parts[2]
+        elif kind == '[inst-discovered]' and len(parts) > 3:
+            # [inst-discovered] method fingerprint #quant bindings...
+            matches[parts[2]] = parts[3]
+        elif kind == '[instance]' and len(parts) > 1:
+            quant = matches.get(parts[1])
+            if quant is not None:
+                result[qids.get(quant, quant)] += 1
+    return result
+
+
+def _resources_path() -> str:
+    return os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def _resource_axioms() -> Dict[str, str]:
+    """
+    Returns the resource files of all named axioms in the builtin Silver
+    resources.
+    """
+    axioms = {}
+    resources = _resources_path()
+    for path in sorted(glob.glob(os.path.join(resources, '**', '*.sil'),
+                                 recursive=True)):
+        name = os.path.relpath(path, resources)
+        with open(path, 'r') as file:
+            for line in file:
+                axiom = RESOURCE_AXIOM.search(line)
+                if axiom:
+                    axioms[axiom.group(1)] = name
+    return axioms
+
+
+def _quantifier_origins(prog: 'silver.ast.Program', viper_ast: 'ViperAST',
+                        python_file: str) -> Dict[int, List[str]]:
+    """
+    Returns the origins of all quantifiers in the given program by the line
+    of their position. Quantifiers translated from Python carry the ID of
+    the Python node they stem from in their position; quantifiers from the
+    builtin resources carry the position in the resource file. Python files
+    are named relative to the directory of the given main file.
+    """
+    resources = _resources_path()
+    directory = os.path.dirname(os.path.abspath(python_file))
+    result = {}
+    to_visit = [prog]
+    while to_visit:
+        node = to_visit.pop()
+        to_visit.extend(viper_ast.to_list(node.subnodes()))
+        if not isinstance(node, viper_ast.ast.QuantifiedExp):
+            continue
+        pos = node.pos()
+        builtin = builtin_positions.resolve(pos)
+        if builtin:
+            file, line = builtin[:2]
+        elif hasattr(pos, 'start'):
+            file, line = str(pos.file()), pos.start().line()
+        else:
+            continue
+        python_node = (error_manager.get_node(pos.id())
+                       if hasattr(pos, 'id') else None)
+        if (isinstance(python_node, ast.Call) and
+                get_func_name(python_node) in QUANTIFIER_FUNCS):
+            origin = '{} ({}@{})'.format(_shorten(pprint(python_node)),
+                                         os.path.relpath(file, directory),
+                                         line)
+        elif file.startswith(resources):
+            origin = '{}@{}'.format(os.path.relpath(file, resources), line)
+        else:
+            origin = '{}@{}'.format(file, line)
+        origins = result.setdefault(line, [])
+        if origin not in origins:
+            origins.append(origin)
+    return result
+
+
+def _shorten(text: str, length: int = 60) -> str:
+    text = ' '.join(text.split())
+    return text if len(text) <= length else text[:length - 3] + '...'
+
+
+def describe_quantifiers(qids: List[str], prog: 'silver.ast.Program',
+                         viper_ast: 'ViperAST',
+                         python_file: str) -> Dict[str, str]:
+    """
+    Describes the origin of every given quantifier ID: the quantifiers of the
+    program on its line, or the domain axiom it belongs to. Since Silicon
+    names quantifiers only after their line, quantifiers on the same line in
+    different files cannot be told apart and are all listed.
+    """
+    resource_axioms = _resource_axioms()
+    origins = _quantifier_origins(prog, viper_ast, python_file)
+    axiom_domains = {}
+    for domain in viper_ast.to_list(prog.domains()):
+        for axiom in viper_ast.to_list(domain.axioms()):
+            axiom_domains[axiom.name()] = domain.name()
+    result = {}
+    for qid in qids:
+        line = QID_LINE.search(qid)
+        if line:
+            result[qid] = ' or '.join(origins.get(int(line.group(1)), [qid]))
+            continue
+        axiom = max((name for name in axiom_domains if name in qid),
+                    key=len, default=None)
+        if axiom:
+            origin = resource_axioms.get(axiom, 'type domain')
+            result[qid] = 'axiom {} of domain {} ({})'.format(
+                axiom, axiom_domains[axiom], origin)
+        else:
+            result[qid] = qid
+    return result
+
+
+def print_quantifier_profile(profile: Dict[str, Counter],
+                             prog: 'silver.ast.Program',
+                             viper_ast: 'ViperAST', python_file: str,
+                             print=print, limit: int = 10) -> None:
+    """
+    Prints the quantifiers with the most instantiations for every verified
+    member, starting with the member with the most instantiations overall.
+    """
+    qids = {qid for counts in profile.values() for qid in counts}
+    descriptions = describe_quantifiers(sorted(qids), prog, viper_ast,
+                                        python_file)
+    members = sorted(profile, key=lambda name: -sum(profile[name].values()))
+    for member in members:
+        counts = profile[member]
+        print('Quantifier instantiations in {} ({} total):'.format(
+            member, sum(counts.values())))
+        for qid, count in counts.most_common(limit):
+            print('  {:>10}  {}'.format(count, descriptions[qid]))
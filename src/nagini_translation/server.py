@@ -0,0 +1,504 @@
+"""
+Copyright (c) 2019 ETH Zurich
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+"""
+Nagini server that verifies files for several clients concurrently.
+
+Clients connect with a DEALER or REQ socket and send JSON requests, each
+preceded by an empty delimiter frame:
+
+``{"command": "verify", "file": <path>, "select": <names>, "ide_mode": <bool>}``
+    Starts a verification job. The server replies with an ``accepted``
+    message containing the job ID, then sends an ``error`` message for every
+    error as soon as the backend reports it (Silicon only), a ``result``
+    message for every verified member as soon as its verification finishes,
+    and finally a ``done`` message containing the complete output. A new request for a
+    file cancels all running jobs for the same file.
+
+``{"command": "cancel", "job": <id>}``
+    Cancels the given job; the job's client receives a ``cancelled`` message.
+
+For compatibility with older clients, a request that is not JSON is
+interpreted as the path of a file to verify; the server then replies exactly
+once, with the complete output of the job.
+
+Translations are carried out one at a time, since the translator uses global
+state; the verification of the members of all jobs runs concurrently on a
+shared pool of backend instances. Translated programs are kept in memory and
+reused as long as none of the modules they were translated from changes.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+import zmq
+
+from collections import Counter, namedtuple
+from concurrent.futures import as_completed, ThreadPoolExecutor
+from nagini_translation.lib.errors import error_manager
+from nagini_translation.lib.errors.manager import ErrorInformation
+from nagini_translation.lib.jvmaccess import JVM
+from nagini_translation.lib.typeinfo import TypeException
+from nagini_translation.lib.util import (
+    ConsistencyException,
+    InvalidProgramException,
+    UnsupportedException,
+)
+from nagini_translation.lib.viper_ast import ViperAST
+from nagini_translation.main import print_translation_failure, translate
+from nagini_translation.verifier import (
+    ErrorStream,
+    merge_results,
+    split_program,
+    VerificationResult,
+    VerifierPool,
+    ViperVerifier,
+)
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
+
+
+POLL_INTERVAL = 50
+"""
+Time in milliseconds the server waits for new requests before sending
+pending messages to clients.
+"""
+
+# The backends require a file name on their command line; it is not used when
+# verifying programs given as ASTs.
+SERVER_FILE_NAME = 'nagini_server'
+
+
+Translation = namedtuple('Translation',
+                         'files prog dependencies timeouts errors')
+
+# Modification times and digests of modules, taken before translating them.
+Snapshot = namedtuple('Snapshot', 'time files')
+
+MTIME_RESOLUTION = 2.0
+"""
+Coarsest resolution of file modification times in seconds. A file modified
+less than this long before its modification time was read may change again
+without changing the time, so its digest is always compared.
+"""
+
+
+class TranslationCache:
+    """
+    Keeps translated programs in memory, s.t. a file whose modules have not
+    changed since its last translation is not type checked, analyzed and
+    translated again. A module counts as changed if its content hash changed;
+    the hash is only recomputed if the modification time changed.
+    """
+
+    def __init__(self) -> None:
+        self._entries = {}  # type: Dict[Tuple[str, FrozenSet[str]], Translation]
+        # Modules of the last translation of every file.
+        self._modules = {}  # type: Dict[str, Set[str]]
+
+    def _digest(self, path: str) -> str:
+        with open(path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+
+    def _stamp(self, path: str, now: float) -> Tuple[Optional[float], str]:
+        """
+        Returns the modification time and digest of the given file. The time
+        is None if the file may still change without changing it.
+        """
+        mtime = os.path.getmtime(path)
+        digest = self._digest(path)
+        if mtime >= now - MTIME_RESOLUTION:
+            mtime = None
+        return mtime, digest
+
+    def snapshot(self, path: str) -> Snapshot:
+        """
+        Records the state of the given file and of the modules of its last
+        translation; must be called before translating it again, s.t. changes
+        made during the translation are detected later.
+        """
+        now = time.time()
+        files = {}
+        for file in {path} | self._modules.get(path, set()):
+            try:
+                files[file] = self._stamp(file, now)
+            except OSError:
+                pass
+        return Snapshot(now, files)
+
+    def _is_unchanged(self, path: str, mtime: float, digest: str,
+                      files: Dict[str, Tuple[float, str]]) -> bool:
+        try:
+            if mtime is not None and os.path.getmtime(path) == mtime:
+                return True
+            current = self._stamp(path, time.time())
+        except OSError:
+            return False
+        if current[1] != digest:
+            return False
+        files[path] = current
+        return True
+
+    def lookup(self, path: str,
+               selected: Set[str]) -> Optional[Translation]:
+        """
+        Returns the translation of the given file with the given selection,
+        if none of its modules changed since it was translated.
+        """
+        key = (path, frozenset(selected))
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        for file, (mtime, digest) in list(entry.files.items()):
+            if not self._is_unchanged(file, mtime, digest, entry.files):
+                del self._entries[key]
+                return None
+        return entry
+
+    def store(self, path: str, selected: Set[str], files: Set[str],
+              prog: 'silver.ast.Program', dependencies: Dict[str, Set[str]],
+              timeouts: Dict[str, int], errors: ErrorInformation,
+              snapshot: Snapshot) -> None:
+        """
+        Stores the translation of the given file, which consists of the
+        given modules, together with the error information created by it.
+        The state of the modules is taken from the snapshot made before the
+        translation; modules not in the snapshot must not have been modified
+        since it was made.
+        """
+        self._modules[path] = set(files)
+        file_digests = {}
+        for file in files:
+            if file in snapshot.files:
+                file_digests[file] = snapshot.files[file]
+                continue
+            try:
+                mtime = os.path.getmtime(file)
+                if mtime >= snapshot.time - MTIME_RESOLUTION:
+                    # May have been changed during the translation.
+                    return
+                file_digests[file] = (mtime, self._digest(file))
+            except OSError:
+                # Cannot detect changes, so do not cache at all.
+                return
+        self._entries[(path, frozenset(selected))] = Translation(
+            file_digests, prog, dependencies, timeouts, errors)
+
+
+class Job:
+    """
+    A verification job requested by a client.
+    """
+
+    def __init__(self, job_id: int, identity: bytes, path: str,
+                 selected: Set[str], ide_mode: bool, legacy: bool) -> None:
+        self.id = job_id
+        self.identity = identity
+        self.path = path
+        self.selected = selected
+        self.ide_mode = ide_mode
+        self.legacy = legacy
+        self.output = []
+        self.futures = []
+        # IDs of the error information used by the job's translation.
+        self.error_range = None  # type: Optional[Tuple[int, int]]
+        self._cancelled = threading.Event()
+        self._finished = False
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, pool: VerifierPool) -> None:
+        """
+        Marks the job as cancelled, cancels all of its units whose
+        verification has not started yet and stops the backends verifying
+        the others.
+        """
+        self._cancelled.set()
+        for future in self.futures:
+            pool.cancel(future)
+
+    def add_output(self, part: str) -> None:
+        self.output.append(part)
+
+    def finish(self) -> bool:
+        """
+        Marks the job as finished. Returns False if it had already been
+        finished, s.t. every client receives exactly one final message.
+        """
+        with self._lock:
+            if self._finished:
+                return False
+            self._finished = True
+            return True
+
+
+class NaginiServer:
+    """
+    Accepts verification requests on a ZeroMQ ROUTER socket and processes
+    them concurrently.
+    """
+
+    def __init__(self, jvm: JVM, args: 'argparse.Namespace') -> None:
+        self.jvm = jvm
+        self.args = args
+        self.backend = ViperVerifier(args.verifier)
+        self.pool = VerifierPool(jvm, SERVER_FILE_NAME, self.backend,
+                                 max(1, args.workers),
+                                 portfolio=args.portfolio, stream=True)
+        self._job_ids = itertools.count(1)
+        self._jobs = {}                     # type: Dict[int, Job]
+        self._active_jobs = 0
+        # Number of active jobs using the error information with given IDs.
+        self._error_range_users = Counter()
+        self._jobs_lock = threading.Lock()
+        self._translation_lock = threading.Lock()
+        self._translations = TranslationCache()
+        self._executor = ThreadPoolExecutor(max_workers=max(2, args.workers))
+        self._outgoing = queue.Queue()
+
+    def serve(self, address: str) -> None:
+        """
+        Processes requests on the given address until the process is killed.
+        """
+        context = zmq.Context()
+        socket = context.socket(zmq.ROUTER)
+        socket.bind(address)
+        poller = zmq.Poller()
+        poller.register(socket, zmq.POLLIN)
+        while True:
+            events = dict(poller.poll(POLL_INTERVAL))
+            if events.get(socket) == zmq.POLLIN:
+                frames = socket.recv_multipart()
+                self._handle_request(frames[0], frames[-1].decode())
+            while True:
+                try:
+                    identity, message = self._outgoing.get_nowait()
+                except queue.Empty:
+                    break
+                socket.send_multipart([identity, b'', message.encode()])
+
+    def _send(self, identity: bytes, message: Dict[str, Any]) -> None:
+        self._outgoing.put((identity, json.dumps(message)))
+
+    def _handle_request(self, identity: bytes, payload: str) -> None:
+        try:
+            request = json.loads(payload)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            select = self.args.select
+            selected = set(select.split(',')) if select else set()
+            self._start_job(identity, payload.strip(), selected,
+                            self.args.ide_mode, legacy=True)
+            return
+        command = request.get('command')
+        if command == 'verify' and 'file' in request:
+            select = request.get('select')
+            selected = set(select.split(',')) if select else set()
+            ide_mode = request.get('ide_mode', self.args.ide_mode)
+            self._start_job(identity, request['file'], selected, ide_mode,
+                            legacy=False)
+        elif command == 'cancel':
+            with self._jobs_lock:
+                job = self._jobs.get(request.get('job'))
+            if job:
+                self._cancel(job)
+            else:
+                self._send(identity, {'type': 'error',
+                                      'message': 'Unknown job.'})
+        else:
+            self._send(identity, {'type': 'error',
+                                  'message': 'Invalid request.'})
+
+    def _start_job(self, identity: bytes, file: str, selected: Set[str],
+                   ide_mode: bool, legacy: bool) -> None:
+        path = os.path.abspath(file)
+        with self._jobs_lock:
+            stale = [job for job in self._jobs.values() if job.path == path]
+            job = Job(next(self._job_ids), identity, path, selected, ide_mode,
+                      legacy)
+            self._jobs[job.id] = job
+            self._active_jobs += 1
+        for stale_job in stale:
+            self._cancel(stale_job)
+        if not legacy:
+            self._send(identity, {'type': 'accepted', 'job': job.id,
+                                  'file': path})
+        self._executor.submit(self._run_job, job)
+
+    def _cancel(self, job: Job) -> None:
+        job.cancel(self.pool)
+        with self._jobs_lock:
+            self._jobs.pop(job.id, None)
+        if not job.finish():
+            return
+        if job.legacy:
+            self._outgoing.put((job.identity, 'Verification cancelled.'))
+        else:
+            self._send(job.identity, {'type': 'cancelled', 'job': job.id})
+
+    def _complete(self, job: Job, success: bool) -> None:
+        if job.cancelled or not job.finish():
+            return
+        output = '\n'.join(job.output)
+        if job.legacy:
+            self._outgoing.put((job.identity, output))
+        else:
+            self._send(job.identity, {'type': 'done', 'job': job.id,
+                                      'success': success, 'output': output})
+
+    def _run_job(self, job: Job) -> None:
+        self.jvm.attach_thread()
+        try:
+            self._verify_job(job)
+        except Exception:
+            job.add_output(traceback.format_exc())
+            self._complete(job, False)
+        finally:
+            with self._jobs_lock:
+                self._jobs.pop(job.id, None)
+                self._active_jobs -= 1
+                if job.error_range:
+                    self._release_errors(job.error_range)
+                if not self._active_jobs:
+                    # No results are being converted anymore.
+                    error_manager.clear()
+
+    def _use_errors(self, job: Job, errors: ErrorInformation) -> None:
+        """
+        Records that the given job converts errors using the given error
+        information; must be called while holding the jobs lock.
+        """
+        job.error_range = (errors.start, errors.end)
+        self._error_range_users[job.error_range] += 1
+
+    def _release_errors(self, error_range: Tuple[int, int]) -> None:
+        """
+        Discards the given error information if no active job uses it
+        anymore; must be called while holding the jobs lock.
+        """
+        self._error_range_users[error_range] -= 1
+        if not self._error_range_users[error_range]:
+            del self._error_range_users[error_range]
+            error_manager.discard(*error_range)
+
+    def _verify_job(self, job: Job) -> None:
+        start = time.time()
+        with self._translation_lock:
+            if job.cancelled:
+                return
+            # The SIF transformation depends on global JVM state set during
+            # translation, so SIF programs are always translated again.
+            translation = None
+            if not self.args.sif:
+                translation = self._translations.lookup(job.path,
+                                                        job.selected)
+            if translation:
+                prog = translation.prog
+                dependencies = translation.dependencies
+                timeouts = translation.timeouts
+                with self._jobs_lock:
+                    error_manager.restore(translation.errors)
+                    self._use_errors(job, translation.errors)
+            else:
+                dependencies = {}
+                timeouts = {}
+                files = set()
+                warnings = []
+                prune_preamble = not self.args.full_preamble
+                finite_hierarchy = self.args.finite_hierarchy
+                consistency_check = self.args.consistency_check
+                checkpoint = error_manager.checkpoint()
+                snapshot = self._translations.snapshot(job.path)
+                try:
+                    prog = translate(job.path, self.jvm, job.selected,
+                                     self.args.sif, arp=self.args.arp,
+                                     ignore_global=self.args.ignore_global,
+                                     dependencies=dependencies,
+                                     clear_errors=False, source_files=files,
+                                     cache_dir=self.args.cache_dir,
+                                     prune_preamble=prune_preamble,
+                                     finite_hierarchy=finite_hierarchy,
+                                     warnings=warnings,
+                                     consistency_check=consistency_check,
+                                     timeouts=timeouts)
+                except (TypeException, InvalidProgramException,
+                        UnsupportedException, ConsistencyException) as e:
+                    # No errors will be converted for the partial translation.
+                    with self._jobs_lock:
+                        error_manager.discard(checkpoint,
+                                              error_manager.checkpoint())
+                    print_translation_failure(e, job.path, job.add_output)
+                    self._complete(job, False)
+                    return
+                finally:
+                    # Via lists are only shared within one translation.
+                    error_manager.clear_shared_vias()
+                for warning in warnings:
+                    job.add_output('Warning: ' + warning)
+                errors = error_manager.export(checkpoint)
+                with self._jobs_lock:
+                    self._use_errors(job, errors)
+                self._translations.store(job.path, job.selected, files, prog,
+                                         dependencies, timeouts, errors,
+                                         snapshot)
+        viper_ast = ViperAST(self.jvm, self.jvm.java, self.jvm.scala,
+                             self.jvm.viper, job.path)
+        units = split_program(prog, dependencies, viper_ast)
+        stream = None
+        if not job.legacy:
+            stream = ErrorStream(job.ide_mode, self.args.show_viper_errors,
+                                 lambda member, error:
+                                 self._send_error(job, member, error))
+        futures = {self.pool.submit(unit.program, self.args.arp,
+                                    timeouts.get(unit.name, self.args.timeout),
+                                    unit.name, stream): unit
+                   for unit in units}
+        job.futures = list(futures)
+        if job.cancelled:
+            job.cancel(self.pool)
+            return
+        results = []
+        for future in as_completed(futures):
+            if job.cancelled:
+                return
+            result = future.result()
+            results.append(result)
+            if not job.legacy:
+                self._send_result(job, futures[future].name, result)
+        vresult = merge_results(results)
+        job.add_output(vresult.to_string(job.ide_mode,
+                                         self.args.show_viper_errors))
+        duration = '{:.2f}'.format(time.time() - start)
+        job.add_output('Verification took ' + duration + ' seconds.')
+        self._complete(job, bool(vresult))
+
+    def _send_error(self, job: Job, member: str, error: str) -> None:
+        if not job.cancelled:
+            self._send(job.identity, {'type': 'error', 'job': job.id,
+                                      'member': member, 'error': error})
+
+    def _send_result(self, job: Job, member: str,
+                     result: VerificationResult) -> None:
+        errors = []
+        if not result:
+            for error in result.errors:
+                error_string = error.string(job.ide_mode,
+                                            self.args.show_viper_errors)
+                if error_string not in errors:
+                    errors.append(error_string)
+        self._send(job.identity, {'type': 'result', 'job': job.id,
+                                  'member': member, 'success': bool(result),
+                                  'timed_out': result.partial,
+                                  'errors': errors})
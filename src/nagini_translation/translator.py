@@ -41,7 +41,7 @@ from nagini_translation.translators.type import TypeTranslator
 from nagini_translation.translators.type_domain_factory import (
     TypeDomainFactory,
 )
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set
 
 
 class Translator:
@@ -89,14 +89,24 @@ class Translator:
     def translate_program(self, modules: List[PythonModule], sil_progs: List,
                           selected: Set[str] = None,
                           ignore_global: bool = False,
-                          arp: bool = False) -> 'silver.ast.Program':
+                          arp: bool = False,
+                          track_dependencies: bool = False,
+                          prune_preamble: bool = False,
+                          finite_hierarchy: bool = False
+                          ) -> 'silver.ast.Program':
         ctx = Context()
         ctx.current_class = None
         ctx.current_function = None
         ctx.module = modules[0]
         ctx.arp = arp
-        return self.prog_translator.translate_program(modules, sil_progs, ctx,
-                                                      selected, ignore_global)
+        self.prog_translator.track_all = track_dependencies
+        self.prog_translator.prune_preamble = prune_preamble
+        self.prog_translator.finite_hierarchy = finite_hierarchy
+        try:
+            return self.prog_translator.translate_program(
+                modules, sil_progs, ctx, selected, ignore_global)
+        finally:
+            self.prog_translator.config.resolution_cache.clear()
 
     def translate_pythonvar_decl(self, var: PythonVar,
             module: PythonModule) -> 'silver.ast.LocalVarDecl':
@@ -133,6 +143,41 @@ class Translator:
         """
         self.prog_translator.required_names[name] = required_names
 
+    def get_dependencies(self) -> Dict[str, Set[str]]:
+        """
+        Returns the direct dependencies of all members whose dependencies have
+        been tracked during the translation of the program.
+        """
+        return self.prog_translator.get_dependencies()
+
+    def get_source_fingerprints(self) -> Dict[str, str]:
+        """
+        Returns digests of the Python source of all members whose dependencies
+        have been tracked during the translation of the program.
+        """
+        return self.prog_translator.get_source_fingerprints()
+
+    def get_source_names(self) -> Dict[str, str]:
+        """
+        Returns the qualified names and positions of the Python elements that
+        all members whose dependencies have been tracked were translated from.
+        """
+        return self.prog_translator.get_source_names()
+
+    def get_timeouts(self) -> Dict[str, int]:
+        """
+        Returns the time limits declared for the verification of all
+        translated members, in seconds.
+        """
+        return self.prog_translator.get_timeouts()
+
+    def get_warnings(self) -> List[str]:
+        """
+        Returns the warnings about likely performance problems (e.g. possible
+        matching loops) found while translating the program.
+        """
+        return self.prog_translator.config.warnings
+
     def create_obligation_info(self, method: PythonMethod) -> object:
         """
         Create an obligation info for method. This method should be
@@ -22,6 +22,7 @@ from nagini_translation.lib.program_nodes import (
     PythonVar,
 )
 from nagini_translation.lib.jvmaccess import JVM
+from nagini_translation.lib.resolver import ResolutionCache
 from nagini_translation.lib.typedefs import (
     Expr,
     Info,
@@ -63,6 +64,9 @@ class TranslatorConfig:
         self.method_translator = None
         self.type_factory = None
         self.translator = translator
+        # Messages about likely performance problems in the program.
+        self.warnings = []
+        self.resolution_cache = ResolutionCache()
 
 
 class AbstractTranslator(metaclass=ABCMeta):
@@ -77,6 +81,8 @@ class AbstractTranslator(metaclass=ABCMeta):
         self.config = config
         self.viper = viper_ast
         self.jvm = jvm
+        # Handlers of this translator per method name prefix and node type.
+        self._handlers = {}
 
     @property
     def type_factory(self):
@@ -59,7 +59,7 @@ from nagini_translation.lib.util import (
     UnsupportedException
 )
 from nagini_translation.translators.abstract import AbstractTranslator
-from typing import List, Tuple, Union
+from typing import Callable, List, Tuple, Union
 
 
 class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
@@ -93,11 +93,11 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         type is Ref, Bool or Int.
         """
         result = e
-        if target_type == self.viper.Ref:
+        if self.viper.same_type(target_type, self.viper.Ref):
             result = self.to_ref(e, ctx)
-        elif target_type == self.viper.Bool:
+        elif self.viper.same_type(target_type, self.viper.Bool):
             result = self.to_bool(e, ctx, node)
-        elif target_type == self.viper.Int:
+        elif self.viper.same_type(target_type, self.viper.Int):
             result = self.to_int(e, ctx)
         return result
 
@@ -105,7 +105,7 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         e = self.unwrap(e)
         if isinstance(e, (self.viper.ast.And, self.viper.ast.Or)):
             return self._is_pure(e.left()) and self._is_pure(e.right())
-        return e.isPure()
+        return self.viper.is_pure(e)
 
     def to_type(self, e: Expr, t, ctx) -> Expr:
         if t is self.viper.Ref:
@@ -127,19 +127,20 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         if not self._is_pure(e):
             return e
         result = e
-        if e.typ() == self.viper.Int:
-            if (isinstance(e, self.viper.ast.FuncApp) and
-                    e.funcname() == 'int___unbox__'):
-                result = e.args().head()
+        e_type = self.viper.typ(e)
+        if self.viper.same_type(e_type, self.viper.Int):
+            func_app = self.viper.func_app(e)
+            if func_app and func_app[0] == 'int___unbox__':
+                result = func_app[1][0]
             else:
                 prim_int = ctx.module.global_module.classes[PRIMITIVE_INT_TYPE]
                 result = self.get_function_call(prim_int, '__box__',
                                                 [result], [None], None, ctx,
                                                 position=e.pos())
-        elif e.typ() == self.viper.Bool:
-            if (isinstance(e, self.viper.ast.FuncApp) and
-                    e.funcname() == 'bool___unbox__'):
-                result = e.args().head()
+        elif self.viper.same_type(e_type, self.viper.Bool):
+            func_app = self.viper.func_app(e)
+            if func_app and func_app[0] == 'bool___unbox__':
+                result = func_app[1][0]
             else:
                 prim_bool = ctx.module.global_module.classes[PRIMITIVE_BOOL_TYPE]
                 result = self.get_function_call(prim_bool, '__box__',
@@ -157,13 +158,13 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         # Consistency object)
         if not self._is_pure(e):
             return e
-        if e.typ() == self.viper.Bool:
+        if self.viper.has_type(e, self.viper.Bool):
             return e
-        if e.typ() != self.viper.Ref:
+        if not self.viper.has_type(e, self.viper.Ref):
             e = self.to_ref(e, ctx)
-        if (isinstance(e, self.viper.ast.FuncApp) and
-                e.funcname() == '__prim__bool___box__'):
-            return e.args().head()
+        func_app = self.viper.func_app(e)
+        if func_app and func_app[0] == '__prim__bool___box__':
+            return func_app[1][0]
         result = e
         call_bool = True
         if node:
@@ -174,7 +175,7 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
                 result = self.get_function_call(node_type, '__bool__',
                                                 [result], [None], node, ctx,
                                                 position=e.pos())
-        if result.typ() != self.viper.Bool:
+        if not self.viper.has_type(result, self.viper.Bool):
             bool_type = ctx.module.global_module.classes['bool']
             result = self.get_function_call(bool_type, '__unbox__',
                                             [result], [None], node, ctx,
@@ -191,13 +192,13 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         # Consistency object)
         if not self._is_pure(e):
             return e
-        if e.typ() == self.viper.Int:
+        if self.viper.has_type(e, self.viper.Int):
             return e
-        if e.typ() != self.viper.Ref:
+        if not self.viper.has_type(e, self.viper.Ref):
             e = self.to_ref(e, ctx)
-        if (isinstance(e, self.viper.ast.FuncApp) and
-                    e.funcname() == '__prim__int___box__'):
-            return e.args().head()
+        func_app = self.viper.func_app(e)
+        if func_app and func_app[0] == '__prim__int___box__':
+            return func_app[1][0]
         result = e
         int_type = ctx.module.global_module.classes[INT_TYPE]
         result = self.get_function_call(int_type, '__unbox__',
@@ -206,10 +207,11 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         return result
 
     def unwrap(self, e: Expr) -> Expr:
-        if isinstance(e, self.viper.ast.FuncApp):
-            if (e.funcname().endswith('__box__') or
-                    e.funcname().endswith('__unbox__')):
-                return e.args().head()
+        func_app = self.viper.func_app(e)
+        if func_app:
+            if (func_app[0].endswith('__box__') or
+                    func_app[0].endswith('__unbox__')):
+                return func_app[1][0]
         return e
 
     def to_position(
@@ -312,7 +314,7 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         Returns a statement that sets the name of represented by the integer decl_int to
         be defined in the given set of names.
         """
-        if decl_int.typ() == self.viper.Int:
+        if self.viper.has_type(decl_int, self.viper.Int):
             decl_int = self.viper.DomainFuncApp(SINGLE_NAME, [decl_int], self.name_type(),
                                                 pos, info, NAME_DOMAIN)
         new_set = self.viper.ExplicitSet([decl_int], pos, info)
@@ -332,7 +334,7 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         expression is defined in the module represented by the other expression.
         """
         name_type = self.viper.DomainType(NAME_DOMAIN, {}, [])
-        if name.typ() == self.viper.Int:
+        if self.viper.has_type(name, self.viper.Int):
             boxed_name = self.viper.DomainFuncApp(SINGLE_NAME, [name], name_type, pos,
                                                   info, NAME_DOMAIN)
         else:
@@ -345,12 +347,12 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         that represents 'prefix.name'.
         """
         name_type = self.viper.DomainType(NAME_DOMAIN, {}, [])
-        if name.typ() == self.viper.Int:
+        if self.viper.has_type(name, self.viper.Int):
             boxed_name = self.viper.DomainFuncApp(SINGLE_NAME, [name], name_type, pos,
                                                   info, NAME_DOMAIN)
         else:
             boxed_name = name
-        if prefix.typ() == self.viper.Int:
+        if self.viper.has_type(prefix, self.viper.Int):
             boxed_prefix = self.viper.DomainFuncApp(SINGLE_NAME, [prefix], name_type, pos,
                                                     info, NAME_DOMAIN)
         else:
@@ -614,10 +616,9 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
                 res = self.viper.FieldAccess(arg, field, position, info)
                 return res
             if receiver.name == PSEQ_TYPE:
-                if (isinstance(arg, self.viper.ast.FuncApp) and
-                            arg.funcname() == 'PSeq___create__'):
-                    args = self.viper.to_list(arg.args())
-                    return args[0]
+                func_app = self.viper.func_app(arg)
+                if func_app and func_app[0] == 'PSeq___create__':
+                    return func_app[1][0]
         return self.get_function_call(receiver, '__sil_seq__', [arg], [arg_type],
                                       node, ctx, position)
 
@@ -877,9 +878,24 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         else:
             return False
 
+    def get_handler(self, prefix: str, node: ast.AST,
+                    default: Callable) -> Callable:
+        """
+        Returns the method of this translator that translates nodes of the
+        type of the given node, i.e., the method whose name is the given prefix
+        followed by the name of the node type, or the given default if there
+        is none. The method is looked up only once per prefix and node type.
+        """
+        key = (prefix, type(node))
+        handler = self._handlers.get(key)
+        if handler is None:
+            handler = getattr(self, prefix + type(node).__name__, default)
+            self._handlers[key] = handler
+        return handler
+
     def get_target(self, node: ast.AST, ctx: Context) -> PythonModule:
         container = ctx.actual_function if ctx.actual_function else ctx.module
-        containers = [ctx]
+        containers = []
         if ctx.current_class:
             containers.append(ctx.current_class)
         if isinstance(container, (PythonMethod, PythonIOOperation)):
@@ -888,7 +904,8 @@ class CommonTranslator(AbstractTranslator, metaclass=ABCMeta):
         else:
             # Assume module
             containers.extend(container.get_included_modules(()))
-        result = do_get_target(node, containers, container)
+        result = self.config.resolution_cache.resolve(do_get_target, node, ctx,
+                                                      containers, container)
         return result
 
     def get_fresh_int_lit(self, ctx: Context) -> Expr:
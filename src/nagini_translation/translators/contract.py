@@ -8,6 +8,8 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 import ast
 import copy
 
+from collections import OrderedDict
+from jpype import JavaException
 from nagini_contracts.contracts import CONTRACT_WRAPPER_FUNCS
 from nagini_translation.lib.constants import (
     BOOL_TYPE,
@@ -37,6 +39,10 @@ from nagini_translation.lib.program_nodes import (
     toposort_classes,
     chain_cond_exp,
 )
+from nagini_translation.lib.triggers import (
+    find_matching_loops,
+    trigger_candidates,
+)
 from nagini_translation.lib.typedefs import (
     Expr,
     Position,
@@ -54,7 +60,7 @@ from nagini_translation.lib.util import (
 )
 from nagini_translation.translators.abstract import Context
 from nagini_translation.translators.common import CommonTranslator
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 class ContractTranslator(CommonTranslator):
@@ -64,8 +70,7 @@ class ContractTranslator(CommonTranslator):
         Generic visitor function for translating contracts (i.e. calls to
         contract functions)
         """
-        method = 'translate_contract_' + node.__class__.__name__
-        visitor = getattr(self, method, self.translate_generic)
+        visitor = self.get_handler('translate_contract_', node, self.translate_generic)
         return visitor(node, ctx)
 
     def translate_contract_Call(self, node: ast.Call, ctx: Context) -> Expr:
@@ -599,6 +604,55 @@ class ContractTranslator(CommonTranslator):
                 triggers.append(trigger)
         return triggers
 
+    def _infer_triggers(self, body: ast.AST, var_name: str,
+                        terms: Dict[ast.AST, Optional[StmtsAndExpr]],
+                        ctx: Context) -> List['silver.ast.Trigger']:
+        """
+        Infers triggers for the quantified variable with the given name from
+        the given quantifier body, skipping terms that may cause matching
+        loops. If all candidate terms may, warns about the first one, since
+        the backend is likely to choose it. The translations of the candidate
+        terms are taken from the given dict, which was filled while the body
+        was translated (see Context.trigger_terms), s.t. the triggers match
+        the body's encoding and no term is translated twice.
+        """
+        triggers = []
+        looping = None
+        for candidate, translated in terms.items():
+            if find_matching_loops(candidate, body, var_name):
+                looping = looping or candidate
+                continue
+            if translated is None:
+                continue
+            part_stmt, part = translated
+            part = self.unwrap(part)
+            if part_stmt or not self.viper.func_app(part):
+                continue
+            try:
+                triggers.append(self.viper.Trigger([part],
+                                                   self.no_position(ctx),
+                                                   self.no_info(ctx)))
+            except JavaException:
+                # Not a valid trigger term for the backend.
+                pass
+        if not triggers and looping:
+            self._warn_matching_loops(looping, body, var_name, ctx)
+        return triggers
+
+    def _warn_matching_loops(self, trigger: ast.AST, body: ast.AST,
+                             var_name: str, ctx: Context) -> None:
+        """
+        Warns if the given trigger term may cause a matching loop for the
+        quantified variable with the given name in the given body.
+        """
+        for term in find_matching_loops(trigger, body, var_name):
+            message = ('Possible matching loop: trigger {} matches {} '
+                       '({}@{}.{})'.format(pprint(trigger), pprint(term),
+                                           ctx.module.file, term.lineno,
+                                           term.col_offset))
+            if message not in self.config.warnings:
+                self.config.warnings.append(message)
+
     def _create_quantifier_contains_expr(self, e: Expr,
                                          domain_node: ast.AST,
                                          ctx: Context,
@@ -809,16 +863,30 @@ class ContractTranslator(CommonTranslator):
         if isinstance(lambda_.body, ast.Tuple):
             if not len(lambda_.body.elts) == 2:
                 raise InvalidProgramException(node, 'invalid.forall')
-            body_stmt, rhs = self.translate_expr(lambda_.body.elts[0], ctx,
-                                                 self.viper.Bool, impure)
-
-            triggers = self._translate_triggers(lambda_.body, node, ctx)
+            body_node = lambda_.body.elts[0]
         else:
-            body_type = self.get_type(lambda_.body, ctx)
+            body_node = lambda_.body
+            body_type = self.get_type(body_node, ctx)
             if not body_type or body_type.name != BOOL_TYPE:
                 raise InvalidProgramException(node, 'invalid.forall')
-            body_stmt, rhs = self.translate_expr(lambda_.body, ctx,
+
+        # Collect the translations of all trigger candidates in case triggers
+        # have to be inferred (see _infer_triggers).
+        terms = OrderedDict.fromkeys(trigger_candidates(body_node, arg.arg))
+        outer_terms = ctx.trigger_terms
+        ctx.trigger_terms = terms
+        try:
+            body_stmt, rhs = self.translate_expr(body_node, ctx,
                                                  self.viper.Bool, impure)
+        finally:
+            ctx.trigger_terms = outer_terms
+
+        if isinstance(lambda_.body, ast.Tuple):
+            triggers = self._translate_triggers(lambda_.body, node, ctx)
+            for trigger in lambda_.body.elts[1].elts:
+                for term in trigger.elts:
+                    self._warn_matching_loops(term, body_node, arg.arg, ctx)
+        else:
             triggers = []
 
         ctx.remove_alias(arg.arg)
@@ -848,7 +916,17 @@ class ContractTranslator(CommonTranslator):
                                                  self.no_info(ctx))
                 triggers = [lhs_trigger] + triggers
             except Exception:
-                pass
+                if not triggers:
+                    # Use the triggers inferred from the body instead of
+                    # leaving the choice to the backend.
+                    triggers = self._infer_triggers(body_node, arg.arg,
+                                                    terms, ctx)
+            else:
+                if always_use:
+                    domain_term = ast.Compare(ast.Name(arg.arg, ast.Load()),
+                                              [ast.In()], [domain_node])
+                    self._warn_matching_loops(domain_term, body_node, arg.arg,
+                                              ctx)
         var_type_check = self.type_check(var.ref(), var.type,
                                          self.no_position(ctx), ctx, False)
         implication = self.viper.Implies(var_type_check, implication,
@@ -66,11 +66,6 @@ from nagini_translation.translators.common import CommonTranslator
 from typing import List, Optional, Tuple, Union
 
 
-# Maps function names to bools; caches which functions take an additonal argument
-# encoding if impure assertions are allowed or not.
-TAKES_IMPURE_ARGS = {}
-
-
 class ExpressionTranslator(CommonTranslator):
 
     def __init__(self, *args, **kwargs) -> None:
@@ -80,6 +75,10 @@ class ExpressionTranslator(CommonTranslator):
         self._is_expression = False
         self._target_type = None
         self._as_read = False
+        # Maps node types to their translation method and whether that method
+        # takes an additional argument encoding if impure assertions are
+        # allowed or not.
+        self._expr_handlers = {}
         self._primitive_operations = {
             ast.Add: self.viper.Add,
             ast.Sub: self.viper.Sub,
@@ -122,8 +121,10 @@ class ExpressionTranslator(CommonTranslator):
         self._target_type = target_type
         stmt, result = self._translate_only(node, ctx, impure)
 
-        if target_type != result.typ():
+        if not self.viper.has_type(result, target_type):
             result = self.convert_to_type(result, target_type, ctx, node)
+        if ctx.trigger_terms is not None and node in ctx.trigger_terms:
+            ctx.trigger_terms[node] = (stmt, result)
 
         self._target_type = old_target
         self._as_read = old_as_read
@@ -135,14 +136,14 @@ class ExpressionTranslator(CommonTranslator):
         Translates an expression, but does so without changing the expression's
         type in any way.
         """
-        method = 'translate_' + node.__class__.__name__
-        visitor = getattr(self, method, self.translate_generic)
-        if method in TAKES_IMPURE_ARGS:
-            impure_arg = TAKES_IMPURE_ARGS[method]
-        else:
+        entry = self._expr_handlers.get(type(node))
+        if entry is None:
+            visitor = self.get_handler('translate_', node,
+                                       self.translate_generic)
             sig = inspect.signature(visitor)
-            impure_arg = len(sig.parameters) > 2
-            TAKES_IMPURE_ARGS[method] = impure_arg
+            entry = (visitor, len(sig.parameters) > 2)
+            self._expr_handlers[type(node)] = entry
+        visitor, impure_arg = entry
         if impure_arg:
             stmt, result = visitor(node, ctx, impure)
         else:
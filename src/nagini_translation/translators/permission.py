@@ -28,8 +28,7 @@ class PermTranslator(CommonTranslator):
         """
         Generic visitor function for translating a permission amount
         """
-        method = 'translate_perm_' + node.__class__.__name__
-        visitor = getattr(self, method, self.translate_generic)
+        visitor = self.get_handler('translate_perm_', node, self.translate_generic)
         return visitor(node, ctx)
 
     def translate_perm_Num(self, node: ast.Num, ctx: Context) -> Expr:
@@ -46,7 +45,8 @@ class PermTranslator(CommonTranslator):
             return int_val, True
         else:
             int_or_perm_val = self.translate_perm(node, ctx)
-            return int_or_perm_val, int_or_perm_val.typ() == self.viper.Int
+            return int_or_perm_val, self.viper.has_type(int_or_perm_val,
+                                                        self.viper.Int)
 
     def translate_perm_BinOp(self, node: ast.BinOp, ctx: Context) -> Expr:
 
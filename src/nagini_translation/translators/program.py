@@ -6,8 +6,9 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
 import ast
-from collections import OrderedDict
-from typing import List, Set, Tuple
+import hashlib
+from collections import namedtuple, OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
 
 from nagini_translation.lib.constants import (
     ARBITRARY_BOOL_FUNC,
@@ -30,7 +31,9 @@ from nagini_translation.lib.constants import (
     THREAD_DOMAIN,
     THREAD_POST_PRED,
     THREAD_START_PRED,
+    UNTRACKED_DEPENDENCIES,
 )
+from nagini_translation.lib.dependency_graph import DependencyGraph
 from nagini_translation.lib.program_nodes import (
     MethodType,
     PythonClass,
@@ -40,6 +43,10 @@ from nagini_translation.lib.program_nodes import (
     PythonNode,
     PythonVar,
 )
+from nagini_translation.lib.silver_references import (
+    get_references,
+    ProgramReferences,
+)
 from nagini_translation.lib.typedefs import (
     Domain,
     DomainAxiom,
@@ -65,11 +72,29 @@ from nagini_translation.translators.abstract import Context
 from nagini_translation.translators.common import CommonTranslator
 
 
+# The type domain functions and axioms created for a single class, together
+# with the names they reference.
+TypeGroup = namedtuple('TypeGroup', 'names functions axioms used_names')
+
+
 class ProgramTranslator(CommonTranslator):
     def __init__(self, config: 'TranslatorConfig', jvm: 'JVM', source_file: str,
                  type_info: 'TypeInfo', viper_ast: 'ViperAST') -> None:
         super().__init__(config, jvm, source_file, type_info, viper_ast)
         self.required_names = {}
+        # If set, dependencies are tracked for all translated members, not
+        # only when parts of the program have been selected.
+        self.track_all = False
+        self.untracked_used_names = set()
+        self.tracked_nodes = {}
+        # Time limits declared for the verification of translated members,
+        # by their Silver names; collected whether or not dependencies are
+        # tracked.
+        self.timeouts = {}
+        # If set, only the parts of the preamble and of the type domain that
+        # are reachable from the translated program are emitted.
+        self.prune_preamble = False
+        self.finite_hierarchy = False
 
     def translate_field(self, field: PythonField,
                         ctx: Context) -> 'silver.ast.Field':
@@ -480,31 +505,98 @@ class ProgramTranslator(CommonTranslator):
 
     def _add_all_used_names(self, initial: Set[str]) -> None:
         """
-        Calculates the names of all methods and functions used by the program,
-        based on the names reported to be used by the viper_ast module, and adds
-        them to the given set.
+        Calculates the names of all methods, functions, predicates, domain
+        functions and fields used by the program, based on the names reported
+        to be used by the viper_ast module, and adds them to the given set.
         """
-        used_names = initial
         to_add = list(self.viper.used_names)
-        index = 0
-        while index < len(to_add):
-            current = to_add[index]
-            if current not in used_names:
-                used_names.add(current)
-                if current in self.required_names:
-                    to_add.extend(self.required_names[current])
-            index = index + 1
+        if self.track_all:
+            # Used names are distributed over the sets of the tracked members.
+            for member_used_names in self.viper.used_names_sets.values():
+                to_add.extend(member_used_names)
+        required = DependencyGraph(self.required_names)
+        initial.update(required.reachable(to_add))
+
+    def _compute_reachable_names(self, roots: Set[str],
+                                 references: ProgramReferences,
+                                 type_groups: List[TypeGroup]) -> Set[str]:
+        """
+        Computes the names of all preamble members, domain functions and
+        fields reachable from the given names. Domain axioms are reachable if
+        they do not mention any function of their own domain or if one of
+        these functions is reachable; the type domain parts of a class are
+        reachable if one of their functions is reachable. Everything
+        referenced by a reachable member, axiom or class is reachable as well.
+        """
+        reachable = set(roots)
+        to_add = list(roots)
+        axioms = []
+        for functions, axiom_refs in references.domains.values():
+            axioms.extend((functions & refs, refs) for refs in axiom_refs)
+        groups = list(type_groups)
+        while to_add:
+            while to_add:
+                current = to_add.pop()
+                for name in references.members.get(current, ()):
+                    if name not in reachable:
+                        reachable.add(name)
+                        to_add.append(name)
+            remaining = []
+            for own, refs in axioms:
+                if own and own.isdisjoint(reachable):
+                    remaining.append((own, refs))
+                else:
+                    to_add.extend(refs - reachable)
+                    reachable.update(refs)
+            axioms = remaining
+            remaining = []
+            for group in groups:
+                if reachable.isdisjoint(group.names):
+                    remaining.append(group)
+                else:
+                    to_add.extend(group.used_names - reachable)
+                    reachable.update(group.used_names)
+            groups = remaining
+        return reachable
+
+    def _prune_domain(self, domain: Domain, reachable: Set[str],
+                      references: ProgramReferences) -> Domain:
+        """
+        Returns the given preamble domain without its unreachable functions
+        and axioms.
+        """
+        functions = self.viper.to_list(domain.functions())
+        axioms = self.viper.to_list(domain.axioms())
+        own_functions, axiom_refs = references.domains[domain.name()]
+        kept_functions = [func for func in functions
+                          if func.name() in reachable]
+        kept_axioms = []
+        for axiom, refs in zip(axioms, axiom_refs):
+            own = refs & own_functions
+            if not own or not own.isdisjoint(reachable):
+                kept_axioms.append(axiom)
+        if (len(kept_functions) == len(functions) and
+                len(kept_axioms) == len(axioms)):
+            return domain
+        return self.viper.Domain(domain.name(), kept_functions, kept_axioms,
+                                 self.viper.to_list(domain.typVars()),
+                                 domain.pos(), domain.info())
 
     def _convert_silver_elements(
-            self, sil_progs: Program, all_used: List[str],
-            ctx: Context) -> Tuple[List[Domain],
-                                   List[Predicate],
-                                   List[Function],
-                                   List[Method]]:
+            self, sil_progs: Program, all_used: Set[str],
+            ctx: Context,
+            type_groups: List[TypeGroup] = None) -> Tuple[List[Domain],
+                                                          List[Predicate],
+                                                          List[Function],
+                                                          List[Method],
+                                                          Optional[Set[str]]]:
         """
         Extracts domains, functions, predicates and methods from the given list
         of Silver programs, applies the necessary conversions (e.g. related to
         obligations) to them, and returns them in separate lists.
+        If the type domain parts of all classes are given, the names reachable
+        from the program are computed and returned as well, and unreachable
+        domain functions, axioms and predicates are left out.
         """
         domains = []
         functions = []
@@ -520,7 +612,10 @@ class ProgramTranslator(CommonTranslator):
 
         # Reset used names set, we only need the additional ones used by the
         # upcoming method transformation.
-        self.viper.used_names = set()
+        if self.track_all:
+            self.viper.used_names = self.untracked_used_names
+        else:
+            self.viper.used_names = set()
         for method in self.viper.to_list(sil_progs.methods()):
             if method.name() in used_names:
                 body = self.viper.from_option(method.body())
@@ -545,7 +640,7 @@ class ProgramTranslator(CommonTranslator):
         # requirements (which should never be the case).
         self._add_all_used_names(used_names)
 
-        domains += [
+        sil_domains = [
             domain for domain in self.viper.to_list(sil_progs.domains())
             if domain.name() != 'PyType']
 
@@ -553,9 +648,28 @@ class ProgramTranslator(CommonTranslator):
             function
             for function in self.viper.to_list(sil_progs.functions())
             if function.name() in used_names]
-        predicates += self.viper.to_list(sil_progs.predicates())
-
-        return domains, predicates, functions, methods
+        sil_predicates = self.viper.to_list(sil_progs.predicates())
+
+        if type_groups is None:
+            domains += sil_domains
+            predicates += sil_predicates
+            return domains, predicates, functions, methods, None
+
+        # With a selection, used_names only contains the dependencies of the
+        # selected members, but other parts of the program (e.g. the type
+        # domain) may still reference the preamble.
+        roots = set(used_names)
+        roots.update(self.untracked_used_names)
+        for member_used_names in self.viper.used_names_sets.values():
+            roots.update(member_used_names)
+        references = get_references(sil_progs, self.viper)
+        reachable = self._compute_reachable_names(roots, references,
+                                                  type_groups)
+        domains += [self._prune_domain(domain, reachable, references)
+                    for domain in sil_domains]
+        predicates += [pred for pred in sil_predicates
+                       if pred.name() in reachable]
+        return domains, predicates, functions, methods, reachable
 
     def track_dependencies(self, selected_names: List[str], selected: Set[str],
                            node: PythonNode, ctx: Context) -> None:
@@ -566,9 +680,13 @@ class ProgramTranslator(CommonTranslator):
         this node. Also checks if the given element is among those selected
         to be verified, and adds its Silver name to the list of selected Silver
         names later used when computing which parts of the program to give to
-        Viper.
+        Viper. The time limit declared for the given node, if any, is recorded
+        in any case.
         """
-        if not selected:
+        timeout = getattr(node, 'timeout', None)
+        if timeout is not None:
+            self.timeouts[node.sil_name] = timeout
+        if not selected and not self.track_all:
             return
         if node.sil_name in self.viper.used_names_sets:
             used_names = self.viper.used_names_sets[node.sil_name]
@@ -576,13 +694,78 @@ class ProgramTranslator(CommonTranslator):
             used_names = set()
         self.viper.used_names = used_names
         self.viper.used_names_sets[node.sil_name] = used_names
-        if selected_names is None:
+        self.tracked_nodes[node.sil_name] = node
+        if selected_names is None or not selected:
             return
         if (node.name in selected or
                 (hasattr(node, 'cls') and node.cls and
                  node.cls.name + '.' + node.name in selected)):
             selected_names.append(node.sil_name)
 
+    def get_dependency_graph(self) -> DependencyGraph:
+        """
+        Returns the dependency graph of all members whose dependencies have
+        been tracked and of all native Silver members with known
+        requirements.
+        """
+        graph = DependencyGraph(self.viper.used_names_sets)
+        for name, required in self.required_names.items():
+            graph.add_edges(name, required)
+        return graph
+
+    def get_dependencies(self) -> Dict[str, Set[str]]:
+        """
+        Returns a map from the Silver names of all members whose dependencies
+        have been tracked to the names of the methods, functions and
+        predicates they directly depend on. Names used by parts of the program
+        that do not belong to a single tracked member are stored under the
+        key UNTRACKED_DEPENDENCIES.
+        """
+        graph = self.get_dependency_graph()
+        graph.add_edges(UNTRACKED_DEPENDENCIES, self.untracked_used_names)
+        return graph.export()
+
+    def get_source_fingerprints(self) -> Dict[str, str]:
+        """
+        Returns a map from the Silver names of all tracked members to a digest
+        of the Python AST they were translated from, including all source
+        positions.
+        """
+        result = {}
+        for name, node in self.tracked_nodes.items():
+            if isinstance(node.node, ast.AST):
+                dump = ast.dump(node.node, include_attributes=True)
+            else:
+                dump = ''
+            result[name] = hashlib.sha256(dump.encode()).hexdigest()
+        return result
+
+    def get_source_names(self) -> Dict[str, str]:
+        """
+        Returns a map from the Silver names of all tracked members to the
+        qualified name and position of the Python element they were
+        translated from.
+        """
+        result = {}
+        for name, node in self.tracked_nodes.items():
+            source = node.name
+            if getattr(node, 'cls', None):
+                source = node.cls.name + '.' + source
+            if isinstance(node.node, ast.AST) and hasattr(node.node, 'lineno'):
+                module = getattr(node, 'module', None)
+                file = module.file if module else ''
+                source += ' ({}@{})'.format(file, node.node.lineno)
+            result[name] = source
+        return result
+
+    def get_timeouts(self) -> Dict[str, int]:
+        """
+        Returns a map from the Silver names of all translated members to the
+        number of seconds their verification may take, for all members
+        translated from Python elements with a Timeout decorator.
+        """
+        return dict(self.timeouts)
+
     def create_functions_domain(self, constants: List, ctx: Context):
         return self.viper.Domain(FUNCTION_DOMAIN_NAME, constants, [], [],
                                  self.no_position(ctx), self.no_info(ctx))
@@ -1125,7 +1308,15 @@ class ProgramTranslator(CommonTranslator):
         """
         Translates the PythonModules created by the analyzer to a Viper program.
         """
-        fields = self._create_predefined_fields(ctx)
+        # Names used before the first and after the last tracked member are not
+        # attributed to any single member.
+        self.untracked_used_names = self.viper.used_names
+        # The ARP and SIF transformations add references to the program after
+        # its translation, so we cannot compute what they need.
+        prune = (self.prune_preamble and not ctx.arp and
+                 not isinstance(self.viper, ViperASTExtended))
+        preamble_fields = self._create_predefined_fields(ctx)
+        fields = []
         domains = []
         predicates = []
         functions = []
@@ -1136,15 +1327,21 @@ class ProgramTranslator(CommonTranslator):
         predicates.extend(obl_predicates)
         predicates.extend(self.create_thread_predicates(ctx))
         functions.append(self.create_joinable_function(ctx))
-        fields.extend(obl_fields)
+        preamble_fields.extend(obl_fields)
 
         functions.extend(self.create_definedness_functions(ctx))
         functions.extend(self.create_asserting_function(ctx))
         functions.append(self.create_arbitrary_bool_func(ctx))
         predicates.append(self.create_may_set_predicate(ctx))
 
+        if self.finite_hierarchy:
+            self.type_factory.number_classes(
+                cls for module in modules
+                for class_name, cls in module.classes.items()
+                if class_name not in PRIMITIVES and class_name == cls.name)
         type_funcs = self.type_factory.get_default_functions(ctx)
         type_axioms = self.type_factory.get_default_axioms(ctx)
+        type_groups = []
 
         predicate_families = OrderedDict()
         static_fields = OrderedDict()
@@ -1229,10 +1426,22 @@ class ProgramTranslator(CommonTranslator):
                     adt_list.append(cls)
                 old_class = ctx.current_class
                 ctx.current_class = cls
+                if prune:
+                    # Record the names used by the type domain parts of this
+                    # class separately, they are only needed if the class
+                    # is reachable.
+                    outer_used_names = self.viper.used_names
+                    self.viper.used_names = set()
                 funcs, axioms = self.type_factory.create_type(cls, ctx)
-                type_funcs.extend(funcs)
-                if axioms:
-                    type_axioms.extend(axioms)
+                if prune:
+                    type_groups.append(TypeGroup(
+                        frozenset(func.name() for func in funcs), funcs,
+                        axioms, self.viper.used_names))
+                    self.viper.used_names = outer_used_names
+                else:
+                    type_funcs.extend(funcs)
+                    if axioms:
+                        type_axioms.extend(axioms)
                 for func_name in cls.functions:
                     func = cls.functions[func_name]
                     if func.interface:
@@ -1324,30 +1533,20 @@ class ProgramTranslator(CommonTranslator):
                                                  ctx)
             predicates.append(pf)
 
+        if self.track_all:
+            self.viper.used_names = self.untracked_used_names
+
         all_used_names = None
         if selected:
             # Compute all dependencies of directly selected methods/...
-            all_used_names = list(selected_names)
-            i = 0
-            while i < len(all_used_names):
-                name = all_used_names[i]
-                to_add = set()
-                if name in self.viper.used_names_sets:
-                    to_add = self.viper.used_names_sets[name]
-                if name in self.required_names:
-                    to_add = self.required_names[name]
-                for add in to_add:
-                    if not add in all_used_names:
-                        all_used_names.append(add)
-                i += 1
+            graph = self.get_dependency_graph()
+            all_used_names = graph.reachable(selected_names)
 
             # Filter out anything the selected part does not depend on.
             predicates = [p for p in predicates if p.name() in all_used_names]
             functions = [f for f in functions if f.name() in all_used_names]
             methods = [m for m in methods if m.name() in all_used_names]
 
-        domains.append(self.type_factory.create_type_domain(type_funcs,
-                                                            type_axioms, ctx))
         domains.append(self.create_thread_domain(ctx))
         domains.append(self.create_functions_domain(func_constants, ctx))
         domains.append(self.create_method_id_domain(threading_ids_constants, ctx))
@@ -1356,9 +1555,21 @@ class ProgramTranslator(CommonTranslator):
         domains.extend(adts_domains)
         functions.extend(adts_functions)
 
-        converted_sil_progs = self._convert_silver_elements(sil_progs,
-                                                            all_used_names, ctx)
-        s_domains, s_predicates, s_functions, s_methods = converted_sil_progs
+        converted_sil_progs = self._convert_silver_elements(
+            sil_progs, all_used_names, ctx, type_groups if prune else None)
+        s_domains, s_predicates, s_functions, s_methods, reachable = \
+            converted_sil_progs
+        if prune:
+            for group in type_groups:
+                if not reachable.isdisjoint(group.names):
+                    type_funcs.extend(group.functions)
+                    type_axioms.extend(group.axioms)
+            preamble_fields = [field for field in preamble_fields
+                               if field.name() in reachable]
+        domains.insert(0, self.type_factory.create_type_domain(type_funcs,
+                                                               type_axioms,
+                                                               ctx))
+        fields = preamble_fields + fields
         domains += s_domains
         predicates += s_predicates
         functions += s_functions
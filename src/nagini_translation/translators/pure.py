@@ -73,8 +73,7 @@ class PureTranslator(CommonTranslator):
 
     def translate_pure(self, conds: List, node: ast.AST,
                        ctx: Context) -> List[Wrapper]:
-        method = 'translate_pure_' + node.__class__.__name__
-        visitor = getattr(self, method, self.translate_pure_generic)
+        visitor = self.get_handler('translate_pure_', node, self.translate_pure_generic)
         return visitor(conds, node, ctx)
 
     def translate_pure_generic(self, conds: List,
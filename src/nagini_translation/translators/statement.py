@@ -76,8 +76,7 @@ class StatementTranslator(CommonTranslator):
         """
         Generic visitor function for translating statements
         """
-        method = 'translate_stmt_' + node.__class__.__name__
-        visitor = getattr(self, method, self.translate_generic)
+        visitor = self.get_handler('translate_stmt_', node, self.translate_generic)
         return visitor(node, ctx)
 
     def _execute_module_statements(self, module: PythonModule, import_stmt: ast.AST,
@@ -71,7 +71,7 @@ class TypeTranslator(CommonTranslator):
         or None if the type is void.
         """
         container = ctx.actual_function if ctx.actual_function else ctx.module
-        containers = [ctx]
+        containers = []
         if ctx.current_class:
             containers.append(ctx.current_class)
         if isinstance(container, (PythonMethod, PythonIOOperation)):
@@ -80,7 +80,8 @@ class TypeTranslator(CommonTranslator):
         else:
             # Assume module
             containers.extend(container.get_included_modules())
-        return do_get_type(node, containers, container)
+        return self.config.resolution_cache.resolve(do_get_type, node, ctx,
+                                                    containers, container)
 
     def type_check(self, lhs: Expr, type: PythonType,
                    position: 'silver.ast.Position',
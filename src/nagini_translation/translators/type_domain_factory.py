@@ -18,7 +18,7 @@ from nagini_translation.lib.program_nodes import (
 )
 from nagini_translation.lib.viper_ast import ViperAST
 from nagini_translation.translators.abstract import Context, Expr
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 class TypeDomainFactory:
@@ -32,6 +32,10 @@ class TypeDomainFactory:
         self.viper = viper
         self.type_domain = 'PyType'
         self.translator = translator
+        # Preorder intervals of the class hierarchy; if set (see
+        # number_classes), subtyping between classes is encoded by
+        # interval containment.
+        self.class_intervals = None  # type: Optional[Dict[PythonClass, Tuple[int, int]]]
 
     def no_position(self, ctx: Context) -> 'silver.ast.Position':
         return self.translator.no_position(ctx)
@@ -42,6 +46,67 @@ class TypeDomainFactory:
     def no_info(self, ctx: Context) -> 'silver.ast.Position':
         return self.translator.no_info(ctx)
 
+    def number_classes(self, classes: Iterable[PythonClass]) -> None:
+        """
+        Numbers the given classes and all their superclasses in preorder of
+        the class hierarchy rooted at object, and remembers for every class
+        the interval of numbers of the classes in its subtree. Classes that
+        are not connected to object by subtype axioms (interfaces without a
+        superclass and their subclasses) are not numbered.
+
+        Afterwards, the type domain describes the hierarchy by these intervals
+        (see create_interval_axiom) instead of deriving that unrelated classes
+        are not subtypes of each other via quantified axioms.
+        """
+        parents = {}
+        object_class = None
+        to_visit = list(classes)
+        while to_visit:
+            cls = to_visit.pop()
+            if cls in parents:
+                continue
+            if cls.superclass:
+                parent = cls.superclass.python_class
+            elif cls.name == OBJECT_TYPE:
+                object_class = cls
+                parent = None
+            elif cls.interface:
+                parent = None
+            else:
+                parent = cls.module.global_module.classes[OBJECT_TYPE]
+            parents[cls] = parent
+            if parent:
+                to_visit.append(parent)
+        children = {}
+        for cls, parent in parents.items():
+            if parent:
+                children.setdefault(parent, []).append(cls)
+        self.class_intervals = {}
+        if object_class:
+            self._number_subtree(object_class, children, 0)
+
+    def _number_subtree(self, cls: PythonClass,
+                        children: Dict[PythonClass, List[PythonClass]],
+                        number: int) -> int:
+        """
+        Numbers the subtree of the given class starting with the given number,
+        returns the next free number.
+        """
+        next_number = number + 1
+        for sub in sorted(children.get(cls, []), key=lambda c: c.sil_name):
+            next_number = self._number_subtree(sub, children, next_number)
+        self.class_intervals[cls] = (number, next_number - 1)
+        return next_number
+
+    def _is_exact(self, type: PythonType) -> bool:
+        """
+        Returns true iff the given type is a numbered class without type
+        arguments, i.e., exactly the numbered types in its interval are its
+        subtypes.
+        """
+        return (isinstance(type, PythonClass) and not type.type_vars and
+                type.name != TUPLE_TYPE and type in self.class_intervals)
+
     def get_default_axioms(self,
                            ctx: Context) -> List['silver.ast.DomainAxiom']:
         result = [
@@ -51,12 +116,21 @@ class TypeDomainFactory:
             self.create_null_type_axiom(ctx),
             self.create_object_subtype_axiom(ctx),
             self.create_subtype_exclusion_axiom(ctx),
-            self.create_subtype_exclusion_axiom_2(ctx),
             self.create_subtype_exclusion_propagation_axiom(ctx),
             self.create_tuple_arg_axiom(ctx),
             self.create_tuple_args_axiom(ctx),
             self.create_tuple_subtype_axiom(ctx),
         ]
+        if self.class_intervals is None:
+            result.append(self.create_subtype_exclusion_axiom_2(ctx))
+        else:
+            # Antisymmetry follows from the intervals for all numbered
+            # classes. The transitivity and exclusion propagation axioms
+            # above are still emitted and match on all types, since subtyping
+            # between instances of generic classes needs them; the exclusion
+            # axiom only matches on extends_ facts, which are emitted for
+            # generic and unnumbered classes only.
+            result.append(self.create_interval_axiom(ctx))
         result.extend(self.create_union_subtype_axioms(ctx))
         result.extend(self.create_subtype_union_axioms(ctx))
         return result
@@ -71,9 +145,117 @@ class TypeDomainFactory:
             self.typeof_func(ctx),
             self.basic_func(ctx),
         ]
+        if self.class_intervals is not None:
+            result.extend(self.interval_funcs(ctx))
         result.extend(self.union_funcs(ctx))
         return result
 
+    def interval_funcs(self, ctx: Context) -> List['silver.ast.DomainFunc']:
+        """
+        Creates the functions describing the position of a type in the class
+        hierarchy:
+        function type_low(t: PyType): Int
+        function type_high(t: PyType): Int
+        function type_ranked(t: PyType): Bool
+        function type_exact(t: PyType): Bool
+        """
+        position, info = self.no_position(ctx), self.no_info(ctx)
+        result = []
+        for name, typ in (('type_low', self.viper.Int),
+                          ('type_high', self.viper.Int),
+                          ('type_ranked', self.viper.Bool),
+                          ('type_exact', self.viper.Bool)):
+            arg = self.viper.LocalVarDecl('t', self.type_type(), position,
+                                          info)
+            result.append(self.viper.DomainFunc(name, [arg], typ, False,
+                                                position, info,
+                                                self.type_domain))
+        return result
+
+    def _interval_app(self, name: str, type: Expr,
+                      ctx: Context) -> 'silver.ast.DomainFuncApp':
+        typ = self.viper.Bool if name in ('type_ranked',
+                                          'type_exact') else self.viper.Int
+        return self.viper.DomainFuncApp(name, [type], typ,
+                                        self.no_position(ctx),
+                                        self.no_info(ctx), self.type_domain)
+
+    def create_interval_axiom(self, ctx: Context) -> 'silver.ast.DomainAxiom':
+        """
+        Creates the axiom that relates subtyping to the intervals of the
+        class hierarchy. Every subtype of a numbered class lies within its
+        interval, and for classes without type arguments, the converse holds
+        as well:
+
+        forall sub: PyType, super: PyType :: { issubtype(sub, super) }
+          (issubtype(sub, super) && type_ranked(super) ==>
+           type_low(super) <= type_low(sub) &&
+           type_low(sub) <= type_high(super)) &&
+          (type_exact(super) && type_low(super) <= type_low(sub) &&
+           type_low(sub) <= type_high(super) ==> issubtype(sub, super))
+
+        Types that are not below any numbered class other than object have
+        the number of object, which is not contained in any other interval.
+        """
+        position, info = self.no_position(ctx), self.no_info(ctx)
+        arg_sub = self.viper.LocalVarDecl('sub', self.type_type(), position,
+                                          info)
+        var_sub = self.viper.LocalVar('sub', self.type_type(), position, info)
+        arg_super = self.viper.LocalVarDecl('super', self.type_type(),
+                                            position, info)
+        var_super = self.viper.LocalVar('super', self.type_type(), position,
+                                        info)
+        subtype = self._issubtype(var_sub, var_super, ctx)
+        sub_low = self._interval_app('type_low', var_sub, ctx)
+        above_low = self.viper.LeCmp(
+            self._interval_app('type_low', var_super, ctx), sub_low,
+            position, info)
+        below_high = self.viper.LeCmp(
+            sub_low, self._interval_app('type_high', var_super, ctx),
+            position, info)
+        in_interval = self.viper.And(above_low, below_high, position, info)
+        ranked = self._interval_app('type_ranked', var_super, ctx)
+        exact = self._interval_app('type_exact', var_super, ctx)
+        forward = self.viper.Implies(
+            self.viper.And(subtype, ranked, position, info), in_interval,
+            position, info)
+        backward = self.viper.Implies(
+            self.viper.And(exact, in_interval, position, info), subtype,
+            position, info)
+        body = self.viper.And(forward, backward, position, info)
+        trigger = self.viper.Trigger([subtype], position, info)
+        body = self.viper.Forall([arg_sub, arg_super], [trigger], body,
+                                 position, info)
+        return self.viper.DomainAxiom('issubtype_interval', body, position,
+                                      info, self.type_domain)
+
+    def _interval_facts(self, type: PythonClass, type_func: Expr,
+                        position: 'silver.ast.Position',
+                        info: 'silver.ast.Info',
+                        ctx: Context) -> Optional[Expr]:
+        """
+        Returns the facts stating the position of the given class in the
+        class hierarchy, or None if it is not numbered.
+        """
+        if self.class_intervals is None or type not in self.class_intervals:
+            return None
+        low, high = self.class_intervals[type]
+        facts = [
+            self._interval_app('type_ranked', type_func, ctx),
+            self.viper.EqCmp(self._interval_app('type_low', type_func, ctx),
+                             self.viper.IntLit(low, position, info),
+                             position, info),
+            self.viper.EqCmp(self._interval_app('type_high', type_func, ctx),
+                             self.viper.IntLit(high, position, info),
+                             position, info),
+        ]
+        if self._is_exact(type):
+            facts.append(self._interval_app('type_exact', type_func, ctx))
+        result = facts[0]
+        for fact in facts[1:]:
+            result = self.viper.And(result, fact, position, info)
+        return result
+
     def union_funcs(self, ctx: Context) -> List['silver.ast.DomainFunc']:
         """
         Creates UNION_TYPE_SIZE functions of the following form:
@@ -458,6 +640,9 @@ class TypeDomainFactory:
         E.g. for class Sub(Generic[T], Super[T, int]):
         forall arg0: PyType :: {Sub(arg0)}
           extends_(Sub(arg0), Super(arg0, int()))
+
+        If the classes are numbered, the axiom also states the interval of the
+        class.
         """
         type_arg_decls = []
         type_args = []
@@ -486,7 +671,21 @@ class TypeDomainFactory:
 
         supertype_func = self.translate_type_literal(supertype,
                                                      position, ctx)
-        body = self._extends(type_func, supertype_func, ctx, position)
+        interval_facts = self._interval_facts(type, type_func, position,
+                                              info, ctx)
+        if interval_facts is not None and self._is_exact(type):
+            # Exact classes are distinguished from their siblings by their
+            # intervals, so they do not need extends_ facts. If the supertype
+            # is exact as well, the subtype relation follows from the
+            # intervals, too.
+            if self._is_exact(supertype):
+                body = interval_facts
+            else:
+                body = self._issubtype(type_func, supertype_func, ctx,
+                                       position)
+                body = self.viper.And(body, interval_facts, position, info)
+        else:
+            body = self._extends(type_func, supertype_func, ctx, position)
         if type.name == TUPLE_TYPE:
             # Special case for tuples:
             # forall args: Seq[PyType] :: { tuple(args) }
@@ -510,6 +709,8 @@ class TypeDomainFactory:
             body_lhs = self.viper.Forall([e_decl], [], implication, position,
                                          info)
             body = self.viper.Implies(body_lhs, body, position, info)
+        if interval_facts is not None and not self._is_exact(type):
+            body = self.viper.And(body, interval_facts, position, info)
         if type_arg_decls:
             basic_type = self.viper.DomainFuncApp(type.sil_name + '_basic', [],
                                                   self.type_type(), position, info,
@@ -0,0 +1,1303 @@
+"""
+Copyright (c) 2019 ETH Zurich
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+"""Tests of individual components of Nagini.
+
+Unlike the annotated tests in ``tests.py``, these tests check properties of
+the translation and verification pipeline that cannot be expressed by
+annotations in the tested files, e.g. how programs are split into units.
+Programs are written to temporary files; functional test files are referred
+to relative to the repository root, like in ``conftest.py``.
+"""
+
+import argparse
+import ast
+import gc
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zmq
+
+from collections import Counter
+from contextlib import contextmanager
+from nagini_translation.lib.timings import Timings
+from nagini_translation.lib.typeinfo import TypeInfo
+from nagini_translation.lib.viper_ast import ViperAST
+from nagini_translation.client import verify_file
+from nagini_translation.lib import builtin_positions
+from nagini_translation.lib.constants import UNTRACKED_DEPENDENCIES
+from nagini_translation.lib.context import Context
+from nagini_translation.lib.dependency_graph import DependencyGraph
+from nagini_translation.lib.errors.manager import ErrorManager
+from nagini_translation.lib.errors.wrappers import Position
+from nagini_translation.lib.program_nodes import (
+    ProgramNodeFactory,
+    PythonMethod,
+    PythonVar,
+)
+from nagini_translation.lib.resolver import get_target, ResolutionCache
+from nagini_translation.main import (
+    _CHECKED_MEMBERS,
+    _load_serialized_sil_program,
+    _serialized_sil_path,
+    _sil_resources_path,
+    _store_serialized_sil_program,
+    parse_sil_file,
+    translate,
+    translation_fingerprints,
+    verify,
+)
+from nagini_translation.quantifier_profile import (
+    describe_quantifiers,
+    parse_trace,
+)
+from nagini_translation.server import NaginiServer, TranslationCache
+from nagini_translation.tests import _JVM, VerificationTest
+from nagini_translation.verification_cache import (
+    StoredError,
+    VerificationCache,
+)
+from nagini_translation.verifier import (
+    _check_cancelled,
+    ErrorStream,
+    Failure,
+    merge_results,
+    PortfolioConfiguration,
+    PortfolioVerifier,
+    split_program,
+    Success,
+    Timeout,
+    VerifierPool,
+    ViperVerifier,
+)
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+
+_VERIFICATION_TESTS_DIR = 'tests/functional/verification/'
+
+
+@contextmanager
+def _source_file(source: str) -> Iterator[str]:
+    """
+    Writes the given Python source to a temporary file and yields its path.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.py')
+        with open(path, 'w') as file:
+            file.write(source)
+        yield path
+
+
+def _translate_tracked(path: str, **kwargs) -> Tuple['silver.ast.Program',
+                                                     Dict[str, set],
+                                                     Dict[str, str]]:
+    """
+    Translates the given file while tracking dependencies. Returns the
+    program, its dependencies and the Silver names of all tracked members by
+    their Python names.
+    """
+    dependencies = {}
+    timings = Timings()
+    prog = translate(path, _JVM, dependencies=dependencies, timings=timings,
+                     **kwargs)
+    assert prog is not None
+    names = {source.split(' ')[0]: sil_name
+             for sil_name, source in timings.sources.items()}
+    return prog, dependencies, names
+
+
+def _error(string: str) -> StoredError:
+    return StoredError('assert.failed:assertion.false', string, string, string)
+
+
+def _failure(*strings: str) -> Failure:
+    result = Failure([])
+    result.errors = [_error(string) for string in strings]
+    return result
+
+
+_SPLIT_PROGRAM = """
+from nagini_contracts.contracts import *
+
+
+def callee(a: int) -> int:
+    Requires(a > 0)
+    Ensures(Result() > 1)
+    return a + 1
+
+
+def caller() -> int:
+    Ensures(Result() > 2)
+    return callee(1)
+
+
+def other() -> None:
+    assert False
+"""
+
+
+def test_merge_results():
+    assert merge_results([]).__class__ is Success
+    assert merge_results([Success(), Success()]).__class__ is Success
+    merged = merge_results([_failure('a', 'b'), Success(), _failure('c')])
+    assert isinstance(merged, Failure)
+    assert [str(error) for error in merged.errors] == ['a', 'b', 'c']
+    # Errors in members shared by several units are reported once.
+    merged = merge_results([_failure('a', 'b'), _failure('b', 'c')])
+    assert [str(error) for error in merged.errors] == ['a', 'b', 'c']
+
+
+def test_split_program():
+    with _source_file(_SPLIT_PROGRAM) as path:
+        prog, dependencies, names = _translate_tracked(path)
+        viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, path)
+        units = {unit.name: unit.program
+                 for unit in split_program(prog, dependencies, viper_ast)}
+    caller, callee, other = names['caller'], names['callee'], names['other']
+    assert {caller, callee, other} <= set(units)
+
+    def methods(unit_name: str) -> Dict[str, bool]:
+        # Maps the names of the unit's methods to whether they have a body.
+        return {method.name(): method.body().isDefined()
+                for method in viper_ast.to_list(units[unit_name].methods())}
+
+    # The caller's unit verifies only the caller; the callee is included
+    # without its body, and unrelated methods are left out.
+    caller_methods = methods(caller)
+    assert caller_methods[caller]
+    assert not caller_methods[callee]
+    assert other not in caller_methods
+    assert methods(callee)[callee]
+    assert caller not in methods(callee)
+
+
+def test_verify_with_workers():
+    """
+    Verifying with several workers reports the same errors as verifying the
+    entire program at once.
+    """
+    tester = VerificationTest()
+    for name in ['test_lists.py', 'test_exception.py']:
+        path = os.path.abspath(os.path.join(_VERIFICATION_TESTS_DIR, name))
+        manager = tester.get_annotation_manager(path, ViperVerifier.silicon.name)
+        dependencies = {}
+        prog = translate(path, _JVM, dependencies=dependencies)
+        vresult = verify(prog, path, _JVM, ViperVerifier.silicon, workers=2,
+                         dependencies=dependencies)
+        tester._evaluate_result(vresult, manager, _JVM)
+
+
+def test_prune_preamble():
+    """
+    A pruned program contains only a subset of the members of the full
+    program, leaves out unused parts of the preamble, and verifies with the
+    same result.
+    """
+    with _source_file(_SPLIT_PROGRAM) as path:
+        viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, path)
+        members = {}
+        results = {}
+        for prune in (True, False):
+            prog = translate(path, _JVM, prune_preamble=prune)
+            members[prune] = {member.name()
+                              for seq in (prog.domains(), prog.fields(),
+                                          prog.functions(), prog.predicates(),
+                                          prog.methods())
+                              for member in viper_ast.to_list(seq)}
+            result = verify(prog, path, _JVM, ViperVerifier.silicon)
+            results[prune] = sorted(str(error) for error in result.errors)
+    assert members[True] < members[False]
+    assert {'dict___getitem__', 'dict_acc'} <= members[False] - members[True]
+    assert results[True] == results[False]
+    assert len(results[True]) == 1
+
+
+_TIMEOUT_PROGRAM = """
+from nagini_contracts.contracts import *
+
+
+@Timeout(30)
+def limited() -> None:
+    assert False
+
+
+def unlimited() -> None:
+    pass
+"""
+
+
+def test_declared_timeouts():
+    """
+    Time limits are collected without tracking dependencies, and a program
+    declaring them is verified member by member.
+    """
+    with _source_file(_TIMEOUT_PROGRAM) as path:
+        timeouts = {}
+        timings = Timings()
+        prog = translate(path, _JVM, timeouts=timeouts)
+        vresult = verify(prog, path, _JVM, ViperVerifier.silicon,
+                         timings=timings, timeouts=timeouts)
+    assert list(timeouts.values()) == [30]
+    assert isinstance(vresult, Failure)
+    assert len(vresult.errors) == 1
+    # Units are only timed if the program is split.
+    assert set(timeouts) <= set(timings.members)
+
+
+_TYPE_PRUNING_PROGRAM = """
+from nagini_contracts.contracts import *
+
+
+class Base:
+    pass
+
+
+class Used(Base):
+    pass
+
+
+class Unused:
+    pass
+
+
+def create() -> Used:
+    Ensures(isinstance(Result(), Used))
+    return Used()
+"""
+
+
+def test_prune_type_domain():
+    """
+    The type domain of a pruned program only contains the classes the
+    program uses and their superclasses.
+    """
+    with _source_file(_TYPE_PRUNING_PROGRAM) as path:
+        viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, path)
+        type_functions = {}
+        for prune in (True, False):
+            prog = translate(path, _JVM, prune_preamble=prune)
+            type_domain = next(domain for domain
+                               in viper_ast.to_list(prog.domains())
+                               if domain.name() == 'PyType')
+            type_functions[prune] = {
+                func.name()
+                for func in viper_ast.to_list(type_domain.functions())}
+            result = verify(prog, path, _JVM, ViperVerifier.silicon)
+            assert result.__class__ is Success
+    assert {'Used', 'Base', 'Unused'} <= type_functions[False]
+    assert {'Used', 'Base'} <= type_functions[True]
+    assert 'Unused' not in type_functions[True]
+    assert type_functions[True] < type_functions[False]
+
+
+def test_changed_consistency_check():
+    """
+    In mode 'changed', members are remembered per program by fingerprints of
+    their translation; changing one method changes only its fingerprint.
+    """
+    with _source_file(_SPLIT_PROGRAM) as path:
+        _, _, names = _translate_tracked(path, consistency_check='changed')
+        checked = dict(_CHECKED_MEMBERS[path])
+        assert all(isinstance(value, str) for value in checked.values())
+        assert {names['caller'], names['callee'], names['other']} <= set(checked)
+        with open(path, 'w') as file:
+            file.write(_SPLIT_PROGRAM.replace('assert False', 'assert True'))
+        _translate_tracked(path, consistency_check='changed')
+        rechecked = _CHECKED_MEMBERS[path]
+    assert rechecked[names['other']] != checked[names['other']]
+    assert rechecked[names['caller']] == checked[names['caller']]
+    assert rechecked[names['callee']] == checked[names['callee']]
+
+
+def test_error_stream():
+    """
+    Every distinct error is streamed once, and streamed errors are left out
+    of the final summary.
+    """
+    printed = []
+    stream = ErrorStream(False, False,
+                         lambda member, error: printed.append((member, error)))
+    stream('a', _failure('x', 'y'))
+    stream('b', _failure('y', 'z'))
+    assert printed == [('a', 'x'), ('a', 'y'), ('b', 'z')]
+    merged = merge_results([_failure('x', 'y'), _failure('z', 'w')])
+    summary = merged.to_string(False, False, stream.emitted)
+    assert summary.splitlines()[-1] == 'w'
+    assert not {'x', 'y', 'z'} & set(summary.splitlines())
+
+
+def test_stream_errors():
+    """
+    Silicon streams the errors of a failing member while verifying, and they
+    are not repeated in the summary of the result.
+    """
+    printed = []
+    stream = ErrorStream(False, False,
+                         lambda member, error: printed.append(error))
+    with _source_file(_SPLIT_PROGRAM) as path:
+        prog = translate(path, _JVM)
+        vresult = verify(prog, path, _JVM, ViperVerifier.silicon,
+                         on_failure=stream)
+    assert isinstance(vresult, Failure)
+    errors = [str(error) for error in vresult.errors]
+    assert len(printed) == len(set(printed))
+    assert set(printed) == set(errors)
+    summary = vresult.to_string(False, False, stream.emitted)
+    assert not set(errors) & set(summary.splitlines())
+
+
+class _BlockingVerifier:
+    """
+    Stands in for a backend. Verifying a program for which the given
+    function returns True blocks until the verifier is stopped; all other
+    programs verify immediately.
+    """
+
+    def __init__(self, blocks: Callable[[Any], bool]) -> None:
+        self._blocks = blocks
+        self._stopped = threading.Event()
+
+    def verify(self, prog, arp=False, on_failure=None, cancelled=None):
+        # Like a real backend, verifying restarts the verifier.
+        self._stopped.clear()
+        _check_cancelled(cancelled)
+        if self._blocks(prog):
+            self._stopped.wait()
+            raise RuntimeError('stopped')
+        return Success()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+class _BlockingPool(VerifierPool):
+    """
+    Pool of stand-in backends, which block on the program 'slow'.
+    """
+
+    @staticmethod
+    def blocks(prog) -> bool:
+        return prog == 'slow'
+
+    def _create_verifier(self):
+        return _BlockingVerifier(self.blocks)
+
+
+def test_pool_timeout():
+    """
+    A unit that exceeds its time limit is reported as timed out, while the
+    other units are verified in the meantime.
+    """
+    pool = _BlockingPool(_JVM, 'program.py', ViperVerifier.silicon, workers=2)
+    try:
+        slow = pool.submit('slow', timeout=0.5, name='slow')
+        fast = [pool.submit('fast', timeout=60, name='fast' + str(index))
+                for index in range(5)]
+        fast_results = [future.result(timeout=10) for future in fast]
+        assert all(result.__class__ is Success for result in fast_results)
+        assert not slow.done()
+        slow_result = slow.result(timeout=10)
+    finally:
+        pool.shutdown()
+    assert isinstance(slow_result, Timeout)
+    merged = merge_results(fast_results + [slow_result])
+    assert isinstance(merged, Timeout)
+    assert merged.timed_out == ['slow']
+
+
+class _StubPortfolio(PortfolioVerifier):
+    """
+    Portfolio of the given stand-in backends.
+    """
+
+    def __init__(self, *verifiers: Any) -> None:
+        configuration = PortfolioConfiguration(ViperVerifier.silicon, [])
+        super().__init__(_JVM, 'program.py', [configuration] * len(verifiers))
+        self.stubs = verifiers
+
+    def _create_verifier(self, index: int):
+        return self.stubs[index]
+
+
+class _FixedVerifier:
+    """
+    Stands in for a backend that returns the given result once the given
+    event is set, and sets its own finished event before it does.
+    """
+
+    def __init__(self, result: Any, release: threading.Event = None) -> None:
+        self.result = result
+        self.release = release
+        self.finished = threading.Event()
+        self.stops = 0
+
+    def verify(self, prog, arp=False, on_failure=None, cancelled=None):
+        if self.release is not None:
+            assert self.release.wait(10)
+        self.finished.set()
+        return self.result
+
+    def stop(self) -> None:
+        self.stops += 1
+
+
+def test_portfolio_race():
+    """
+    The first success is returned and the configurations that are still
+    running are aborted; failures are only returned if all configurations
+    fail.
+    """
+    slow = _BlockingVerifier(lambda prog: True)
+    portfolio = _StubPortfolio(slow, _FixedVerifier(Success()))
+    cancelled = threading.Event()
+    try:
+        result = portfolio.verify('program', cancelled=cancelled)
+        assert result.__class__ is Success
+        assert cancelled.is_set()
+    finally:
+        # Waits for the aborted configuration.
+        portfolio.shutdown()
+
+    failing = _FixedVerifier(_failure('first'))
+    late = _FixedVerifier(Success(), failing.finished)
+    portfolio = _StubPortfolio(failing, late)
+    try:
+        assert portfolio.verify('program').__class__ is Success
+    finally:
+        portfolio.shutdown()
+
+    portfolio = _StubPortfolio(_FixedVerifier(_failure('first')),
+                               _FixedVerifier(_failure('second')))
+    try:
+        result = portfolio.verify('program')
+    finally:
+        portfolio.shutdown()
+    assert isinstance(result, Failure)
+    assert [str(error) for error in result.errors] in (['first'],
+                                                                ['second'])
+
+
+def test_portfolio_cancel():
+    """
+    Stopping a cancelled verification aborts all configurations, and
+    shutting the portfolio down stops all backends it has created.
+    """
+    blocking = [_BlockingVerifier(lambda prog: True) for _ in range(2)]
+    portfolio = _StubPortfolio(*blocking)
+    cancelled = threading.Event()
+    outcome = []
+
+    def verify() -> None:
+        try:
+            outcome.append(portfolio.verify('program', cancelled=cancelled))
+        except Exception as e:
+            outcome.append(e)
+
+    thread = threading.Thread(target=verify)
+    thread.start()
+    try:
+        cancelled.set()
+        portfolio.stop()
+        thread.join(10)
+        assert not thread.is_alive()
+        assert len(outcome) == 1
+        assert isinstance(outcome[0], Exception)
+    finally:
+        portfolio.shutdown()
+
+    finished = _FixedVerifier(Success())
+    portfolio = _StubPortfolio(finished)
+    assert portfolio.verify('program').__class__ is Success
+    assert finished.stops == 0
+    portfolio.shutdown()
+    assert finished.stops == 1
+
+
+def _unit_fingerprints(path: str, source: str, cache: VerificationCache
+                       ) -> Tuple[Dict[str, str], Dict[str, str],
+                                  Dict[str, 'silver.ast.Program']]:
+    """
+    Writes the given source to the given path, splits its translation into
+    units and returns the Silver names of its members by their Python names,
+    and the fingerprints and programs of the units by their names.
+    """
+    with open(path, 'w') as file:
+        file.write(source)
+    source_fingerprints = {}
+    prog, dependencies, names = _translate_tracked(
+        path, source_fingerprints=source_fingerprints)
+    viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, path)
+    units = {unit.name: unit.program
+             for unit in split_program(prog, dependencies, viper_ast)}
+    cache.clear_digests()
+    keys = {name: cache.fingerprint(unit, source_fingerprints, viper_ast)
+            for name, unit in units.items()}
+    return names, keys, units
+
+
+def test_verification_cache():
+    """
+    Units are found in the cache until they or the members they depend on
+    change, and stored errors are replayed with the same strings.
+    """
+    with _source_file(_SPLIT_PROGRAM) as path, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        cache = VerificationCache(cache_dir, ['silicon'])
+        names, keys, units = _unit_fingerprints(path, _SPLIT_PROGRAM, cache)
+        caller, callee, other = (names['caller'], names['callee'],
+                                 names['other'])
+        assert cache.lookup(keys[other]) is None
+        vresult = verify(units[other], path, _JVM, ViperVerifier.silicon)
+        assert isinstance(vresult, Failure)
+        cache.store(keys[other], vresult)
+        cache.store(keys[caller], Success())
+
+        # Unchanged units are found; stored errors have the same strings.
+        _, same_keys, _ = _unit_fingerprints(path, _SPLIT_PROGRAM, cache)
+        assert same_keys == keys
+        assert cache.lookup(keys[caller]).__class__ is Success
+        replayed = cache.lookup(keys[other])
+        assert isinstance(replayed, Failure)
+        for original, stored in zip(vresult.errors, replayed.errors):
+            assert isinstance(stored, StoredError)
+            assert stored.full_id == original.full_id
+            for ide_mode, show_viper_errors in [(True, False), (False, False),
+                                                (False, True)]:
+                assert (stored.string(ide_mode, show_viper_errors) ==
+                        original.string(ide_mode, show_viper_errors))
+
+        # Changing a method's source changes only its own unit; changing the
+        # contract of the callee also changes the units of its callers.
+        changed_other = _SPLIT_PROGRAM.replace('assert False', 'assert True')
+        _, new_keys, _ = _unit_fingerprints(path, changed_other, cache)
+        assert new_keys[other] != keys[other]
+        assert new_keys[caller] == keys[caller]
+        assert cache.lookup(new_keys[other]) is None
+        changed_callee = _SPLIT_PROGRAM.replace('Result() > 1', 'Result() > 0')
+        _, new_keys, _ = _unit_fingerprints(path, changed_callee, cache)
+        assert new_keys[caller] != keys[caller]
+        assert cache.lookup(new_keys[caller]) is None
+
+        # Results of different backend options are kept apart.
+        carbon_cache = VerificationCache(cache_dir, ['carbon'])
+        _, carbon_keys, _ = _unit_fingerprints(path, _SPLIT_PROGRAM,
+                                               carbon_cache)
+        assert carbon_keys[caller] != keys[caller]
+
+
+_SHARED_FUNCTION_PROGRAM = """
+from nagini_contracts.contracts import *
+
+
+@Pure
+def ratio(a: int) -> int:
+    return 10 // a
+
+
+def first() -> int:
+    return ratio(1)
+
+
+def second() -> int:
+    return ratio(2)
+"""
+
+
+def test_shared_function_errors():
+    """
+    An error in a function called by the methods of several units is
+    reported once.
+    """
+    with _source_file(_SHARED_FUNCTION_PROGRAM) as path:
+        dependencies = {}
+        prog = translate(path, _JVM, dependencies=dependencies)
+        vresult = verify(prog, path, _JVM, ViperVerifier.silicon, workers=2,
+                         dependencies=dependencies)
+    assert isinstance(vresult, Failure)
+    assert len(vresult.errors) == 1
+
+
+def test_serialized_sil_program():
+    """
+    A builtin program stored in a cache directory is loaded with placeholder
+    positions, which resolve to the positions of the parsed program.
+    """
+    parsed = parse_sil_file(os.path.join(_sil_resources_path(False), 'all.sil'),
+                            _JVM)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = _serialized_sil_path(cache_dir, False, 'test')
+        _store_serialized_sil_program(_JVM, parsed, path, False)
+        loaded = _load_serialized_sil_program(_JVM, path, False)
+    assert loaded is not None
+    assert str(loaded) == str(parsed)
+    viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, None)
+    for seq in ('domains', 'functions', 'predicates', 'methods'):
+        members = zip(viper_ast.to_list(getattr(parsed, seq)()),
+                      viper_ast.to_list(getattr(loaded, seq)()))
+        for parsed_member, loaded_member in members:
+            original = parsed_member.pos()
+            resolved = builtin_positions.resolve(loaded_member.pos())
+            assert resolved is not None
+            assert (os.path.normpath(resolved[0]) ==
+                    os.path.normpath(str(original.file())))
+            assert resolved[1:3] == (original.start().line(),
+                                     original.start().column())
+            position = Position(loaded_member.pos())
+            assert position.file_name == resolved[0]
+            assert (position.line, position.column) == resolved[1:3]
+
+
+_SERVER_ARGS = {
+    'verifier': 'silicon', 'workers': 2, 'portfolio': None, 'select': None,
+    'ide_mode': False, 'sif': False, 'arp': False, 'ignore_global': False,
+    'cache_dir': None, 'full_preamble': False, 'finite_hierarchy': False,
+    'consistency_check': 'full', 'show_viper_errors': False, 'timeout': None,
+}
+
+_SERVER_PROGRAM = """
+from nagini_contracts.contracts import *
+
+
+def {}() -> None:
+    pass
+"""
+
+
+class _ServerPool(_BlockingPool):
+    """
+    Pool of stand-in backends, which block on the units of methods named
+    'blocking'.
+    """
+
+    @staticmethod
+    def blocks(prog) -> bool:
+        viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, None)
+        return any('blocking' in method.name() and method.body().isDefined()
+                   for method in viper_ast.to_list(prog.methods()))
+
+
+def _create_server() -> NaginiServer:
+    server = NaginiServer(_JVM, argparse.Namespace(**_SERVER_ARGS))
+    server.pool = _ServerPool(_JVM, 'nagini_server', ViperVerifier.silicon,
+                              workers=2)
+    return server
+
+
+def _write_server_programs(directory: str) -> Tuple[str, str]:
+    """
+    Writes a program that verifies and one whose verification blocks to the
+    given directory and returns their paths.
+    """
+    paths = []
+    for name in ('fine', 'blocking'):
+        path = os.path.join(directory, name + '.py')
+        with open(path, 'w') as file:
+            file.write(_SERVER_PROGRAM.format(name))
+        paths.append(path)
+    return paths[0], paths[1]
+
+
+def _receive(server: NaginiServer) -> Tuple[bytes, Dict[str, Any]]:
+    identity, message = server._outgoing.get(timeout=120)
+    return identity, json.loads(message)
+
+
+def test_server_jobs():
+    """
+    The jobs of two clients are verified concurrently; one of them is
+    cancelled while the other one completes, and the error information of
+    both is discarded once they are finished.
+    """
+    server = _create_server()
+    with tempfile.TemporaryDirectory() as directory:
+        fine, blocking = _write_server_programs(directory)
+        server._handle_request(b'a', json.dumps({'command': 'verify',
+                                                 'file': fine}))
+        server._handle_request(b'b', json.dumps({'command': 'verify',
+                                                 'file': blocking}))
+        messages = {b'a': [], b'b': []}
+        while not any(message['type'] == 'done' for message in messages[b'a']):
+            identity, message = _receive(server)
+            messages[identity].append(message)
+        accepted_a, accepted_b = messages[b'a'][0], messages[b'b'][0]
+        assert accepted_a['type'] == accepted_b['type'] == 'accepted'
+        assert accepted_a['job'] != accepted_b['job']
+        assert all(message['job'] == accepted_a['job']
+                   for message in messages[b'a'])
+        assert messages[b'a'][-1]['success']
+        assert not any(message['type'] == 'done' for message in messages[b'b'])
+
+        server._handle_request(b'b', json.dumps({'command': 'cancel',
+                                                 'job': accepted_b['job']}))
+        while True:
+            identity, message = _receive(server)
+            assert identity == b'b'
+            if message['type'] == 'cancelled':
+                break
+            assert message['type'] == 'result'
+        assert message['job'] == accepted_b['job']
+        server._handle_request(b'c', json.dumps({'command': 'cancel',
+                                                 'job': accepted_b['job']}))
+        assert _receive(server) == (b'c', {'type': 'error',
+                                           'message': 'Unknown job.'})
+
+        # Requests that are not JSON get exactly one plain reply.
+        server._handle_request(b'd', fine)
+        identity, output = server._outgoing.get(timeout=120)
+        assert identity == b'd'
+        assert 'Verification successful' in output
+        server._executor.shutdown()
+        server.pool.shutdown()
+    assert not server._jobs
+    assert not server._error_range_users
+
+
+def test_client():
+    """
+    The client receives the results of a verification from a running server.
+    """
+    server = _create_server()
+    with tempfile.TemporaryDirectory() as directory:
+        fine, _ = _write_server_programs(directory)
+        address = 'ipc://' + os.path.join(directory, 'socket')
+        threading.Thread(target=server.serve, args=(address,),
+                         daemon=True).start()
+        socket = zmq.Context.instance().socket(zmq.DEALER)
+        socket.connect(address)
+        try:
+            printed = []
+            assert verify_file(socket, fine, print=printed.append)
+        finally:
+            socket.close(linger=0)
+    assert 'Verification successful' in printed[-1]
+
+
+def _write_module(path: str, source: str, mtime: float = None) -> None:
+    with open(path, 'w') as file:
+        file.write(source)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_translation_cache():
+    """
+    A translation is reused as long as none of its modules changes its
+    content, and dropped once an imported module changes. Translations of
+    modules that may have changed while being translated are not stored.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        main = os.path.join(directory, 'main.py')
+        helper = os.path.join(directory, 'helper.py')
+        past = time.time() - 100
+        _write_module(main, 'import helper\n', past)
+        _write_module(helper, 'X = 1\n', past)
+        cache = TranslationCache()
+        snapshot = cache.snapshot(main)
+        assert set(snapshot.files) == {main}
+        cache.store(main, set(), {main, helper}, 'prog', {}, {}, None,
+                    snapshot)
+        assert cache.lookup(main, set()).prog == 'prog'
+        assert cache.lookup(main, {'f'}) is None
+
+        # Touching a module without changing it keeps the translation.
+        os.utime(helper, (past + 10, past + 10))
+        assert cache.lookup(main, set()).prog == 'prog'
+
+        # Changing an imported module drops it.
+        _write_module(helper, 'X = 2\n', past + 20)
+        assert cache.lookup(main, set()) is None
+
+        # The next snapshot includes the imported modules, so a change made
+        # during the translation is detected later.
+        snapshot = cache.snapshot(main)
+        assert set(snapshot.files) == {main, helper}
+        _write_module(helper, 'X = 3\n')
+        cache.store(main, set(), {main, helper}, 'prog', {}, {}, None,
+                    snapshot)
+        assert cache.lookup(main, set()) is None
+
+        # A newly imported module that was modified just before it was
+        # translated may change again unnoticed, so nothing is stored.
+        other = os.path.join(directory, 'other.py')
+        _write_module(other, 'Y = 1\n')
+        snapshot = cache.snapshot(main)
+        cache.store(main, set(), {main, helper, other}, 'prog', {}, {}, None,
+                    snapshot)
+        assert cache.lookup(main, set()) is None
+
+
+def test_timings():
+    """
+    Phases and members accumulate their durations, and the JSON written with
+    --timings-json lists the phases in order and the members by descending
+    duration together with their sources.
+    """
+    timings = Timings()
+    with timings.phase('translate'):
+        pass
+    try:
+        with timings.phase('verify'):
+            raise ValueError()
+    except ValueError:
+        pass
+    with timings.phase('translate'):
+        time.sleep(0.01)
+    assert list(timings.phases) == ['translate', 'verify']
+    assert timings.phases['translate'] >= 0.01
+    timings.add_member('m_fast', 1.0)
+    timings.add_member('m_slow', 2.0)
+    timings.add_member('m_fast', 0.5)
+    timings.add_member('m_generated', 3.0)
+    timings.sources.update({'m_fast': 'fast', 'm_slow': 'C.slow'})
+    data = json.loads(timings.to_json())
+    assert set(data) == {'phases', 'members'}
+    assert list(data['phases']) == ['translate', 'verify']
+    assert data['phases']['translate'] == timings.phases['translate']
+    assert data['members'] == [
+        {'name': 'm_generated', 'source': None, 'seconds': 3.0},
+        {'name': 'm_slow', 'source': 'C.slow', 'seconds': 2.0},
+        {'name': 'm_fast', 'source': 'fast', 'seconds': 1.5},
+    ]
+
+
+def test_translation_fingerprints():
+    """
+    Translation fingerprints change with the sources of a member and its
+    dependencies and with the options, and never match if a dependency is
+    neither tracked nor builtin.
+    """
+    sources = {'a': '1', 'b': '2', 'c': '3'}
+    dependencies = {'a': {'b', 'builtin'}, 'b': set(), 'c': {'generated'}}
+    builtins = {'builtin'}
+    fingerprints = translation_fingerprints(sources, dependencies, 'options',
+                                            builtins)
+    assert fingerprints == translation_fingerprints(
+        dict(sources), dependencies, 'options', builtins)
+    assert fingerprints['a'] is not None and fingerprints['b'] is not None
+    assert fingerprints['c'] is None
+    changed = translation_fingerprints(dict(sources, b='4'), dependencies,
+                                       'options', builtins)
+    assert changed['a'] != fingerprints['a']
+    assert changed['b'] != fingerprints['b']
+    other_options = translation_fingerprints(sources, dependencies, 'other',
+                                             builtins)
+    assert other_options['a'] != fingerprints['a']
+    assert translation_fingerprints(sources, dependencies,
+                                    'options')['a'] is None
+
+
+def test_dependency_graph():
+    """
+    Reachability follows cycles, includes names whose own dependencies are
+    unknown without following them, and exports a copy of the graph.
+    """
+    graph = DependencyGraph({
+        'a': ['b'],
+        'b': ['c', 'builtin'],
+        'c': ['a'],
+        'd': [],
+        UNTRACKED_DEPENDENCIES: ['e'],
+    })
+    graph.add_edges('e', ['f'])
+    graph.add_node('d')
+    assert 'builtin' not in graph
+    assert 'd' in graph
+    assert len(graph) == 6
+    assert graph.successors('b') == {'c', 'builtin'}
+    assert graph.successors('d') == set()
+    assert graph.successors('builtin') == set()
+    assert graph.successors('unknown') == set()
+    assert graph.reachable(['a']) == {'a', 'b', 'c', 'builtin'}
+    assert graph.reachable(['c', 'c']) == {'a', 'b', 'c', 'builtin'}
+    assert graph.reachable(['d']) == {'d'}
+    assert graph.reachable(['unknown']) == {'unknown'}
+    assert graph.reachable([]) == set()
+    untracked = graph.successors(UNTRACKED_DEPENDENCIES)
+    assert graph.reachable({'d'} | untracked) == {'d', 'e', 'f'}
+    exported = graph.export()
+    assert exported == {'a': {'b'}, 'b': {'c', 'builtin'}, 'c': {'a'},
+                        'd': set(), 'e': {'f'},
+                        UNTRACKED_DEPENDENCIES: {'e'}}
+    exported['a'].add('d')
+    exported['g'] = set()
+    assert graph.successors('a') == {'b'}
+    assert 'g' not in graph
+    assert DependencyGraph(exported).reachable(['c']) == {'a', 'b', 'c', 'd',
+                                                          'builtin'}
+
+
+def test_resolution_cache():
+    """
+    Cached targets are reused until a name they were looked up by is bound
+    to a different node, in the current method or the aliases of the
+    context.
+    """
+    method = PythonMethod('f', None, None, None, False, False,
+                          ProgramNodeFactory())
+    first = PythonVar('x', None, None)
+    second = PythonVar('x', None, None)
+    alias = PythonVar('x', None, None)
+    method.locals['x'] = first
+    node = ast.Name('x', ast.Load())
+    ctx = Context()
+    lookups = []
+
+    def resolve(node, containers, container):
+        lookups.append(node)
+        return get_target(node, containers, container)
+
+    cache = ResolutionCache()
+
+    def target():
+        return cache.resolve(resolve, node, ctx, [method], method)
+
+    assert target() is first
+    assert target() is first
+    assert len(lookups) == 1
+    # Rebinding keeps the number of local variables.
+    method.locals['x'] = second
+    assert target() is second
+    ctx.var_aliases['x'] = alias
+    assert target() is alias
+    del ctx.var_aliases['x']
+    assert target() is second
+    assert len(lookups) == 4
+    cache.clear()
+    assert target() is second
+    assert len(lookups) == 5
+
+
+def _add_errors(manager: ErrorManager, count: int) -> range:
+    """
+    Adds error information for the given number of nodes, which are named
+    after their IDs, and returns the IDs.
+    """
+    start = manager.checkpoint()
+    for _ in range(count):
+        item_id = manager.checkpoint()
+        assert manager.add_error_information('node' + str(item_id), [],
+                                             None) == item_id
+    return range(start, manager.checkpoint())
+
+
+def _nodes(manager: ErrorManager, ids: range) -> list:
+    return [manager.get_node(item_id) for item_id in ids]
+
+
+def test_error_information_ranges():
+    """
+    Discarded error information can be restored from an export, also after
+    the state has been cleared, and lookups respect the boundaries of all
+    ranges.
+    """
+    manager = ErrorManager()
+    first_ids = _add_errors(manager, 6)
+    first = manager.export(first_ids.start)
+    second_ids = _add_errors(manager, 4)
+    second = manager.export(second_ids.start)
+    assert (first.start, first.end) == (0, 6)
+    assert (second.start, second.end) == (6, 10)
+    everything = range(-1, 11)
+    expected = [None] + ['node' + str(item_id) for item_id in range(10)]
+    assert _nodes(manager, everything) == expected + [None]
+
+    # Discarding the first range keeps the adjacent second one.
+    manager.discard(first.start, first.end)
+    assert _nodes(manager, everything) == [None] * 7 + expected[7:] + [None]
+
+    # Restoring brings back exactly the discarded range.
+    manager.restore(first)
+    assert _nodes(manager, everything) == expected + [None]
+
+    # After clearing, both ranges are restored as older information, and
+    # new IDs start after them.
+    manager.clear()
+    manager.restore(second)
+    manager.restore(first)
+    assert _nodes(manager, everything) == expected + [None]
+    new_ids = _add_errors(manager, 2)
+    assert new_ids == range(10, 12)
+    assert _nodes(manager, range(9, 13)) == ['node9', 'node10', 'node11',
+                                             None]
+
+    # Discarding part of a restored range leaves its other entries, and
+    # restoring it again replaces the partly discarded copy.
+    manager.discard(2, 4)
+    assert _nodes(manager, range(1, 5)) == ['node1', None, None, 'node4']
+    manager.restore(first)
+    assert _nodes(manager, range(1, 5)) == ['node1', 'node2', 'node3',
+                                            'node4']
+    # The exported information is not affected by discarding.
+    manager.discard(0, 10)
+    assert first.nodes == expected[1:7]
+    assert _nodes(manager, everything) == [None] * 11 + ['node10']
+
+
+def test_shared_vias():
+    """
+    Positions created with the same via list share one snapshot, which does
+    not change with the list.
+    """
+    manager = ErrorManager()
+    vias = [('call', 'first')]
+    first = manager.add_error_information('a', vias, None)
+    second = manager.add_error_information('b', vias, None)
+    assert manager.get_vias(first) is manager.get_vias(second)
+    vias.append(('call', 'second'))
+    third = manager.add_error_information('c', vias, None)
+    assert manager.get_vias(first) == (('call', 'first'),)
+    assert len(manager.get_vias(third)) == 2
+    other = manager.add_error_information('d', [('call', 'first')], None)
+    assert manager.get_vias(other) == manager.get_vias(first)
+
+
+_TYPES_PROGRAM = """
+from nagini_contracts.contracts import *
+from typing import Dict, List, Optional, Tuple
+
+
+class Cell:
+    def __init__(self, value: Optional[int]) -> None:
+        self.value = value
+        self.history = []  # type: List[Tuple[int, str]]
+
+
+def lookup(cells: Dict[str, Cell], key: str) -> Optional[int]:
+    cell = cells[key]
+    values = [c.value for c in cells.values()]
+    return cell.value
+"""
+
+
+class _CountingTypeInfo(TypeInfo):
+    """
+    Records the arguments of every mypy build.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        super().__init__(cache_dir)
+        self.builds = []
+
+    def _build(self, filename: str, strict_optional: bool,
+               incremental: bool):
+        self.builds.append((strict_optional, incremental))
+        return super()._build(filename, strict_optional, incremental)
+
+
+def _type_strings(types: TypeInfo) -> Dict[tuple, str]:
+    return {key: str(type) for key, type in types.all_types.items()}
+
+
+def test_type_snapshots():
+    """
+    Types loaded from snapshots are the same as those collected by type
+    checking, and loading them needs no second, non-incremental build.
+    """
+    with _source_file(_TYPES_PROGRAM) as path, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        expected = TypeInfo()
+        assert expected.check(path)
+        first = _CountingTypeInfo(cache_dir)
+        assert first.check(path)
+        assert first.builds == [(True, True)]
+        second = _CountingTypeInfo(cache_dir)
+        assert second.check(path)
+        assert second.builds == [(True, True)]
+        assert os.listdir(os.path.join(cache_dir, 'snapshots'))
+    assert _type_strings(first) == _type_strings(expected)
+    assert _type_strings(second) == _type_strings(expected)
+    assert set(second.alt_types) == set(expected.alt_types)
+    assert second.files == expected.files
+
+
+def test_node_facts():
+    """
+    Facts about created expressions match what Scala reports and are
+    dropped together with the expressions.
+    """
+    viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, 'test.py')
+    pos, info = viper_ast.NoPosition, viper_ast.NoInfo
+    left = viper_ast.IntLit(1, pos, info)
+    comparison = viper_ast.EqCmp(left, viper_ast.IntLit(2, pos, info), pos,
+                                 info)
+    assert viper_ast.typ(comparison) is viper_ast.Bool
+    assert viper_ast.is_pure(comparison)
+    type_var = viper_ast.TypeVar('T')
+    generic = viper_ast.DomainFuncApp('f', [left], type_var, pos, info, 'D',
+                                      {type_var: viper_ast.Int})
+    assert viper_ast.typ(generic) == generic.typ()
+    assert viper_ast.same_type(viper_ast.typ(generic), viper_ast.Int)
+    del left, comparison, generic
+    gc.collect()
+    assert not viper_ast._facts
+
+
+def test_domain_func_types():
+    """
+    Applications of a domain function share their result type proxies only
+    if their result types and type variable maps are equal.
+    """
+    viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, 'test.py')
+    pos, info = viper_ast.NoPosition, viper_ast.NoInfo
+    type_var = viper_ast.TypeVar('T')
+    apps = [viper_ast.DomainFuncApp('g', [], viper_ast.Int, pos, info, 'D'),
+            viper_ast.DomainFuncApp('g', [], viper_ast.Int, pos, info, 'D'),
+            viper_ast.DomainFuncApp('g', [], viper_ast.Bool, pos, info, 'D'),
+            viper_ast.DomainFuncApp('g', [], type_var, pos, info, 'D',
+                                    {type_var: viper_ast.Int}),
+            viper_ast.DomainFuncApp('g', [], viper_ast.TypeVar('T'), pos,
+                                    info, 'D', {type_var: viper_ast.Int}),
+            viper_ast.DomainFuncApp('g', [], type_var, pos, info, 'D',
+                                    {type_var: viper_ast.Ref})]
+    assert len(viper_ast._domain_func_types) == 4
+    for app in apps:
+        assert viper_ast.typ(app) == app.typ()
+
+
+def test_finite_hierarchy():
+    """
+    Encoding the class hierarchy by intervals replaces the antisymmetry axiom
+    and preserves the results of subtype, exclusion and interval reasoning.
+    """
+    tester = VerificationTest()
+    viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, 'test.py')
+    for name in ['test_class_hierarchy.py', 'test_generic_classes.py',
+                 'test_isinstance.py', 'test_havoced_types.py']:
+        path = os.path.abspath(os.path.join(_VERIFICATION_TESTS_DIR, name))
+        manager = tester.get_annotation_manager(path, ViperVerifier.silicon.name)
+        prog = translate(path, _JVM, finite_hierarchy=True)
+        assert prog is not None
+        axioms = {axiom.name() for domain in viper_ast.to_list(prog.domains())
+                  for axiom in viper_ast.to_list(domain.axioms())}
+        assert 'issubtype_interval' in axioms
+        assert 'issubtype_exclusion_2' not in axioms
+        vresult = verify(prog, path, _JVM, ViperVerifier.silicon)
+        tester._evaluate_result(vresult, manager, _JVM)
+
+
+_MATCHING_LOOP_PROGRAM = """
+from nagini_contracts.contracts import *
+from typing import List
+
+
+def sorted_user_trigger(xs: List[int]) -> None:
+    Requires(Acc(list_pred(xs)))
+    Requires(Forall(int, lambda i: (Implies(i >= 0 and i < len(xs) - 1,
+                                            xs[i] <= xs[i + 1]), [[xs[i]]])))
+
+
+def sorted_inferred(xs: List[int]) -> None:
+    Requires(Acc(list_pred(xs)))
+    Requires(Forall(int, lambda i: Implies(i >= 0 and i < len(xs) - 1,
+                                           xs[i] <= xs[i + 1])))
+
+
+def bounded(xs: List[int]) -> None:
+    Requires(Acc(list_pred(xs)))
+    Requires(Forall(int, lambda i: Implies(i >= 0 and i < len(xs), xs[i] > 0)))
+"""
+
+
+def test_inferred_triggers():
+    """
+    Triggers inferred from quantifier bodies use the same encoding as the
+    body, and the inferred triggers are usable for verification.
+    """
+    path = os.path.abspath(os.path.join(_VERIFICATION_TESTS_DIR,
+                                        'test_inferred_triggers.py'))
+    prog, _, names = _translate_tracked(path)
+    viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, path)
+    methods = {method.name(): method
+               for method in viper_ast.to_list(prog.methods())}
+    pres = str(methods[names['from_membership']].pres())
+    triggers = re.findall(r'\{([^{}]*)\}', pres)
+    assert any('__contains__' in trigger for trigger in triggers)
+    assert not any('set_acc' in trigger for trigger in triggers)
+    pres = str(methods[names['from_subscript']].pres())
+    assert any('__getitem__' in trigger
+               for trigger in re.findall(r'\{([^{}]*)\}', pres))
+
+    tester = VerificationTest()
+    manager = tester.get_annotation_manager(path, ViperVerifier.silicon.name)
+    vresult = verify(prog, path, _JVM, ViperVerifier.silicon)
+    tester._evaluate_result(vresult, manager, _JVM)
+
+
+def test_matching_loop_warnings():
+    """
+    User triggers that may cause matching loops are reported, and inferred
+    triggers avoid them or are reported if no other candidate exists.
+    """
+    with _source_file(_MATCHING_LOOP_PROGRAM) as path:
+        warnings = []
+        assert translate(path, _JVM, warnings=warnings) is not None
+    loops = [warning for warning in warnings
+             if warning.startswith('Possible matching loop')]
+    # The user trigger and the only inferred candidate of the two sorted
+    # functions loop; bounded's quantifier has a safe candidate.
+    assert len(loops) == 2
+    assert all('trigger xs[i] matches' in warning for warning in loops)
+    lines = sorted(int(re.search(r'@(\d+)\.', warning).group(1))
+                   for warning in loops)
+    assert lines == [9, 15]
+
+
+_SAMPLE_TRACE = """
+[tool-version] Z3 4.8.6
+[mk-quant] #10 prog.l12 1 #11 #12
+[mk-quant] #20 list_axiom 2 #21 #22
+[new-match] 0x1 #10 #11 #5 ; #6
+[instance] 0x1 #30
+[new-match] 0x2 #20 #21 #7 #8 ; #9
+[instance] 0x2 #31
+[end-of-instance]
+[inst-discovered] theory-solving 0x3 #10 ; #40
+[instance] 0x3 #41
+[instance] 0x1 #32
+[instance] 0x9 #33
+"""
+
+
+def test_parse_trace():
+    """
+    Instances are counted for the quantifier of the match they belong to;
+    instances of unknown matches are ignored.
+    """
+    counts = parse_trace(_SAMPLE_TRACE.splitlines())
+    assert counts == Counter({'prog.l12': 3, 'list_axiom': 1})
+
+
+_QUANTIFIER_PROGRAM = """
+from nagini_contracts.contracts import *
+from typing import List
+
+
+def positive(xs: List[int]) -> None:
+    Requires(Acc(list_pred(xs)))
+    Requires(Forall(xs, lambda x: x > 0))
+"""
+
+
+def test_describe_quantifiers():
+    """
+    Quantifier IDs are mapped to the quantifiers of the program on their
+    line, which may include quantifiers of the builtin resources.
+    """
+    with _source_file(_QUANTIFIER_PROGRAM) as path:
+        prog = translate(path, _JVM)
+        viper_ast = ViperAST(_JVM, _JVM.java, _JVM.scala, _JVM.viper, path)
+        descriptions = describe_quantifiers(['prog.l8', 'unknown'], prog,
+                                            viper_ast, path)
+    assert descriptions['unknown'] == 'unknown'
+    python_origins = [origin
+                      for origin in descriptions['prog.l8'].split(' or ')
+                      if origin.endswith('(program.py@8)')]
+    assert len(python_origins) == 1
+    assert python_origins[0].startswith('Forall(')
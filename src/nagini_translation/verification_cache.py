@@ -0,0 +1,207 @@
+"""
+Copyright (c) 2019 ETH Zurich
+This Source Code Form is subject to the terms of the Mozilla Public
+License, v. 2.0. If a copy of the MPL was not distributed with this
+file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+"""
+Persistent on-disk cache for the results of verification units.
+
+A unit is fingerprinted by the Silver text and position of every member it
+contains (which includes everything its target transitively depends on), the
+Python source of all tracked members among them, and the backend options,
+which include the versions of Nagini, the backend and Z3 (see
+environment_options). Units with a known fingerprint are not verified again;
+their stored errors are replayed instead.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+
+from nagini_translation.lib import config
+from nagini_translation.verifier import Failure, Success, VerificationResult
+from typing import Dict, List, Optional
+
+
+CACHE_VERSION = '2'
+
+_ENVIRONMENT_OPTIONS = []
+
+
+def classpath_digest() -> str:
+    """
+    Returns a digest of the names and sizes of the jars on the classpath,
+    which identifies the version of the Viper backends.
+    """
+    hasher = hashlib.sha256()
+    for jar_path in (config.classpath or '').split(os.pathsep):
+        if os.path.isfile(jar_path):
+            hasher.update('{}:{}\0'.format(os.path.basename(jar_path),
+                                            os.path.getsize(jar_path)).encode())
+    return hasher.hexdigest()
+
+
+def _z3_version() -> str:
+    try:
+        output = subprocess.check_output([config.z3_path, '--version'],
+                                         stderr=subprocess.STDOUT, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+    return output.decode(errors='replace').strip()
+
+
+def _nagini_version() -> str:
+    try:
+        import pkg_resources
+        return pkg_resources.get_distribution('nagini').version
+    except Exception:
+        return 'unknown'
+
+
+def environment_options() -> List[str]:
+    """
+    Returns the versions of Nagini, the Viper backends and Z3, which results
+    depend on in addition to the backend options. They are determined once
+    per process.
+    """
+    if not _ENVIRONMENT_OPTIONS:
+        _ENVIRONMENT_OPTIONS.extend([_nagini_version(), classpath_digest(),
+                                     _z3_version()])
+    return list(_ENVIRONMENT_OPTIONS)
+
+
+class StoredError:
+    """
+    A verification error replayed from the cache. Offers the same string
+    representations as the ``Error`` wrapper it was created from.
+    """
+
+    def __init__(self, full_id: str, ide_string: str, string: str,
+                 viper_string: str) -> None:
+        self.full_id = full_id
+        self._ide_string = ide_string
+        self._string = string
+        self._viper_string = viper_string
+
+    @classmethod
+    def from_error(cls, error: 'Error') -> 'StoredError':
+        if isinstance(error, StoredError):
+            return error
+        return cls(error.full_id, error.string(True, False),
+                   error.string(False, False), error.string(False, True))
+
+    @classmethod
+    def from_json(cls, data: Dict[str, str]) -> 'StoredError':
+        return cls(data['full_id'], data['ide_string'], data['string'],
+                   data['viper_string'])
+
+    def to_json(self) -> Dict[str, str]:
+        return {
+            'full_id': self.full_id,
+            'ide_string': self._ide_string,
+            'string': self._string,
+            'viper_string': self._viper_string,
+        }
+
+    def __str__(self) -> str:
+        return self.string(False, False)
+
+    def string(self, ide_mode: bool, show_viper_errors: bool) -> str:
+        if ide_mode:
+            return self._ide_string
+        if show_viper_errors:
+            return self._viper_string
+        return self._string
+
+
+class VerificationCache:
+    """
+    Stores the results of verification units in a directory, one JSON file per
+    unit fingerprint.
+    """
+
+    def __init__(self, directory: str, options: List[str]) -> None:
+        self.directory = directory
+        self.options = options
+        self._member_digests = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def clear_digests(self) -> None:
+        """
+        Forgets the digests of the members of the last program; must be called
+        before fingerprinting units of a new program.
+        """
+        self._member_digests.clear()
+
+    def _member_digest(self, kind: str, member) -> str:
+        name = member.name()
+        abstract = kind == 'method' and member.body().isEmpty()
+        key = (kind, name, abstract)
+        if key not in self._member_digests:
+            text = str(member) + '\n' + str(member.pos())
+            digest = hashlib.sha256(text.encode()).hexdigest()
+            self._member_digests[key] = digest
+        return self._member_digests[key]
+
+    def fingerprint(self, prog: 'silver.ast.Program',
+                    source_fingerprints: Dict[str, str],
+                    viper_ast: 'ViperAST') -> str:
+        """
+        Computes the fingerprint of the given unit program.
+        """
+        entries = []
+        members = [('domain', prog.domains()), ('field', prog.fields()),
+                   ('function', prog.functions()),
+                   ('predicate', prog.predicates()),
+                   ('method', prog.methods())]
+        for kind, seq in members:
+            for member in viper_ast.to_list(seq):
+                name = member.name()
+                digest = self._member_digest(kind, member)
+                source = source_fingerprints.get(name, '')
+                entries.append('{} {} {} {}'.format(kind, name, digest, source))
+        entries.sort()
+        hasher = hashlib.sha256()
+        hasher.update(CACHE_VERSION.encode())
+        for option in self.options:
+            hasher.update(b'\0' + option.encode())
+        for entry in entries:
+            hasher.update(b'\n' + entry.encode())
+        return hasher.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.json')
+
+    def lookup(self, key: str) -> Optional[VerificationResult]:
+        """
+        Returns the stored result for the given fingerprint, if any.
+        """
+        try:
+            with open(self._path(key), 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not data['errors']:
+            return Success()
+        result = Failure([])
+        result.errors = [StoredError.from_json(error)
+                         for error in data['errors']]
+        return result
+
+    def store(self, key: str, result: VerificationResult) -> None:
+        """
+        Stores the result of the unit with the given fingerprint.
+        """
+        if result:
+            errors = []
+        else:
+            errors = [StoredError.from_error(error).to_json()
+                      for error in result.errors]
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as file:
+            json.dump({'errors': errors}, file)
+        os.replace(tmp_path, self._path(key))
@@ -6,14 +6,27 @@ file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
 import ast
+import threading
+import time
 
 from abc import ABCMeta
-from collections import OrderedDict
+from collections import namedtuple, OrderedDict
+from concurrent.futures import (
+    CancelledError,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 from enum import Enum
 from nagini_translation.lib import config
+from nagini_translation.lib.constants import UNTRACKED_DEPENDENCIES
+from nagini_translation.lib.dependency_graph import DependencyGraph
 from nagini_translation.lib.errors import error_manager
 from nagini_translation.lib.jvmaccess import JVM
-from typing import Optional
+from nagini_translation.lib.viper_ast import getobject
+from nagini_translation.quantifier_profile import QuantifierProfiler
+from typing import Callable, Dict, List, Optional, Set
 
 
 class ViperVerifier(Enum):
@@ -22,7 +35,22 @@ class ViperVerifier(Enum):
 
 
 class VerificationResult(metaclass=ABCMeta):
-    pass
+    # Number of instantiations per quantifier ID, if quantifiers were
+    # profiled during verification.
+    instantiations = None
+    # Time in seconds the backend took, if verified on a VerifierPool.
+    duration = None
+    # Names of the members whose verification was aborted because it
+    # exceeded its time limit.
+    timed_out = ()
+
+    @property
+    def partial(self) -> bool:
+        """
+        True iff the verification of some members did not complete, s.t. the
+        result only covers the remaining members.
+        """
+        return bool(self.timed_out)
 
 
 class Success(VerificationResult):
@@ -33,7 +61,8 @@ class Success(VerificationResult):
     def __bool__(self):
         return True
 
-    def to_string(self, ide_mode: bool, show_viper_errors: bool) -> str:
+    def to_string(self, ide_mode: bool, show_viper_errors: bool,
+                  exclude: Set[str] = frozenset()) -> str:
         return "Verification successful"
 
 
@@ -50,13 +79,69 @@ class Failure(VerificationResult):
     def __bool__(self):
         return False
 
-    def to_string(self, ide_mode: bool, show_viper_errors: bool) -> str:
+    def to_string(self, ide_mode: bool, show_viper_errors: bool,
+                  exclude: Set[str] = frozenset()) -> str:
+        """
+        Lists all errors except for those whose strings are excluded, e.g.
+        because they have already been streamed.
+        """
         all_errors = [error.string(ide_mode, show_viper_errors) for error in self.errors]
         unique_errors = []
         for e in all_errors:
-            if e not in unique_errors:
+            if e not in unique_errors and e not in exclude:
                 unique_errors.append(e)
-        return "Verification failed\nErrors:\n" + '\n'.join(unique_errors)
+        result = "Verification failed\nErrors:\n" + '\n'.join(unique_errors)
+        if self.timed_out:
+            result += '\n' + _timed_out_string(self.timed_out)
+        return result
+
+
+class Timeout(VerificationResult):
+    """
+    Encodes that the verification of some members timed out, while all other
+    members verified successfully
+    """
+
+    def __init__(self, timed_out: List[str]):
+        self.timed_out = timed_out
+        self.errors = []
+
+    def __bool__(self):
+        return False
+
+    def to_string(self, ide_mode: bool, show_viper_errors: bool,
+                  exclude: Set[str] = frozenset()) -> str:
+        return "Verification timed out\n" + _timed_out_string(self.timed_out)
+
+
+def _timed_out_string(timed_out: List[str]) -> str:
+    return 'Timed out: ' + ', '.join(timed_out)
+
+
+class ErrorStream:
+    """
+    Callback for the failures of individual members reported during a
+    verification. Passes every distinct error to the given function as soon
+    as it is reported, together with the name of its member. Members may be
+    reported concurrently by several backend threads.
+    """
+
+    def __init__(self, ide_mode: bool, show_viper_errors: bool,
+                 emit: Callable[[str, str], None]):
+        self.ide_mode = ide_mode
+        self.show_viper_errors = show_viper_errors
+        self.emit = emit
+        self.emitted = set()  # type: Set[str]
+        self._lock = threading.Lock()
+
+    def __call__(self, member: str, failure: Failure) -> None:
+        with self._lock:
+            for error in failure.errors:
+                error_string = error.string(self.ide_mode,
+                                            self.show_viper_errors)
+                if error_string not in self.emitted:
+                    self.emitted.add(error_string)
+                    self.emit(member, error_string)
 
 
 class ARPPlugin:
@@ -99,48 +184,145 @@ def get_arp_plugin(jvm: JVM) -> ARPPlugin:
     return _ARP_PLUGIN
 
 
+def _check_cancelled(cancelled: Optional[threading.Event]) -> None:
+    """
+    Aborts a verification whose cancellation has been requested. Must be
+    called after restarting a backend, since the restart undoes a stop that
+    was requested before it.
+    """
+    if cancelled is not None and cancelled.is_set():
+        raise CancelledError()
+
+
+def _get_errors(result: 'silver.verifier.Failure'
+                ) -> List['silver.verifier.AbstractError']:
+    it = result.errors().toIterator()
+    errors = []
+    while it.hasNext():
+        errors += [it.next()]
+    return errors
+
+
+class MemberReporter:
+    """
+    Reporter Silicon sends messages about the progress of a verification to.
+    Converts the errors of every member that failed to verify as soon as
+    Silicon reports them and passes them to the callback of the current
+    verification, if any.
+    """
+
+    def __init__(self, jvm: JVM):
+        self.jvm = jvm
+        self.silver = jvm.viper.silver
+        self.arp = False
+        self.on_failure = None  # type: Optional[Callable[[str, Failure], None]]
+
+    def name(self) -> str:
+        return 'nagini'
+
+    def report(self, message: 'silver.reporter.Message') -> None:
+        on_failure = self.on_failure
+        if (on_failure is None or not isinstance(
+                message, self.silver.reporter.EntityFailureMessage)):
+            return
+        result = message.result()
+        if self.arp:
+            result = get_arp_plugin(self.jvm).map_result(result)
+        on_failure(message.concerning().name(),
+                   Failure(_get_errors(result), self.jvm))
+
+
 class Silicon:
     """
     Provides access to the Silicon verifier
     """
 
-    def __init__(self, jvm: JVM, filename: str):
+    def __init__(self, jvm: JVM, filename: str,
+                 profile_quantifiers: bool = False, options: List[str] = (),
+                 stream: bool = False):
         self.jvm = jvm
         self.silver = jvm.viper.silver
         if not jvm.is_known_class(jvm.viper.silicon.Silicon):
             raise Exception('Silicon backend not found on classpath.')
-        self.silicon = jvm.viper.silicon.Silicon()
-        args = jvm.scala.collection.mutable.ArraySeq(4)
-        args.update(0, '--z3Exe')
-        args.update(1, config.z3_path)
-        args.update(2, '--disableCatchingExceptions')
-        args.update(3, filename)
+        if stream:
+            # Every message Silicon reports crosses the JVM boundary, so the
+            # reporter is only attached if errors are to be streamed.
+            self.reporter = MemberReporter(jvm)
+            reporter = jvm.get_proxy('viper.silver.reporter.Reporter',
+                                     self.reporter)
+            self.silicon = jvm.viper.silicon.Silicon(
+                reporter, getobject(jvm.scala.collection.immutable, 'Nil'))
+        else:
+            self.reporter = None
+            self.silicon = jvm.viper.silicon.Silicon()
+        arg_list = ['--z3Exe', config.z3_path, '--disableCatchingExceptions']
+        arg_list.extend(options)
+        if profile_quantifiers:
+            # Use a single Z3 instance, which writes its trace to the
+            # profiler's file.
+            self.profiler = QuantifierProfiler()
+            arg_list += ['--numberOfParallelVerifiers', '1',
+                         '--z3Args', self.profiler.z3_args()]
+        else:
+            self.profiler = None
+        arg_list.append(filename)
+        args = jvm.scala.collection.mutable.ArraySeq(len(arg_list))
+        for index, arg in enumerate(arg_list):
+            args.update(index, arg)
         self.silicon.parseCommandLine(args)
         self.silicon.start()
         self.ready = True
 
-    def verify(self, prog: 'silver.ast.Program', arp=False) -> VerificationResult:
+    def verify(self, prog: 'silver.ast.Program', arp=False,
+               on_failure: Callable[[str, Failure], None] = None,
+               cancelled: threading.Event = None) -> VerificationResult:
         """
-        Verifies the given program using Silicon
+        Verifies the given program using Silicon. If on_failure is given and
+        this instance streams errors, it is called with the name and the
+        errors of every member that fails to verify as soon as Silicon reports
+        it. A verification can be aborted
+        from a different thread by setting its cancelled event and then
+        calling stop.
         """
         if not self.ready:
             self.silicon.restart()
-        result = self.silicon.verify(prog)
+        _check_cancelled(cancelled)
+        if self.reporter:
+            self.reporter.arp = arp
+            self.reporter.on_failure = on_failure
+        try:
+            result = self.silicon.verify(prog)
+        finally:
+            if self.reporter:
+                self.reporter.on_failure = None
         if arp:
             result = get_arp_plugin(self.jvm).map_result(result)
         self.ready = False
+        instantiations = None
+        if self.profiler:
+            # Z3 writes the complete trace only when it terminates.
+            self.silicon.stop()
+            instantiations = self.profiler.collect()
         if isinstance(result, self.silver.verifier.Failure):
-            it = result.errors().toIterator()
-            errors = []
-            while it.hasNext():
-                errors += [it.next()]
-            return Failure(errors, self.jvm)
+            vresult = Failure(_get_errors(result), self.jvm)
         else:
-            return Success()
+            vresult = Success()
+        vresult.instantiations = instantiations
+        return vresult
+
+    def stop(self) -> None:
+        """
+        Stops Silicon, aborting a verification that is currently running in a
+        different thread. Silicon is restarted before the next verification.
+        """
+        self.ready = False
+        self.silicon.stop()
 
     def __del__(self):
         if hasattr(self, 'silicon') and self.silicon:
             self.silicon.stop()
+        if getattr(self, 'profiler', None):
+            self.profiler.remove()
 
 
 class Carbon:
@@ -166,12 +348,17 @@ class Carbon:
         self.ready = True
         self.jvm = jvm
 
-    def verify(self, prog: 'silver.ast.Program', arp=False) -> VerificationResult:
+    def verify(self, prog: 'silver.ast.Program', arp=False,
+               on_failure: Callable[[str, Failure], None] = None,
+               cancelled: threading.Event = None) -> VerificationResult:
         """
-        Verifies the given program using Carbon
+        Verifies the given program using Carbon. Carbon does not report
+        individual members, so on_failure is never called. Verifications are
+        aborted like those of Silicon.
         """
         if not self.ready:
             self.carbon.restart()
+        _check_cancelled(cancelled)
         result = self.carbon.verify(prog)
         if arp:
             result = get_arp_plugin(self.jvm).map_result(result)
@@ -184,3 +371,410 @@ class Carbon:
             return Failure(errors)
         else:
             return Success()
+
+    def stop(self) -> None:
+        """
+        Stops Carbon, aborting a verification that is currently running in a
+        different thread. Carbon is restarted before the next verification.
+        """
+        self.ready = False
+        self.carbon.stop()
+
+
+PortfolioConfiguration = namedtuple('PortfolioConfiguration', 'backend options')
+
+
+def parse_portfolio(spec: str) -> List[PortfolioConfiguration]:
+    """
+    Parses a comma-separated list of backend configurations, each of which is
+    either 'carbon', 'silicon' or 'silicon:SEED', where SEED is the random
+    seed Z3 is run with. The seed is passed with --z3ConfigArgs, whose options
+    Silicon sets after its own preamble, which also sets the random seeds;
+    seeds passed on Z3's command line with --z3Args would be overwritten by
+    it.
+    """
+    result = []
+    for entry in spec.split(','):
+        name, _, seed = entry.strip().partition(':')
+        try:
+            backend = ViperVerifier(name)
+        except ValueError:
+            raise ValueError('Unknown verifier specified: ' + name)
+        options = []
+        if seed:
+            if backend != ViperVerifier.silicon or not seed.isdigit():
+                raise ValueError('Invalid portfolio configuration: ' + entry)
+            options = ['--z3ConfigArgs',
+                       '"smt.random_seed={0} sat.random_seed={0}"'.format(seed)]
+        result.append(PortfolioConfiguration(backend, options))
+    return result
+
+
+class PortfolioVerifier:
+    """
+    Verifies programs with several backend configurations concurrently. The
+    first successful result is returned and all other backends are stopped.
+    Since a failure may be caused by an unlucky configuration (e.g. a random
+    seed that leads to a timeout), failures are only reported once all
+    configurations have failed; the first one to fail is reported.
+    """
+
+    def __init__(self, jvm: JVM, filename: str,
+                 configurations: List[PortfolioConfiguration]):
+        self.jvm = jvm
+        self.filename = filename
+        self.configurations = configurations
+        self._verifiers = [None] * len(configurations)
+        # One thread per configuration, which owns its backend instance.
+        self._executors = [ThreadPoolExecutor(max_workers=1)
+                           for _ in configurations]
+
+    def _verify(self, index: int, prog: 'silver.ast.Program', arp: bool,
+                cancelled: threading.Event) -> VerificationResult:
+        verifier = self._verifiers[index]
+        if verifier is None:
+            self.jvm.attach_thread()
+            verifier = self._create_verifier(index)
+            self._verifiers[index] = verifier
+        return verifier.verify(prog, arp=arp, cancelled=cancelled)
+
+    def _create_verifier(self, index: int):
+        """
+        Creates the backend instance of the configuration with the given
+        index.
+        """
+        configuration = self.configurations[index]
+        if configuration.backend == ViperVerifier.silicon:
+            return Silicon(self.jvm, self.filename,
+                           options=configuration.options)
+        return Carbon(self.jvm, self.filename)
+
+    def verify(self, prog: 'silver.ast.Program', arp=False,
+               on_failure: Callable[[str, Failure], None] = None,
+               cancelled: threading.Event = None) -> VerificationResult:
+        """
+        Verifies the given program with all configurations. Failures reported
+        by one configuration may be superseded by the success of another one,
+        so on_failure is never called. Setting the cancelled event and then
+        calling stop aborts all configurations; the event is also set once
+        the remaining configurations are no longer needed.
+        """
+        if cancelled is None:
+            cancelled = threading.Event()
+        pending = {executor.submit(self._verify, index, prog, arp, cancelled):
+                   index for index, executor in enumerate(self._executors)}
+        failure = None
+        exception = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                if future.exception() is not None:
+                    if exception is None:
+                        exception = future.exception()
+                    continue
+                result = future.result()
+                if result:
+                    self._stop(pending, cancelled)
+                    return result
+                if failure is None:
+                    failure = result
+        if failure is None:
+            raise exception
+        return failure
+
+    def _stop(self, pending: Dict[Future, int],
+              cancelled: threading.Event) -> None:
+        """
+        Cancels or aborts the given verifications, whose results are no
+        longer needed. The cancelled event they share is set first, s.t. a
+        verification that restarts its backend after being stopped aborts.
+        """
+        cancelled.set()
+        for future, index in pending.items():
+            if not future.cancel() and self._verifiers[index] is not None:
+                self._verifiers[index].stop()
+
+    def stop(self) -> None:
+        """
+        Aborts the verification with all configurations.
+        """
+        for verifier in self._verifiers:
+            if verifier is not None:
+                verifier.stop()
+
+    def shutdown(self) -> None:
+        """
+        Stops the backends of all configurations and waits for their threads.
+        """
+        self.stop()
+        for executor in self._executors:
+            executor.shutdown()
+
+
+def create_verifier(jvm: JVM, filename: str, backend: ViperVerifier,
+                    profile_quantifiers: bool = False,
+                    portfolio: List[PortfolioConfiguration] = None,
+                    stream: bool = False):
+    """
+    Creates a new instance of the given backend, or a verifier racing all
+    configurations of the given portfolio. Only Silicon can profile
+    quantifier instantiations and stream the errors of individual members.
+    """
+    if portfolio:
+        return PortfolioVerifier(jvm, filename, portfolio)
+    if backend == ViperVerifier.silicon:
+        return Silicon(jvm, filename, profile_quantifiers, stream=stream)
+    elif backend == ViperVerifier.carbon:
+        return Carbon(jvm, filename)
+    raise ValueError('Unknown verifier specified: ' + str(backend))
+
+
+def merge_results(results: List[VerificationResult]) -> VerificationResult:
+    """
+    Combines the results of several verification units into a single result,
+    which is a failure containing all errors if any of the units failed, and
+    a timeout if none failed but some timed out. The members of all units
+    that timed out are recorded in the merged result. Functions and predicates
+    are verified in every unit that needs them, so an error with the same
+    identifier at the same position is only kept once.
+    """
+    failures = [result for result in results if isinstance(result, Failure)]
+    timed_out = [name for result in results for name in result.timed_out]
+    if not failures:
+        return Timeout(timed_out) if timed_out else Success()
+    merged = Failure([])
+    seen = set()
+    for failure in failures:
+        for error in failure.errors:
+            key = (error.full_id, error.string(True, False))
+            if key not in seen:
+                seen.add(key)
+                merged.errors.append(error)
+    merged.timed_out = timed_out
+    return merged
+
+
+VerificationUnit = namedtuple('VerificationUnit', 'name program')
+
+
+def split_program(prog: 'silver.ast.Program',
+                  dependencies: Dict[str, Set[str]],
+                  viper_ast: 'ViperAST') -> List[VerificationUnit]:
+    """
+    Splits the given program into independent verification units, one per
+    method, plus one per function or predicate that is not part of any
+    method's unit. A unit contains its target member, the methods it calls
+    without their bodies (s.t. they are not verified again), all functions
+    and predicates it transitively depends on, and all domains and fields.
+    Functions and predicates keep their bodies, since the units of their
+    callers need their definitions; errors in them are reported by every
+    such unit (see merge_results). Functions and predicates whose
+    dependencies have not been tracked are
+    included in every unit; a method whose dependencies have not been tracked
+    gets a unit containing the entire program.
+    """
+    domains = viper_ast.to_list(prog.domains())
+    fields = viper_ast.to_list(prog.fields())
+    functions = viper_ast.to_list(prog.functions())
+    predicates = viper_ast.to_list(prog.predicates())
+    methods = viper_ast.to_list(prog.methods())
+    graph = DependencyGraph(dependencies)
+    untracked = graph.successors(UNTRACKED_DEPENDENCIES)
+    abstract_methods = {}
+    covered = set()
+    units = []
+
+    def create_unit(target) -> None:
+        name = target.name()
+        if name in graph:
+            needed = graph.reachable({name} | untracked)
+            covered.update(needed)
+        else:
+            needed = None
+            covered.update(member.name() for member in functions + predicates)
+
+        def is_needed(member, is_method=False) -> bool:
+            member_name = member.name()
+            if needed is None or member_name in needed:
+                return True
+            return not is_method and member_name not in graph
+
+        unit_methods = []
+        for method in methods:
+            if method is target:
+                unit_methods.append(method)
+            elif is_needed(method, True):
+                if method.name() not in abstract_methods:
+                    abstract_methods[method.name()] = viper_ast.ast.Method(
+                        method.name(), method.formalArgs(),
+                        method.formalReturns(), method.pres(), method.posts(),
+                        viper_ast.none, method.pos(), method.info(),
+                        method.errT())
+                unit_methods.append(abstract_methods[method.name()])
+        unit_functions = [f for f in functions if is_needed(f)]
+        unit_predicates = [p for p in predicates if is_needed(p)]
+        unit_prog = viper_ast.Program(domains, fields, unit_functions,
+                                      unit_predicates, unit_methods,
+                                      prog.pos(), prog.info())
+        units.append(VerificationUnit(name, unit_prog))
+
+    for method in methods:
+        create_unit(method)
+    for member in functions + predicates:
+        if member.name() in graph and member.name() not in covered:
+            create_unit(member)
+    return units
+
+
+class _Verification:
+    """
+    State of a verification scheduled on a VerifierPool, shared between the
+    worker running it and threads aborting it.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.cancelled = threading.Event()
+        # Backend running the verification, once a worker has started it.
+        self.verifier = None
+        self.done = False
+        # Whether the verification was aborted by its time limit before the
+        # backend finished it.
+        self.timed_out = False
+
+
+class VerifierPool:
+    """
+    Verifies several Viper programs concurrently. Each worker thread owns its
+    own backend instance; all of them share the same JVM.
+    """
+
+    def __init__(self, jvm: JVM, filename: str, backend: ViperVerifier,
+                 workers: int, profile_quantifiers: bool = False,
+                 portfolio: List[PortfolioConfiguration] = None,
+                 stream: bool = False):
+        self.jvm = jvm
+        self.filename = filename
+        self.backend = backend
+        self.workers = workers
+        self.profile_quantifiers = profile_quantifiers
+        self.portfolio = portfolio
+        self.stream = stream
+        self._local = threading.local()
+        # Backends of all workers, which are stopped on shutdown.
+        self._verifiers = []
+        self._verifications = {}  # type: Dict[Future, _Verification]
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _create_verifier(self):
+        """
+        Creates the backend instance of the current worker thread.
+        """
+        return create_verifier(self.jvm, self.filename, self.backend,
+                               self.profile_quantifiers, self.portfolio,
+                               self.stream)
+
+    def _get_verifier(self):
+        verifier = getattr(self._local, 'verifier', None)
+        if verifier is None:
+            self.jvm.attach_thread()
+            verifier = self._create_verifier()
+            self._verifiers.append(verifier)
+            self._local.verifier = verifier
+        return verifier
+
+    def _verify(self, state: _Verification, prog: 'silver.ast.Program',
+                arp: bool, timeout: Optional[float], name: str,
+                on_failure: Optional[Callable[[str, Failure], None]]
+                ) -> VerificationResult:
+        verifier = self._get_verifier()
+        with state.lock:
+            state.verifier = verifier
+        timer = None
+        if timeout is not None:
+            def expire() -> None:
+                # A verification that has already finished keeps its result.
+                with state.lock:
+                    if state.done:
+                        return
+                    state.timed_out = True
+                    state.cancelled.set()
+                    self.jvm.attach_thread()
+                    verifier.stop()
+            timer = threading.Timer(timeout, expire)
+            timer.start()
+        start = time.perf_counter()
+        try:
+            result = verifier.verify(prog, arp=arp, on_failure=on_failure,
+                                     cancelled=state.cancelled)
+        except Exception:
+            # Stopping the backend may make the running verification fail.
+            with state.lock:
+                if not state.timed_out:
+                    raise
+        finally:
+            with state.lock:
+                state.done = True
+            if timer:
+                timer.cancel()
+        if state.timed_out:
+            result = Timeout([name])
+        result.duration = time.perf_counter() - start
+        return result
+
+    def submit(self, prog: 'silver.ast.Program', arp=False,
+               timeout: float = None, name: str = None,
+               on_failure: Callable[[str, Failure], None] = None) -> Future:
+        """
+        Schedules the verification of the given program and returns a future
+        for its result. If a timeout is given, the verification is aborted
+        after the given number of seconds, and the result is a Timeout for the
+        member with the given name. If on_failure is given and the pool was
+        created with stream set, the backend passes the errors of every member
+        to it as soon as they are known.
+        """
+        state = _Verification()
+        future = self._executor.submit(self._verify, state, prog, arp,
+                                       timeout, name or self.filename,
+                                       on_failure)
+        self._verifications[future] = state
+        future.add_done_callback(
+            lambda done: self._verifications.pop(done, None))
+        return future
+
+    def cancel(self, future: Future) -> None:
+        """
+        Cancels the verification with the given future, stopping its backend
+        if the verification is already running.
+        """
+        if future.cancel():
+            return
+        state = self._verifications.get(future)
+        if state is None:
+            # Already finished.
+            return
+        with state.lock:
+            state.cancelled.set()
+            if state.verifier is not None and not state.done:
+                self.jvm.attach_thread()
+                state.verifier.stop()
+
+    def verify_all(self, progs: List['silver.ast.Program'],
+                   arp=False) -> VerificationResult:
+        """
+        Verifies all given programs and merges their results.
+        """
+        futures = [self.submit(prog, arp) for prog in progs]
+        return merge_results([future.result() for future in futures])
+
+    def shutdown(self) -> None:
+        """
+        Waits for all scheduled verifications and stops the backends.
+        """
+        self._executor.shutdown()
+        for verifier in self._verifiers:
+            if self.portfolio:
+                verifier.shutdown()
+            else:
+                verifier.stop()
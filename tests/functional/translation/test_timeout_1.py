@@ -0,0 +1,11 @@
+# Any copyright is dedicated to the Public Domain.
+# http://creativecommons.org/publicdomain/zero/1.0/
+
+from nagini_contracts.contracts import *
+
+
+#:: ExpectedOutput(invalid.program:invalid.timeout)
+@Timeout(0)
+def m(a: int) -> int:
+    Ensures(Result() == a)
+    return a
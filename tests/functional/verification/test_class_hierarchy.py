@@ -0,0 +1,67 @@
+# Any copyright is dedicated to the Public Domain.
+# http://creativecommons.org/publicdomain/zero/1.0/
+
+from nagini_contracts.contracts import *
+from typing import Generic, TypeVar
+
+T = TypeVar('T')
+
+
+class Animal:
+    pass
+
+
+class Dog(Animal):
+    pass
+
+
+class Puppy(Dog):
+    pass
+
+
+class Cat(Animal):
+    pass
+
+
+class Box(Generic[T]):
+    pass
+
+
+class BigBox(Box[T]):
+    pass
+
+
+def subtypes(p: Puppy) -> None:
+    assert isinstance(p, Dog)
+    assert isinstance(p, Animal)
+    assert isinstance(p, object)
+
+
+def siblings(d: Dog, a: Animal) -> None:
+    assert not isinstance(d, Cat)
+    if isinstance(a, Cat):
+        assert not isinstance(a, Dog)
+        assert not isinstance(a, Puppy)
+    #:: ExpectedOutput(assert.failed:assertion.false)
+    assert isinstance(a, Cat)
+
+
+def subtrees(a: Animal) -> None:
+    if not isinstance(a, Dog):
+        assert not isinstance(a, Puppy)
+    if isinstance(a, Dog):
+        assert not isinstance(a, Cat)
+    #:: ExpectedOutput(assert.failed:assertion.false)
+    assert isinstance(a, Puppy)
+
+
+def supertypes(d: Dog) -> None:
+    #:: ExpectedOutput(assert.failed:assertion.false)
+    assert isinstance(d, Puppy)
+
+
+def generic(b: BigBox[int], o: object) -> None:
+    assert isinstance(b, Box)
+    assert not isinstance(b, Animal)
+    if isinstance(o, Puppy):
+        assert not isinstance(o, Box)
@@ -0,0 +1,36 @@
+# Any copyright is dedicated to the Public Domain.
+# http://creativecommons.org/publicdomain/zero/1.0/
+
+from nagini_contracts.contracts import *
+from typing import List, Set
+
+
+@Pure
+def positive(i: int) -> bool:
+    return i > 0
+
+
+def from_subscript(xs: List[int]) -> None:
+    Requires(Acc(list_pred(xs)))
+    Requires(Forall(int, lambda i: Implies(i >= 0 and i < len(xs), xs[i] > 0)))
+    if len(xs) > 3:
+        assert xs[2] > 0
+        #:: ExpectedOutput(assert.failed:assertion.false)
+        assert xs[3] > 1
+
+
+def from_membership(s: Set[int], x: int) -> None:
+    Requires(Acc(set_pred(s)))
+    Requires(Forall(int, lambda i: Implies(i in s, i > 0)))
+    if x in s:
+        assert x > 0
+    #:: ExpectedOutput(assert.failed:assertion.false)
+    assert x > 0
+
+
+def from_call(s: Set[int], x: int) -> None:
+    Requires(Acc(set_pred(s)))
+    Requires(Forall(int, lambda i: Implies(positive(i), i in s)))
+    if x > 0:
+        assert positive(x)
+        assert x in s